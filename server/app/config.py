@@ -28,6 +28,14 @@ class Settings(BaseModel):
     postgres_password: str = os.getenv("POSTGRES_PASSWORD", "")
     postgres_db: str = os.getenv("POSTGRES_DB", "docuchat")
 
+    # Connection pool shared by every request session (SQLAlchemy defaults to 5 + 10)
+    postgres_pool_size: int = int(os.getenv("PG_POOL_SIZE", "30"))
+    postgres_max_overflow: int = int(os.getenv("PG_MAX_OVERFLOW", "20"))
+    postgres_pool_recycle: int = int(os.getenv("PG_POOL_RECYCLE", "1800"))
+    postgres_pool_timeout: int = int(os.getenv("PG_POOL_TIMEOUT", "30"))
+    # Behind PgBouncer in transaction mode: no app-side pool, no prepared statement caches
+    postgres_pgbouncer: bool = os.getenv("PG_PGBOUNCER", "false").lower() == "true"
+
     @property
     def postgres_url(self) -> str:
         """PostgreSQL connection URL."""
@@ -47,6 +55,10 @@ class Settings(BaseModel):
     algorithm: str = os.getenv("ALGORITHM", "HS256")
     access_token_expire_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
     refresh_token_expire_days: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+    # argon2id cost; raising any of these upgrades stored hashes on the next login
+    argon2_time_cost: int = int(os.getenv("ARGON2_TIME_COST", "3"))
+    argon2_memory_cost_kib: int = int(os.getenv("ARGON2_MEMORY_COST_KIB", "65536"))
+    argon2_parallelism: int = int(os.getenv("ARGON2_PARALLELISM", "1"))
     secret_key: str = os.getenv("SECRET_KEY", "")
 
     #Milvus/Zilliz Cloud Configuration
@@ -66,10 +78,31 @@ class Settings(BaseModel):
     embedding_model: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/paraphrase-MiniLM-L3-v2")
     embedding_dimension: int = int(os.getenv("EMBEDDING_DIMENSION", "384"))
 
+    # Create the vector store (and load the embedding model) at startup instead of on first use
+    vector_store_eager_init: bool = os.getenv("VECTOR_STORE_EAGER_INIT", "false").lower() == "true"
+
+    # Uploads larger than this are rejected while being spooled to disk (default 50 MiB)
+    max_upload_bytes: int = int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+
     #Chunking Configuration
     chunk_size: int = int(os.getenv("CHUNK_SIZE", "300"))
     chunk_overlap: int = int(os.getenv("CHUNK_OVERLAP", "50"))
 
+    # Max documents processed / vector rebuilds run concurrently; the rest wait their turn
+    upload_concurrency: int = int(os.getenv("UPLOAD_CONCURRENCY", "4"))
+    rebuild_concurrency: int = int(os.getenv("REBUILD_CONCURRENCY", "1"))
+
+    # Read client IPs from X-Forwarded-For / X-Real-IP (only safe behind a trusted proxy)
+    trust_proxy_headers: bool = os.getenv("TRUST_PROXY_HEADERS", "true").lower() == "true"
+
+    # Redis (shared state across workers)
+    redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    rate_limit_backend: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory | redis
+    llm_cache_backend: str = os.getenv("LLM_CACHE_BACKEND", "memory")  # memory | redis
+
+    # Query logs older than this are expired by MongoDB's TTL monitor (default 30 days)
+    query_log_ttl_seconds: int = int(os.getenv("QUERY_LOG_TTL_SECONDS", "2592000"))
+
     # Individual Groq API keys for round-robin load balancing
     groq_api_key_1: str = os.getenv("GROQ_API_KEY_1", "")
     groq_api_key_2: str = os.getenv("GROQ_API_KEY_2", "")
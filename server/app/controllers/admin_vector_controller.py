@@ -4,6 +4,7 @@ from fastapi import HTTPException, status
 
 from ..services.vector_rebuild_service import VectorRebuildService
 from ..db.milvus_vector_store import MilvusVectorStore
+from ..utils.etag import make_etag
 from ..utils.sse import VectorRebuildEventEmitter
 
 logger = logging.getLogger(__name__)
@@ -85,6 +86,23 @@ class AdminVectorController:
                 "error": str(e)
             }
     
+    async def get_backup_statistics_etag(self) -> str:
+        """
+        Get the ETag of the current backup statistics.
+        
+        Returns:
+            str: ETag header value
+        """
+        try:
+            return make_etag(*await self.rebuild_service.get_backup_stats_version())
+            
+        except Exception as e:
+            logger.error(f"Backup stats version failed: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get backup statistics: {str(e)}"
+            )
+    
     async def get_backup_statistics(self) -> Dict[str, Any]:
         """
         Get detailed statistics about MongoDB backup data.
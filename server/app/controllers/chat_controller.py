@@ -5,13 +5,14 @@ Handles chat-related request processing and coordinates
 between routes and services.
 """
 
-from typing import List, Optional
+from typing import AsyncGenerator, List, Optional, Union
 from fastapi import HTTPException, status
 import logging
 
 from ..services import ChatService
-from ..models import ChatRequest, ChatResponse, ConversationResponse
+from ..models import ChatRequest, ChatRequestFast, ChatResponse, ConversationResponse
 from ..dependencies import get_vector_store
+from ..utils.etag import make_etag
 
 
 class ChatController:
@@ -21,9 +22,9 @@ class ChatController:
     
     async def send_message(
         self, 
-        chat_request: ChatRequest, 
-        user_id: str, 
-        db_session
+        chat_request: Union[ChatRequest, ChatRequestFast], 
+        user_id: str,
+        use_search_cache: bool = True
     ) -> ChatResponse:
         """
         Handle chat message.
@@ -31,7 +32,7 @@ class ChatController:
         Args:
             chat_request: Chat request data
             user_id: Current user ID
-            db_session: Database session
+            use_search_cache: Reuse recent identical vector searches
             
         Returns:
             ChatResponse: Chat response with answer and sources
@@ -43,9 +44,9 @@ class ChatController:
             response = await self.chat_service.process_chat_message(
                 chat_request=chat_request,
                 user_id=user_id,
-                db=db_session,
                 vector_store=vector_manager,
-                tenant_id=user_id  # Use user_id as tenant_id for LLM config
+                tenant_id=user_id,  # Use user_id as tenant_id for LLM config
+                use_search_cache=use_search_cache
             )
             return response
             
@@ -55,12 +56,39 @@ class ChatController:
                 detail=f"Chat processing failed: {str(e)}"
             )
     
+    async def stream_message(
+        self,
+        chat_request: Union[ChatRequest, ChatRequestFast],
+        user_id: str,
+        use_search_cache: bool = True
+    ) -> AsyncGenerator[str, None]:
+        """
+        Handle chat message with a streamed reply.
+        
+        Args:
+            chat_request: Chat request data
+            user_id: Current user ID
+            use_search_cache: Reuse recent identical vector searches
+            
+        Returns:
+            AsyncGenerator[str, None]: SSE messages (sources, tokens, done/error)
+        """
+        # Get vector store with lazy initialization
+        vector_manager = await get_vector_store()
+        
+        return self.chat_service.stream_chat_message(
+            chat_request=chat_request,
+            user_id=user_id,
+            vector_store=vector_manager,
+            tenant_id=user_id,  # Use user_id as tenant_id for LLM config
+            use_search_cache=use_search_cache
+        )
+    
     async def get_conversations(
         self, 
         user_id: str, 
         skip: int = 0, 
-        limit: int = 50, 
-        db_session = None
+        limit: int = 50
     ) -> List[ConversationResponse]:
         """
         Get user conversations.
@@ -69,7 +97,6 @@ class ChatController:
             user_id: Current user ID
             skip: Number of conversations to skip
             limit: Maximum number of conversations to return
-            db_session: Database session
             
         Returns:
             List[ConversationResponse]: User's conversations
@@ -83,8 +110,7 @@ class ChatController:
             conversations = await self.chat_service.get_user_conversations(
                 user_id=user_id,
                 skip=skip,
-                limit=limit,
-                db=db_session
+                limit=limit
             )
             
             logger.info(f"ChatController: Got {len(conversations)} conversations from service")
@@ -102,8 +128,7 @@ class ChatController:
     async def get_conversation(
         self, 
         conversation_id: str, 
-        user_id: str, 
-        db_session
+        user_id: str
     ) -> ConversationResponse:
         """
         Get specific conversation with full history.
@@ -111,15 +136,13 @@ class ChatController:
         Args:
             conversation_id: Conversation ID
             user_id: Current user ID
-            db_session: Database session
             
         Returns:
             ConversationResponse: Full conversation with messages
         """
         conversation = await self.chat_service.get_conversation_history(
             conversation_id=conversation_id,
-            user_id=user_id,
-            db=db_session
+            user_id=user_id
         )
         
         if not conversation:
@@ -128,4 +151,19 @@ class ChatController:
                 detail="Conversation not found"
             )
         
-        return ConversationResponse.model_validate(conversation) 
\ No newline at end of file
+        return conversation
+    
+    async def get_conversations_etag(self, user_id: str, skip: int, limit: int) -> str:
+        """
+        Get the ETag of a page of the user's conversation list.
+        
+        Args:
+            user_id: Current user ID
+            skip: Number of conversations to skip
+            limit: Maximum number of conversations to return
+            
+        Returns:
+            str: ETag header value
+        """
+        count, latest = await self.chat_service.get_conversations_version(user_id)
+        return make_etag(user_id, skip, limit, count, latest)
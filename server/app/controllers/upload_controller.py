@@ -4,6 +4,7 @@ from fastapi import HTTPException, UploadFile, status
 from ..services import DocumentService
 from ..models import DocumentResponse
 from ..dependencies import get_vector_store
+from ..utils.etag import make_etag
 
 class UploadController:
     
@@ -15,7 +16,7 @@ class UploadController:
         user_id: str, 
         skip: int = 0, 
         limit: int = 50, 
-        db_session = None
+        cursor: Optional[str] = None
     ) -> List[DocumentResponse]:
         """
         Get user documents.
@@ -24,24 +25,23 @@ class UploadController:
             user_id: Current user ID
             skip: Number of documents to skip
             limit: Maximum number of documents to return
-            db_session: Database session
+            cursor: ID of the last document of the previous page
             
         Returns:
             List[DocumentResponse]: User's documents
         """
-        documents = await self.document_service.get_user_documents(
+        # The service already returns DocumentResponse objects, no need to validate again
+        return await self.document_service.get_user_documents(
             user_id=user_id,
             skip=skip,
             limit=limit,
-            db=db_session
+            cursor=cursor
         )
-        return [DocumentResponse.model_validate(doc) for doc in documents]
     
     async def get_document(
         self, 
         document_id: str, 
-        user_id: str, 
-        db_session
+        user_id: str
     ) -> DocumentResponse:
         """
         Get specific document.
@@ -49,15 +49,13 @@ class UploadController:
         Args:
             document_id: Document ID
             user_id: Current user ID
-            db_session: Database session
             
         Returns:
             DocumentResponse: Document information
         """
         document = await self.document_service.get_document(
             document_id=document_id,
-            user_id=user_id,
-            db=db_session
+            user_id=user_id
         )
         
         if not document:
@@ -68,11 +66,26 @@ class UploadController:
         
         return DocumentResponse.model_validate(document)
     
+    async def get_document_etag(self, document_id: str, user_id: str) -> Optional[str]:
+        """
+        Get the ETag of one of the user's documents.
+        
+        Args:
+            document_id: Document ID
+            user_id: Current user ID
+            
+        Returns:
+            Optional[str]: ETag header value, or None if the document is missing
+        """
+        updated_at = await self.document_service.get_document_version(document_id, user_id)
+        if updated_at is None:
+            return None
+        return make_etag(document_id, updated_at)
+    
     async def delete_document(
         self, 
         document_id: str, 
-        user_id: str, 
-        db_session
+        user_id: str
     ) -> dict:
         """
         Delete document.
@@ -80,7 +93,6 @@ class UploadController:
         Args:
             document_id: Document ID
             user_id: Current user ID
-            db_session: Database session
             
         Returns:
             dict: Deletion confirmation
@@ -91,7 +103,6 @@ class UploadController:
         result = await self.document_service.delete_document(
             document_id=document_id,
             user_id=user_id,
-            db=db_session,
             vector_store=vector_manager
         )
         
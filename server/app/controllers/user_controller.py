@@ -2,6 +2,7 @@ from typing import Dict, Any
 
 from ..models import UserResponse, UserUpdate, LLMConfigUpdate
 from ..services import UserSerivce
+from ..utils.etag import make_etag
 
 class UserController:
 
@@ -19,8 +20,23 @@ class UserController:
         Returns:
             UserResponse: User profile information
         """
-        user = await self.user_service.get_user_profile(user_id, db_session)
-        return UserResponse.model_validate(user)
+        # The service builds the response from trusted rows; no need to validate again
+        return await self.user_service.get_user_profile(user_id, db_session)
+    
+    def get_profile_etag(self, profile: UserResponse) -> str:
+        """
+        Get the ETag of a user profile.
+        
+        The activity counts change without touching the user row, so the ETag
+        is taken over the built profile rather than a stored version field.
+        
+        Args:
+            profile: User profile
+            
+        Returns:
+            str: ETag header value
+        """
+        return make_etag(*profile.__dict__.values())
     
     async def update_profile(
         self, 
@@ -39,10 +55,9 @@ class UserController:
         Returns:
             UserResponse: Updated user information
         """
-        user = await self.user_service.update_user_profile(
+        return await self.user_service.update_user_profile(
             user_id, user_update, db_session
         )
-        return UserResponse.model_validate(user)
     
     async def change_password(
         self, 
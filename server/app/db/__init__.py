@@ -20,11 +20,21 @@ from .mongodb import (
     disconnect_from_mongodb,
     Document,
     Chunk,
+    ChunkContent,
     Conversation,
     Message,
-    QueryLog
+    QueryLog,
+    ChunkRaw,
+    bulk_insert_chunks,
+    delete_chunks,
+    get_chunk_text,
+    get_chunk_texts
 )
 
+from .clock import now_utc, pinned_now
+
+from .redis import get_redis, disconnect_from_redis
+
 from .milvus_vector_store import MilvusVectorStore
 
 __all__ = [
@@ -40,7 +50,17 @@ __all__ = [
     "disconnect_from_mongodb",
     "Document",
     "Chunk",
+    "ChunkContent",
     "Conversation",
     "Message", 
     "QueryLog",
+    "ChunkRaw",
+    "bulk_insert_chunks",
+    "delete_chunks",
+    "get_chunk_text",
+    "get_chunk_texts",
+    "now_utc",
+    "pinned_now",
+    "get_redis",
+    "disconnect_from_redis",
 ]
\ No newline at end of file
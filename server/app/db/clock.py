@@ -0,0 +1,43 @@
+"""
+Request-scoped clock for document timestamps.
+
+Beanie models use `now_utc` as their timestamp factory. When a timestamp has
+been pinned for a block of work (a new upload record, an ingest batch) every
+document created in that block shares it instead of reading the system clock
+again. Keep pinned blocks short: tasks started inside one copy the pinned
+value and would stamp everything they create with it.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+_pinned_now: ContextVar[Optional[datetime]] = ContextVar("pinned_now", default=None)
+
+
+def now_utc() -> datetime:
+    """Return the pinned timestamp for the current context, or the current UTC time."""
+    pinned = _pinned_now.get()
+    if pinned is not None:
+        return pinned
+    return datetime.now(timezone.utc)
+
+
+@contextmanager
+def pinned_now(timestamp: Optional[datetime] = None) -> Iterator[datetime]:
+    """
+    Pin `now_utc()` to a single timestamp for the duration of the block.
+
+    Args:
+        timestamp: Timestamp to pin (defaults to the current UTC time)
+
+    Yields:
+        datetime: The pinned timestamp
+    """
+    timestamp = timestamp or datetime.now(timezone.utc)
+    token = _pinned_now.set(timestamp)
+    try:
+        yield timestamp
+    finally:
+        _pinned_now.reset(token)
@@ -6,8 +6,6 @@ from pymilvus import (
     connections, Collection, CollectionSchema, FieldSchema, DataType,
     utility
 )
-from transformers import AutoTokenizer, AutoModel
-import torch
 
 from app.config import get_settings
 
@@ -29,6 +27,11 @@ class OptimizedEmbeddingModel:
         
     def _load_model(self):
         """Lazy load model only when needed"""
+        # torch/transformers are imported here, not at module level, so the app
+        # boots without them until the vector store is actually used
+        from transformers import AutoTokenizer, AutoModel
+        import torch
+        
         if self.tokenizer is None:
             logger.info(f"🔄 Loading tokenizer: {self.model_name}")
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
@@ -45,6 +48,8 @@ class OptimizedEmbeddingModel:
             
     def embed_texts(self, texts: List[str]) -> np.ndarray:
         """Generate embeddings for a list of texts"""
+        import torch
+        
         self._load_model()
         
         # Tokenize inputs
@@ -75,6 +80,8 @@ class OptimizedEmbeddingModel:
     
     def _mean_pooling(self, hidden_states, attention_mask):
         """Apply mean pooling to get sentence embeddings"""
+        import torch
+        
         input_mask_expanded = attention_mask.unsqueeze(-1).expand(hidden_states.size()).float()
         return torch.sum(hidden_states * input_mask_expanded, 1) / torch.clamp(input_mask_expanded.sum(1), min=1e-9)
     
@@ -1,15 +1,27 @@
-from datetime import datetime, timezone
+import asyncio
+import logging
+from datetime import datetime
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
-from beanie import Document as BeanieDocument, init_beanie
+import msgspec
+import zstandard
+from bson import ObjectId
+from beanie import Document as BeanieDocument, PydanticObjectId, init_beanie
 from pydantic import Field
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import IndexModel, ASCENDING, DESCENDING
 
 from ..config import get_settings
+from .clock import now_utc
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# zstd contexts are reused across calls; they are not thread-safe but all
+# chunk I/O happens on the event loop thread.
+_chunk_compressor = zstandard.ZstdCompressor(level=3)
+_chunk_decompressor = zstandard.ZstdDecompressor()
 
 mongodb_client: Optional[AsyncIOMotorClient] = None
 
@@ -59,26 +71,32 @@ class Document(BeanieDocument):
     record_status: int = 1
     
     # Timestamps
-    uploaded_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    uploaded_at: datetime = Field(default_factory=now_utc)
     processed_at: Optional[datetime] = None
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=now_utc)
     
     class Settings:
         name = "documents"
         indexes = [
-            IndexModel([("user_id", ASCENDING)]),
+            # Serves owner-scoped lookups by _id and the newest-first list (sorted on _id)
+            IndexModel([("user_id", ASCENDING), ("record_status", ASCENDING), ("_id", DESCENDING)]),
             IndexModel([("status", ASCENDING)]),
             IndexModel([("record_status", ASCENDING)]),
             IndexModel([("file_type", ASCENDING)]),
             IndexModel([("uploaded_at", DESCENDING)]),
+            # A user's latest document change, for the chat search cache key
+            IndexModel([("user_id", ASCENDING), ("updated_at", DESCENDING)]),
+            # Latest change across all documents, for the backup stats ETag
+            IndexModel([("updated_at", DESCENDING)]),
             IndexModel([("filename", ASCENDING)]),
         ]
 
 
 class Chunk(BeanieDocument):
     
-    # Content
-    content: str
+    # Content (stored compressed in ChunkContent, keyed by this chunk's _id)
+    content_ref: Optional[str] = None
+    content: Optional[str] = None  # Inline text of chunks written before ChunkContent; unset on new chunks
     embedding_id: Optional[str] = None  # Reference to vector store
     
     # Position information
@@ -94,7 +112,7 @@ class Chunk(BeanieDocument):
     document_id: str  # Reference to Document._id
     
     # Timestamps
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=now_utc)
     
     class Settings:
         name = "chunks"
@@ -106,6 +124,15 @@ class Chunk(BeanieDocument):
         ]
 
 
+class ChunkContent(BeanieDocument):
+    
+    # `id` is the owning Chunk's _id
+    content: bytes  # zstd-compressed UTF-8 text
+    
+    class Settings:
+        name = "chunk_contents"
+
+
 class Conversation(BeanieDocument):
     
     # Conversation details
@@ -118,13 +145,14 @@ class Conversation(BeanieDocument):
     user_id: str  # Reference to PostgreSQL User.id
     
     # Timestamps
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=now_utc)
+    updated_at: datetime = Field(default_factory=now_utc)
     
     class Settings:
         name = "conversations"
         indexes = [
-            IndexModel([("user_id", ASCENDING)]),
+            # Serves the per-user list (newest activity first) and its count/ETag queries
+            IndexModel([("user_id", ASCENDING), ("updated_at", DESCENDING)]),
             IndexModel([("created_at", DESCENDING)]),
             IndexModel([("updated_at", DESCENDING)]),
         ]
@@ -145,12 +173,13 @@ class Message(BeanieDocument):
     user_id: str  # Reference to PostgreSQL User.id
     
     # Timestamps
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=now_utc)
     
     class Settings:
         name = "messages"
         indexes = [
-            IndexModel([("conversation_id", ASCENDING)]),
+            # Serves history reads and the latest-messages lookup in the conversation list
+            IndexModel([("conversation_id", ASCENDING), ("created_at", DESCENDING)]),
             IndexModel([("user_id", ASCENDING)]),
             IndexModel([("role", ASCENDING)]),
             IndexModel([("created_at", DESCENDING)]),
@@ -177,14 +206,18 @@ class QueryLog(BeanieDocument):
     user_id: str  # Reference to PostgreSQL User.id
     
     # Timestamps
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=now_utc)
     
     class Settings:
         name = "query_logs"
         indexes = [
             IndexModel([("user_id", ASCENDING)]),
             IndexModel([("conversation_id", ASCENDING)]),
-            IndexModel([("created_at", DESCENDING)]),
+            IndexModel(
+                [("created_at", ASCENDING)],
+                expireAfterSeconds=settings.query_log_ttl_seconds,
+                name="ttl_created_at",
+            ),
             IndexModel([("response_time", ASCENDING)]),
             IndexModel([("llm_provider", ASCENDING)]),
         ]
@@ -224,10 +257,134 @@ async def init_mongodb_db():
         document_models=[
             Document,
             Chunk,
+            ChunkContent,
             Conversation,
             Message,
             QueryLog
         ]
     )
     
-    print("✅ MongoDB initialized with Beanie ODM") 
\ No newline at end of file
+    logger.info("MongoDB initialized with Beanie ODM")
+
+
+class ChunkRaw(msgspec.Struct, kw_only=True):
+    """
+    Write-path shadow of Chunk.
+    
+    Encoded with msgspec and inserted through the raw Motor collection, so bulk
+    ingest skips Pydantic validation. Reads still go through the Beanie model.
+    """
+    content: str
+    chunk_index: int
+    document_id: str
+    embedding_id: Optional[str] = None
+    page_number: Optional[int] = None
+    start_char: Optional[int] = None
+    end_char: Optional[int] = None
+    chunk_metadata: Optional[Dict[str, Any]] = None
+    created_at: datetime = msgspec.field(default_factory=now_utc)
+
+
+async def bulk_insert_chunks(chunks: List[ChunkRaw]) -> List[str]:
+    """
+    Insert chunks and their compressed content with one insert_many each.
+    
+    The two collections are written concurrently; readers already treat a
+    chunk whose content is not stored yet as having no text.
+    
+    Args:
+        chunks: Chunks to insert
+        
+    Returns:
+        List[str]: Ids of the inserted chunks, in input order
+    """
+    if not chunks:
+        return []
+    
+    chunk_docs = []
+    content_docs = []
+    for chunk in chunks:
+        chunk_id = ObjectId()
+        chunk_doc = msgspec.to_builtins(chunk, builtin_types=(datetime,))
+        content = chunk_doc.pop("content")
+        chunk_doc["_id"] = chunk_id
+        chunk_doc["content_ref"] = str(chunk_id)
+        chunk_docs.append(chunk_doc)
+        content_docs.append({"_id": chunk_id, "content": _chunk_compressor.compress(content.encode("utf-8"))})
+    
+    await asyncio.gather(
+        ChunkContent.get_motor_collection().insert_many(
+            content_docs, ordered=False, bypass_document_validation=True
+        ),
+        Chunk.get_motor_collection().insert_many(
+            chunk_docs, ordered=False, bypass_document_validation=True
+        )
+    )
+    return [str(chunk_doc["_id"]) for chunk_doc in chunk_docs]
+
+
+async def delete_chunks(document_id: str) -> int:
+    """
+    Delete every chunk of a document together with its compressed content.
+    
+    Args:
+        document_id: Document whose chunks should be removed
+        
+    Returns:
+        int: Number of chunks deleted
+    """
+    rows = await Chunk.get_motor_collection().find(
+        {"document_id": document_id}, {"_id": 1}
+    ).to_list(length=None)
+    if not rows:
+        return 0
+    
+    chunk_ids = [row["_id"] for row in rows]
+    await ChunkContent.get_motor_collection().delete_many({"_id": {"$in": chunk_ids}})
+    result = await Chunk.get_motor_collection().delete_many({"document_id": document_id})
+    return result.deleted_count
+
+
+async def get_chunk_text(chunk: Chunk) -> Optional[str]:
+    """
+    Load and decompress the text of a chunk.
+    
+    Args:
+        chunk: Chunk whose content should be fetched
+        
+    Returns:
+        Optional[str]: Chunk text, or None if no content is stored
+    """
+    if not chunk.content_ref:
+        return chunk.content
+    chunk_content = await ChunkContent.get(PydanticObjectId(chunk.content_ref))
+    if not chunk_content:
+        return None
+    return _chunk_decompressor.decompress(chunk_content.content).decode("utf-8")
+
+
+async def get_chunk_texts(chunks: List[Chunk]) -> Dict[str, str]:
+    """
+    Load and decompress the text of several chunks with a single query.
+    
+    Chunks written before ChunkContent existed have no `content_ref`; their
+    inline text is returned instead.
+    
+    Args:
+        chunks: Chunks whose content should be fetched
+        
+    Returns:
+        Dict[str, str]: Chunk text keyed by chunk id
+    """
+    texts = {str(chunk.id): chunk.content for chunk in chunks if not chunk.content_ref and chunk.content}
+    chunk_ids_by_ref = {chunk.content_ref: str(chunk.id) for chunk in chunks if chunk.content_ref}
+    if not chunk_ids_by_ref:
+        return texts
+    contents = await ChunkContent.find(
+        {"_id": {"$in": [PydanticObjectId(ref) for ref in chunk_ids_by_ref]}}
+    ).to_list()
+    for chunk_content in contents:
+        texts[chunk_ids_by_ref[str(chunk_content.id)]] = (
+            _chunk_decompressor.decompress(chunk_content.content).decode("utf-8")
+        )
+    return texts
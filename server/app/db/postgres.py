@@ -1,23 +1,49 @@
 from enum import Enum
+import logging
 import uuid
 from datetime import datetime, timezone
 
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import Column, String, Index, JSON
+from sqlalchemy.pool import NullPool
+from sqlalchemy import Column, String, Index, JSON, func, text
 from sqlalchemy.dialects.postgresql import TIMESTAMP
 from databases import Database
 
 from ..config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_connect_args = {
+    "server_settings": {
+        "tcp_keepalives_idle": "60",
+        "tcp_keepalives_interval": "10"
+    }
+}
+
+if settings.postgres_pgbouncer:
+    # PgBouncer pools the server connections and may hand each transaction a
+    # different one, so named prepared statements cannot be cached client-side
+    _pool_args = {"poolclass": NullPool}
+    _connect_args.update(statement_cache_size=0, prepared_statement_cache_size=0)
+else:
+    _pool_args = {
+        "pool_size": settings.postgres_pool_size,
+        "max_overflow": settings.postgres_max_overflow,
+        "pool_timeout": settings.postgres_pool_timeout,
+        "pool_pre_ping": True,  # Drop connections the server or a proxy closed while idle
+        "pool_recycle": settings.postgres_pool_recycle
+    }
 
 # Create async engine
 async_engine = create_async_engine(
     settings.postgres_url,
     echo=settings.debug,
-    future=True
+    future=True,
+    connect_args=_connect_args,
+    **_pool_args
 )
 
 # Create async session factory
@@ -67,6 +93,8 @@ class User(Base):
         Index('idx_user_status', 'status'),
         Index('idx_user_role', 'role'),
         Index('idx_user_created', 'created_at'),
+        # Case-insensitive uniqueness; registration relies on it via ON CONFLICT DO NOTHING
+        Index('uq_user_email_lower', func.lower(email), unique=True),
     )
 
 async def get_postgres_database() -> AsyncSession:
@@ -87,6 +115,15 @@ async def init_postgres_db():
     async with async_engine.begin() as conn:
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
+    
+    # create_all skips indexes of tables that already exist
+    try:
+        async with async_engine.begin() as conn:
+            await conn.execute(text(
+                'CREATE UNIQUE INDEX IF NOT EXISTS uq_user_email_lower ON "User" (lower(email))'
+            ))
+    except Exception as e:
+        logger.warning(f"Could not create uq_user_email_lower (emails differing only in case?): {str(e)}")
 
 async def connect_to_postgres():
     """Connect to PostgreSQL database."""
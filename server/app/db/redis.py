@@ -0,0 +1,36 @@
+"""
+Redis connection used for state shared across worker processes
+(distributed rate limiting and the L2 LLM response cache).
+"""
+
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from ..config import get_settings
+
+settings = get_settings()
+
+redis_client: Optional[Redis] = None
+
+
+def get_redis() -> Redis:
+    """
+    Get the shared Redis client, creating it on first use.
+    
+    The client connects lazily, so calling this at import time is safe.
+    
+    Returns:
+        Redis: Async Redis client
+    """
+    global redis_client
+    if redis_client is None:
+        redis_client = Redis.from_url(settings.redis_url)
+    return redis_client
+
+
+async def disconnect_from_redis():
+    global redis_client
+    if redis_client is not None:
+        await redis_client.close()
+        redis_client = None
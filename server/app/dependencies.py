@@ -3,6 +3,7 @@ Dependency injection for FastAPI routes and controllers.
 Handles shared resources like vector store to avoid circular imports.
 """
 
+import asyncio
 import logging
 from typing import Optional
 from .db.milvus_vector_store import MilvusVectorStore
@@ -11,18 +12,24 @@ logger = logging.getLogger(__name__)
 
 # Global vector store instance
 _vector_store_manager: Optional[MilvusVectorStore] = None
+_vector_store_lock = asyncio.Lock()
 
 async def get_vector_store() -> MilvusVectorStore:
     """
     Get vector store instance with lazy initialization.
-    This saves memory during startup by only initializing when needed.
+    This saves memory during startup by only initializing when needed;
+    set VECTOR_STORE_EAGER_INIT=true to create it at startup instead.
     """
     global _vector_store_manager
     if _vector_store_manager is None:
-        logger.info("🔄 Initializing vector store on first use...")
-        _vector_store_manager = MilvusVectorStore()
-        await _vector_store_manager.initialize()
-        logger.info("✅ Vector store initialized successfully")
+        # Concurrent first requests must not each open their own Milvus connection
+        async with _vector_store_lock:
+            if _vector_store_manager is None:
+                logger.info("🔄 Initializing vector store on first use...")
+                vector_store = MilvusVectorStore()
+                await vector_store.initialize()
+                _vector_store_manager = vector_store
+                logger.info("✅ Vector store initialized successfully")
     return _vector_store_manager
 
 def set_vector_store(vector_store: MilvusVectorStore) -> None:
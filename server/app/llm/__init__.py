@@ -6,11 +6,16 @@ currently supporting Groq with round-robin API key management.
 """
 
 from .llm_manager import LLMManager
-from .providers import GroqProvider, LLMResponse, BaseLLMProvider
+from .providers import GroqProvider, LLMResponse, BaseLLMProvider, get_shared_client, close_shared_client
+from .cache import LLMCache, llm_response_cache
 
 __all__ = [
     "LLMManager",
     "GroqProvider", 
     "LLMResponse",
-    "BaseLLMProvider"
+    "BaseLLMProvider",
+    "get_shared_client",
+    "close_shared_client",
+    "LLMCache",
+    "llm_response_cache"
 ] 
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""
+LLM Response Cache
+
+Exact-match cache for deterministic LLM completions with LRU eviction, TTL
+expiry and single-flight in-flight futures so concurrent identical misses hit
+the API once.
+
+Entries live in an in-process L1 and, when configured, a Redis L2 shared by
+all worker processes. Cached values must be JSON-serializable.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+import orjson
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(Protocol):
+    """Storage tier used by LLMCache."""
+
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    async def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        ...
+
+
+class MemoryBackend:
+    """In-process LRU + TTL store."""
+
+    def __init__(self, max_entries: int = 500):
+        """
+        Initialize the store.
+
+        Args:
+            max_entries: Maximum number of entries before LRU eviction
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Redis store shared across worker processes; values are orjson-encoded."""
+
+    def __init__(self, redis, prefix: str = "llm:"):
+        """
+        Initialize the store.
+
+        Args:
+            redis: redis.asyncio client
+            prefix: Key prefix for cache entries
+        """
+        self.redis = redis
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.redis.get(self.prefix + key)
+        return orjson.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        await self.redis.set(self.prefix + key, orjson.dumps(value), ex=max(1, int(ttl_seconds)))
+
+
+class LLMCache:
+    """Two-tier (L1 memory, optional L2) cache of LLM responses keyed by request fingerprint."""
+
+    def __init__(
+        self,
+        max_entries: int = 500,
+        ttl_seconds: float = 3600.0,
+        l2: Optional[CacheBackend] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of responses kept in the in-process tier
+            ttl_seconds: Seconds a cached response stays fresh
+            l2: Optional shared backend consulted on L1 misses
+        """
+        self.ttl_seconds = ttl_seconds
+        self.l1 = MemoryBackend(max_entries)
+        self.l2 = l2
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def make_key(
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """
+        Build the cache key for a completion request.
+
+        Args:
+            model: Model name
+            messages: Chat messages
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+
+        Returns:
+            str: SHA-256 hex digest of the request
+        """
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Return a fresh cached value from L1, then L2, or None.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Optional[Any]: Cached value if present and not expired
+        """
+        value = await self.l1.get(key)
+        if value is not None or self.l2 is None:
+            return value
+
+        try:
+            value = await self.l2.get(key)
+        except Exception as e:
+            logger.warning("LLM cache L2 read failed: %s", e)
+            return None
+
+        if value is not None:
+            await self.l1.set(key, value, self.ttl_seconds)
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        """
+        Store a value in every tier.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value to cache
+        """
+        await self.l1.set(key, value, self.ttl_seconds)
+        if self.l2 is not None:
+            try:
+                await self.l2.set(key, value, self.ttl_seconds)
+            except Exception as e:
+                logger.warning("LLM cache L2 write failed: %s", e)
+
+    def inflight(self, key: str) -> Optional[asyncio.Future]:
+        """
+        Get the pending result of an identical request already being computed.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Optional[asyncio.Future]: Future resolving to the cached value, or None
+        """
+        return self._inflight.get(key)
+
+    def begin(self, key: str) -> asyncio.Future:
+        """
+        Register this caller as the one computing `key`.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            asyncio.Future: Future that concurrent callers will await
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    def end(self, key: str) -> None:
+        """Forget the in-flight computation for a key."""
+        self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all responses cached in this process."""
+        self.l1.clear()
+
+    def __len__(self) -> int:
+        return len(self.l1)
+
+
+def _default_l2() -> Optional[CacheBackend]:
+    """Build the shared L2 tier when LLM_CACHE_BACKEND=redis."""
+    if get_settings().llm_cache_backend != "redis":
+        return None
+    from ..db.redis import get_redis
+    return RedisBackend(get_redis())
+
+
+# Process-wide cache: providers are recreated per request, the cache is not
+llm_response_cache = LLMCache(l2=_default_l2())
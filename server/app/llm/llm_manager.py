@@ -30,6 +30,8 @@ class LLMManager:
         self.tenant_id = tenant_id
         self.config = get_tenant_llm_config(tenant_id)
         self.providers: Dict[str, BaseLLMProvider] = {}
+        # Name of the provider that served the last completed stream
+        self.streamed_by: Optional[str] = None
         self._initialize_providers()
     
     def _initialize_providers(self):
@@ -38,12 +40,12 @@ class LLMManager:
             # Initialize Groq provider (primary and default)
             if "groq" in self.config and self.config["groq"]["api_keys"]:
                 self.providers["groq"] = GroqProvider(self.config["groq"])
-                logger.info(f"Initialized Groq provider with {len(self.config['groq']['api_keys'])} API keys")
+                logger.info("Initialized Groq provider with %d API keys", len(self.config['groq']['api_keys']))
             else:
                 logger.warning("No valid Groq API keys found in configuration")
                 
         except Exception as e:
-            logger.error(f"Error initializing LLM providers: {e}")
+            logger.error("Error initializing LLM providers: %s", e)
     
     def _get_provider_order(self) -> List[str]:
         """
@@ -90,14 +92,14 @@ class LLMManager:
         for provider_name in provider_order:
             try:
                 provider = self.providers[provider_name]
-                logger.info(f"Attempting to generate response using {provider_name}")
+                logger.info("Attempting to generate response using %s", provider_name)
                 
                 response = await provider.generate_response(messages, **kwargs)
-                logger.info(f"Successfully generated response using {provider_name}")
+                logger.info("Successfully generated response using %s", provider_name)
                 return response
                 
             except Exception as e:
-                logger.warning(f"Provider {provider_name} failed: {e}")
+                logger.warning("Provider %s failed: %s", provider_name, e)
                 last_error = e
                 continue
         
@@ -134,16 +136,17 @@ class LLMManager:
         for provider_name in provider_order:
             try:
                 provider = self.providers[provider_name]
-                logger.info(f"Attempting to stream response using {provider_name}")
+                logger.info("Attempting to stream response using %s", provider_name)
                 
                 async for chunk in provider.stream_response(messages, **kwargs):
                     yield chunk
                 
-                logger.info(f"Successfully streamed response using {provider_name}")
+                logger.info("Successfully streamed response using %s", provider_name)
+                self.streamed_by = provider_name
                 return
                 
             except Exception as e:
-                logger.warning(f"Provider {provider_name} failed: {e}")
+                logger.warning("Provider %s failed: %s", provider_name, e)
                 last_error = e
                 continue
         
@@ -167,10 +170,10 @@ class LLMManager:
                 test_messages = [{"role": "user", "content": "Hello"}]
                 await provider.generate_response(test_messages, max_tokens=10)
                 health_status[provider_name] = True
-                logger.info(f"Provider {provider_name} is healthy")
+                logger.info("Provider %s is healthy", provider_name)
             except Exception as e:
                 health_status[provider_name] = False
-                logger.warning(f"Provider {provider_name} health check failed: {e}")
+                logger.warning("Provider %s health check failed: %s", provider_name, e)
         
         return health_status
     
@@ -190,7 +193,7 @@ class LLMManager:
                 else:
                     stats[provider_name] = {"status": "available"}
             except Exception as e:
-                logger.warning(f"Error getting stats for {provider_name}: {e}")
+                logger.warning("Error getting stats for %s: %s", provider_name, e)
                 stats[provider_name] = {"status": "error", "error": str(e)}
         
         return stats
@@ -201,6 +204,6 @@ class LLMManager:
             try:
                 if hasattr(provider, 'cleanup'):
                     await provider.cleanup()
-                logger.info(f"Cleaned up provider {provider_name}")
+                logger.info("Cleaned up provider %s", provider_name)
             except Exception as e:
-                logger.warning(f"Error cleaning up provider {provider_name}: {e}") 
\ No newline at end of file
+                logger.warning("Error cleaning up provider %s: %s", provider_name, e) 
\ No newline at end of file
@@ -8,13 +8,64 @@ import asyncio
 import time
 import logging
 import httpx
+import numpy as np
+import orjson
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from typing import List, Dict, Optional, AsyncGenerator, Any
-from datetime import datetime, timedelta
+
+from .cache import LLMCache, llm_response_cache
 
 logger = logging.getLogger(__name__)
 
+# Only near-greedy sampling is deterministic enough to serve from cache
+CACHEABLE_MAX_TEMPERATURE = 0.01
+
+# Server-sent event framing used by the streaming completions API
+_DATA_PREFIX = b"data: "
+_DONE = b"[DONE]"
+
+# Process-wide HTTP client, created at startup and closed at shutdown
+_shared_client: Optional[httpx.AsyncClient] = None
+_http_version_logged = False
+
+
+def _log_http_version(response: httpx.Response):
+    """Log the protocol negotiated with the LLM API once per process."""
+    global _http_version_logged
+    if not _http_version_logged:
+        _http_version_logged = True
+        logger.info("LLM API connection negotiated %s", response.http_version)
+
+
+def get_shared_client() -> httpx.AsyncClient:
+    """
+    Get the process-wide HTTP client for LLM API calls, creating it if needed.
+    
+    Returns:
+        httpx.AsyncClient: Pooled keep-alive client with per-stage timeouts
+    """
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=1000,
+                max_keepalive_connections=100,
+                keepalive_expiry=60.0  # keep idle connections between user turns
+            ),
+            timeout=httpx.Timeout(connect=5.0, read=55.0, write=10.0, pool=5.0)
+        )
+    return _shared_client
+
+
+async def close_shared_client():
+    """Close the process-wide HTTP client."""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
+
 
 @dataclass
 class LLMResponse:
@@ -26,28 +77,19 @@ class LLMResponse:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
-class RateLimitTracker:
-    """Tracks rate limiting for individual API keys."""
-    requests_made: int = 0
-    tokens_used: int = 0
-    last_reset: datetime = field(default_factory=datetime.now)
-    is_exhausted: bool = False
-    exhausted_until: Optional[datetime] = None
-
-
 class BaseLLMProvider(ABC):
     """Base class for all LLM providers."""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], client: Optional[httpx.AsyncClient] = None):
         """
         Initialize the LLM provider.
         
         Args:
             config: Provider-specific configuration dictionary
+            client: HTTP client (defaults to the process-wide shared client)
         """
         self.config = config
-        self.client = httpx.AsyncClient(timeout=60.0)
+        self.client = client or get_shared_client()
     
     @abstractmethod
     async def generate_response(
@@ -68,22 +110,29 @@ class BaseLLMProvider(ABC):
         pass
     
     async def cleanup(self):
-        """Clean up resources."""
-        if self.client:
-            await self.client.aclose()
+        """Clean up resources (the shared HTTP client is closed at shutdown)."""
+        pass
 
 
 class GroqProvider(BaseLLMProvider):
     """Groq LLM provider with round-robin API key management and rate limiting."""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[LLMCache] = None
+    ):
         """
         Initialize Groq provider.
         
         Args:
             config: Groq configuration containing api_keys, model, etc.
+            client: Shared HTTP client
+            cache: Response cache (defaults to the process-wide cache)
         """
-        super().__init__(config)
+        super().__init__(config, client)
+        self.cache = cache if cache is not None else llm_response_cache
         self.api_keys = config.get("api_keys", [])
         self.model = config.get("model", "llama-3.1-8b-instant")
         self.base_url = config.get("base_url", "https://api.groq.com")
@@ -91,55 +140,125 @@ class GroqProvider(BaseLLMProvider):
         self.rate_limit_rpm = config.get("rate_limit_rpm", 30)
         self.rate_limit_tpm = config.get("rate_limit_tpm", 6000)
         
-        # Track rate limits per API key
-        self.rate_trackers: Dict[str, RateLimitTracker] = {
-            key: RateLimitTracker() for key in self.api_keys
+        # Request constants, built once instead of per call
+        self._endpoint_url = f"{self.base_url}/openai/v1/chat/completions"
+        self._headers_cache: Dict[str, Dict[str, str]] = {
+            key: {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
+            for key in self.api_keys
         }
-        self.current_key_index = 0
+        
+        # Per-key rate limit state as parallel arrays indexed like api_keys
+        n_keys = len(self.api_keys)
+        now = time.monotonic()
+        self._key_index: Dict[str, int] = {key: i for i, key in enumerate(self.api_keys)}
+        self._req = np.zeros(n_keys, dtype=np.int32)
+        self._tok = np.zeros(n_keys, dtype=np.int32)
+        self._last_reset = np.full(n_keys, now, dtype=np.float64)
+        self._exhausted_until = np.zeros(n_keys, dtype=np.float64)
+        
+        # Weighted round-robin state (IPVS style): last index, current weight,
+        # and the gcd/max of the weights they were computed for
+        self._wrr_index = -1
+        self._wrr_cw = 0
+        self._wrr_weights = np.zeros(0, dtype=np.int64)
+        self._wrr_gcd = 1
+        self._wrr_max = 0
         
         if not self.api_keys:
             raise ValueError("No Groq API keys provided")
     
     def _get_next_available_key(self) -> Optional[str]:
         """
-        Get the next available API key using round-robin with rate limiting.
+        Get the next available API key using weighted round-robin.
+        
+        Each key is weighted by its remaining request headroom for the current
+        minute (capped by its remaining token headroom), so keys with more
+        capacity take proportionally more traffic.
         
         Returns:
             Optional[str]: Available API key or None if all exhausted
         """
-        now = datetime.now()
+        now = time.monotonic()
         
         # First, check if any exhausted keys can be reset
-        for key, tracker in self.rate_trackers.items():
-            if tracker.is_exhausted and tracker.exhausted_until and now > tracker.exhausted_until:
-                tracker.is_exhausted = False
-                tracker.exhausted_until = None
-                logger.info(f"API key reset: {key[:10]}...")
-        
-        # Find next available key starting from current index
-        for i in range(len(self.api_keys)):
-            key_index = (self.current_key_index + i) % len(self.api_keys)
-            key = self.api_keys[key_index]
-            tracker = self.rate_trackers[key]
-            
-            # Check if key is not exhausted and within rate limits
-            if not tracker.is_exhausted:
-                # Reset counters if enough time has passed
-                if now - tracker.last_reset > timedelta(minutes=1):
-                    tracker.requests_made = 0
-                    tracker.tokens_used = 0
-                    tracker.last_reset = now
-                
-                # Check rate limits
-                if (tracker.requests_made < self.rate_limit_rpm and 
-                    tracker.tokens_used < self.rate_limit_tpm):
-                    
-                    self.current_key_index = (key_index + 1) % len(self.api_keys)
-                    return key
+        recovered = (self._exhausted_until > 0) & (self._exhausted_until <= now)
+        if recovered.any():
+            for i in np.flatnonzero(recovered):
+                logger.info(f"API key reset: {self.api_keys[i][:10]}...")
+            self._exhausted_until[recovered] = 0
+        
+        key_index = self._wrr_pick(self._key_weights(now))
+        if key_index is not None:
+            return self.api_keys[key_index]
+        
+        # No key has local headroom left; let the API be the judge
+        available = self._exhausted_until <= now
+        if available.any():
+            return self.api_keys[int(np.argmax(available))]
         
         logger.warning("All API keys are exhausted")
         return None
     
+    def _key_weights(self, now: float) -> np.ndarray:
+        """
+        Compute the current weight of every API key.
+        
+        Args:
+            now: Current time, used to reset per-minute counters
+            
+        Returns:
+            np.ndarray: Remaining RPM headroom per key, capped by TPM headroom (0 if exhausted)
+        """
+        # Reset counters if enough time has passed
+        stale = now - self._last_reset > 60
+        if stale.any():
+            self._req[stale] = 0
+            self._tok[stale] = 0
+            self._last_reset[stale] = now
+        
+        weights = np.maximum(0, self.rate_limit_rpm - self._req.astype(np.int64))
+        if self.rate_limit_tpm:
+            tpm_left = np.maximum(0, self.rate_limit_tpm - self._tok.astype(np.int64))
+            weights = np.minimum(weights, np.ceil(self.rate_limit_rpm * tpm_left / self.rate_limit_tpm).astype(np.int64))
+        weights[self._exhausted_until > now] = 0
+        return weights
+    
+    def _wrr_pick(self, weights: np.ndarray) -> Optional[int]:
+        """
+        Pick a key index with interleaved weighted round-robin.
+        
+        Args:
+            weights: Weight per key; keys with weight 0 are skipped
+            
+        Returns:
+            Optional[int]: Index of the chosen key, or None if every weight is 0
+        """
+        weights = np.asarray(weights, dtype=np.int64)
+        if not np.array_equal(weights, self._wrr_weights):
+            self._wrr_weights = weights
+            self._wrr_max = int(weights.max(initial=0))
+            self._wrr_gcd = int(np.gcd.reduce(weights)) or 1
+            self._wrr_cw = min(self._wrr_cw, self._wrr_max)
+        
+        if self._wrr_max == 0:
+            return None
+        
+        # Plain Python ints for the scan; wrap the cursor with a compare, not a modulo
+        last = len(weights) - 1
+        weight_list = weights.tolist()
+        index, cw = self._wrr_index, self._wrr_cw
+        while True:
+            index += 1
+            if index > last:
+                index = 0
+            if index == 0:
+                cw -= self._wrr_gcd
+                if cw <= 0:
+                    cw = self._wrr_max
+            if weight_list[index] >= cw:
+                self._wrr_index, self._wrr_cw = index, cw
+                return index
+    
     def _record_usage(self, api_key: str, tokens_used: int = 0):
         """
         Record usage for an API key.
@@ -148,10 +267,10 @@ class GroqProvider(BaseLLMProvider):
             api_key: The API key that was used
             tokens_used: Number of tokens consumed
         """
-        if api_key in self.rate_trackers:
-            tracker = self.rate_trackers[api_key]
-            tracker.requests_made += 1
-            tracker.tokens_used += tokens_used
+        i = self._key_index.get(api_key)
+        if i is not None:
+            self._req[i] += 1
+            self._tok[i] += tokens_used
     
     def _mark_key_exhausted(self, api_key: str, retry_after: int = 60):
         """
@@ -161,11 +280,10 @@ class GroqProvider(BaseLLMProvider):
             api_key: The API key to mark as exhausted
             retry_after: Seconds to wait before retrying
         """
-        if api_key in self.rate_trackers:
-            tracker = self.rate_trackers[api_key]
-            tracker.is_exhausted = True
-            tracker.exhausted_until = datetime.now() + timedelta(seconds=retry_after)
-            logger.warning(f"API key exhausted until {tracker.exhausted_until}: {api_key[:10]}...")
+        i = self._key_index.get(api_key)
+        if i is not None:
+            self._exhausted_until[i] = time.monotonic() + retry_after
+            logger.warning("API key exhausted for %ss: %s...", retry_after, api_key[:10])
     
     async def generate_response(
         self, 
@@ -175,10 +293,76 @@ class GroqProvider(BaseLLMProvider):
         """
         Generate a response using Groq API with round-robin key management.
         
+        Deterministic requests (temperature <= CACHEABLE_MAX_TEMPERATURE) are
+        served from the response cache; concurrent identical misses share one
+        API call.
+        
         Args:
             messages: List of message dictionaries
             **kwargs: Additional parameters
             
+        Returns:
+            LLMResponse: Generated response
+        """
+        max_tokens = kwargs.get("max_tokens", self.max_tokens)
+        temperature = kwargs.get("temperature", 0.7)
+        
+        if temperature > CACHEABLE_MAX_TEMPERATURE:
+            return await self._request_completion(messages, max_tokens, temperature)
+        
+        key = self.cache.make_key(self.model, messages, temperature, max_tokens)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return self._cache_hit(cached)
+        
+        # Identical request already in flight: wait for its result
+        pending = self.cache.inflight(key)
+        if pending is not None:
+            return self._cache_hit(await asyncio.shield(pending))
+        
+        future = self.cache.begin(key)
+        try:
+            response = await self._request_completion(messages, max_tokens, temperature)
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+            else:
+                future.set_exception(Exception("Request for identical completion was cancelled"))
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        else:
+            cached = asdict(response)
+            future.set_result(cached)
+            await self.cache.set(key, cached)
+            return response
+        finally:
+            self.cache.end(key)
+    
+    @staticmethod
+    def _cache_hit(cached: Dict[str, Any]) -> LLMResponse:
+        """Rebuild a cached response and flag it as a cache hit."""
+        return LLMResponse(
+            content=cached["content"],
+            provider=cached["provider"],
+            model=cached["model"],
+            usage=dict(cached["usage"]),
+            metadata={**cached["metadata"], "cache_hit": True}
+        )
+    
+    async def _request_completion(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float
+    ) -> LLMResponse:
+        """
+        Call the Groq chat completions API.
+        
+        Args:
+            messages: List of message dictionaries
+            max_tokens: Completion token limit
+            temperature: Sampling temperature
+            
         Returns:
             LLMResponse: Generated response
         """
@@ -186,25 +370,21 @@ class GroqProvider(BaseLLMProvider):
         if not api_key:
             raise Exception("No available Groq API keys")
         
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "model": self.model,
             "messages": messages,
-            "max_tokens": kwargs.get("max_tokens", self.max_tokens),
-            "temperature": kwargs.get("temperature", 0.7),
+            "max_tokens": max_tokens,
+            "temperature": temperature,
             "stream": False
         }
         
         try:
             response = await self.client.post(
-                f"{self.base_url}/openai/v1/chat/completions",
-                headers=headers,
-                json=payload
+                self._endpoint_url,
+                headers=self._headers_cache[api_key],
+                content=orjson.dumps(payload)
             )
+            _log_http_version(response)
             
             if response.status_code == 429:
                 # Rate limit hit, mark key as exhausted
@@ -259,11 +439,6 @@ class GroqProvider(BaseLLMProvider):
         if not api_key:
             raise Exception("No available Groq API keys")
         
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "model": self.model,
             "messages": messages,
@@ -275,10 +450,11 @@ class GroqProvider(BaseLLMProvider):
         try:
             async with self.client.stream(
                 "POST",
-                f"{self.base_url}/openai/v1/chat/completions",
-                headers=headers,
-                json=payload
+                self._endpoint_url,
+                headers=self._headers_cache[api_key],
+                content=orjson.dumps(payload)
             ) as response:
+                _log_http_version(response)
                 
                 if response.status_code == 429:
                     retry_after = int(response.headers.get("retry-after", 60))
@@ -287,26 +463,24 @@ class GroqProvider(BaseLLMProvider):
                 
                 response.raise_for_status()
                 
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        data = line[6:]  # Remove "data: " prefix
-                        
-                        if data == "[DONE]":
-                            break
-                        
-                        try:
-                            import json
-                            chunk = json.loads(data)
-                            
-                            if "choices" in chunk and len(chunk["choices"]) > 0:
-                                delta = chunk["choices"][0].get("delta", {})
-                                content = delta.get("content", "")
-                                
-                                if content:
-                                    yield content
-                                    
-                        except json.JSONDecodeError:
-                            continue
+                async for data in self._iter_sse_data(response):
+                    if data == _DONE:
+                        break
+                    
+                    # Every payload is a JSON object; skip keep-alives and junk cheaply
+                    if data[:1] != b"{":
+                        continue
+                    
+                    try:
+                        chunk = orjson.loads(data)
+                    except orjson.JSONDecodeError:
+                        continue
+                    
+                    choices = chunk.get("choices")
+                    if choices:
+                        content = choices[0].get("delta", {}).get("content")
+                        if content:
+                            yield content
                 
                 # Record usage (approximate for streaming)
                 self._record_usage(api_key, 100)  # Rough estimate
@@ -318,6 +492,28 @@ class GroqProvider(BaseLLMProvider):
             logger.error(f"Groq streaming error: {e}")
             raise
     
+    @staticmethod
+    async def _iter_sse_data(response: httpx.Response) -> AsyncGenerator[bytes, None]:
+        """
+        Split a streamed SSE body into the payloads of its `data:` lines.
+        
+        Args:
+            response: Streaming HTTP response
+            
+        Yields:
+            bytes: Payload of each data line, without the prefix
+        """
+        buffer = bytearray()
+        async for raw in response.aiter_bytes():
+            buffer += raw
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.startswith(_DATA_PREFIX):
+                    yield bytes(line[6:].rstrip(b"\r"))
+        
+        if buffer.startswith(_DATA_PREFIX):
+            yield bytes(buffer[6:].rstrip(b"\r"))
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Get statistics for the Groq provider.
@@ -325,9 +521,9 @@ class GroqProvider(BaseLLMProvider):
         Returns:
             Dict[str, Any]: Provider statistics
         """
-        available_keys = sum(1 for tracker in self.rate_trackers.values() if not tracker.is_exhausted)
-        total_requests = sum(tracker.requests_made for tracker in self.rate_trackers.values())
-        total_tokens = sum(tracker.tokens_used for tracker in self.rate_trackers.values())
+        available_keys = int((self._exhausted_until <= time.monotonic()).sum())
+        total_requests = int(self._req.sum())
+        total_tokens = int(self._tok.sum())
         
         return {
             "provider": "groq",
@@ -1,31 +1,61 @@
+import math
 import time
+import asyncio
 import logging
-from datetime import datetime
-from typing import Dict, Optional
-from collections import defaultdict
+from typing import Deque, Dict, Optional, Tuple
+from collections import defaultdict, deque
+
+import orjson
 
 from fastapi import Request, Response, HTTPException, status
 from fastapi.security import HTTPBearer
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 
+from ..config import get_settings
 from ..utils.auth import verify_token
+from ..db.redis import get_redis
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_RATE_LIMIT_BODY = orjson.dumps({"detail": "Rate limit exceeded"})
+
+# Security headers added to every response, pre-encoded for the raw header list
+_SECURITY_HEADERS = {
+    "x-content-type-options": "nosniff",
+    "x-frame-options": "DENY",
+    "x-xss-protection": "1; mode=block",
+    "strict-transport-security": "max-age=31536000; includeSubDomains",
+    "referrer-policy": "strict-origin-when-cross-origin",
+    "permissions-policy": "geolocation=(), microphone=(), camera=()",
+}
+_SECURITY_HEADERS_RAW = tuple(
+    (name.encode("latin-1"), value.encode("latin-1")) for name, value in _SECURITY_HEADERS.items()
+)
 
 
 class RateLimiter:
-    """Simple in-memory rate limiter."""
+    """
+    Simple in-memory rate limiter.
+    
+    Requests are limited with a token bucket per client/endpoint holding
+    `rate_limit_requests` tokens that refill evenly over `rate_limit_window`.
+    """
     
     def __init__(self):
-        self.requests: Dict[str, list] = defaultdict(list)
-        self.blocked_ips: Dict[str, datetime] = {}
-        self.failed_logins: Dict[str, list] = defaultdict(list)
-        
         # Rate limiting configuration
         self.rate_limit_requests = 100  # requests per minute
         self.rate_limit_window = 60  # seconds
         self.login_attempts_limit = 5  # failed attempts before blocking
         self.login_block_duration = 300  # seconds (5 minutes)
+        self.sweep_interval = 60  # seconds between sweeps of idle keys
+        
+        # key -> (tokens left, monotonic time of last refill)
+        self.buckets: Dict[str, Tuple[float, float]] = {}
+        self.blocked_ips: Dict[str, float] = {}  # monotonic unblock time
+        self.failed_logins: Dict[str, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=self.login_attempts_limit)
+        )
     
     def is_allowed(self, client_ip: str, endpoint: str) -> tuple[bool, Optional[int]]:
         """
@@ -38,51 +68,172 @@ class RateLimiter:
         Returns:
             Tuple of (is_allowed, retry_after_seconds)
         """
-        now = time.time()
+        now = time.monotonic()
         key = f"{client_ip}:{endpoint}"
         
         # Check if IP is blocked
-        if client_ip in self.blocked_ips:
-            if now < self.blocked_ips[client_ip].timestamp():
-                retry_after = int(self.blocked_ips[client_ip].timestamp() - now)
-                return False, retry_after
-            else:
-                # Unblock IP
-                del self.blocked_ips[client_ip]
-        
-        # Clean old requests
-        self.requests[key] = [req_time for req_time in self.requests[key] 
-                             if now - req_time < self.rate_limit_window]
+        retry_after = self.blocked_for(client_ip, now)
+        if retry_after is not None:
+            return False, retry_after
+        
+        # Refill the bucket for the time elapsed since the last request
+        capacity = float(self.rate_limit_requests)
+        refill_rate = capacity / self.rate_limit_window
+        tokens, last = self.buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * refill_rate)
         
         # Check rate limit
-        if len(self.requests[key]) >= self.rate_limit_requests:
-            return False, self.rate_limit_window
+        if tokens < 1:
+            self.buckets[key] = (tokens, now)
+            return False, math.ceil((1 - tokens) / refill_rate)
         
-        # Record request
-        self.requests[key].append(now)
+        # Consume a token for this request
+        self.buckets[key] = (tokens - 1, now)
         return True, None
     
+    async def check(self, client_ip: str, endpoint: str) -> Tuple[bool, Optional[int]]:
+        """
+        Async entry point used by the middleware; see `is_allowed`.
+        
+        Args:
+            client_ip: Client IP address
+            endpoint: Request endpoint
+            
+        Returns:
+            Tuple of (is_allowed, retry_after_seconds)
+        """
+        return self.is_allowed(client_ip, endpoint)
+    
+    def blocked_for(self, client_ip: str, now: Optional[float] = None) -> Optional[int]:
+        """
+        Check whether an IP is blocked after repeated failed logins.
+        
+        Args:
+            client_ip: Client IP address
+            now: Current monotonic time (read from the clock if omitted)
+            
+        Returns:
+            Optional[int]: Seconds until the block lifts, or None if not blocked
+        """
+        blocked_until = self.blocked_ips.get(client_ip)
+        if blocked_until is None:
+            return None
+        
+        now = time.monotonic() if now is None else now
+        if now < blocked_until:
+            return int(blocked_until - now)
+        
+        # Unblock IP
+        del self.blocked_ips[client_ip]
+        return None
+    
     def record_failed_login(self, client_ip: str):
         """Record a failed login attempt."""
-        now = time.time()
+        now = time.monotonic()
         
-        # Clean old failed attempts
-        self.failed_logins[client_ip] = [
-            attempt_time for attempt_time in self.failed_logins[client_ip]
-            if now - attempt_time < self.login_block_duration
-        ]
+        # Ring buffer of the last `login_attempts_limit` failures; older ones fall off
+        attempts = self.failed_logins[client_ip]
+        attempts.append(now)
         
-        # Record new failed attempt
-        self.failed_logins[client_ip].append(now)
-        
-        # Block IP if too many failed attempts
-        if len(self.failed_logins[client_ip]) >= self.login_attempts_limit:
-            self.blocked_ips[client_ip] = datetime.fromtimestamp(now + self.login_block_duration)
+        # Block IP if the buffer is full and its oldest failure is inside the window
+        if len(attempts) == attempts.maxlen and attempts[0] > now - self.login_block_duration:
+            self.blocked_ips[client_ip] = now + self.login_block_duration
             logger.warning(f"Blocked IP {client_ip} due to {self.login_attempts_limit} failed login attempts")
+    
+    def sweep(self):
+        """Drop expired entries and idle keys so one-shot clients don't accumulate."""
+        now = time.monotonic()
+        
+        # A bucket idle for a full window is back to capacity, same as a missing one
+        request_cutoff = now - self.rate_limit_window
+        for key in [key for key, (_, last) in self.buckets.items() if last <= request_cutoff]:
+            del self.buckets[key]
+        
+        login_cutoff = now - self.login_block_duration
+        for client_ip in list(self.failed_logins):
+            # Only the newest failure matters: once it is stale they all are
+            if self.failed_logins[client_ip][-1] <= login_cutoff:
+                del self.failed_logins[client_ip]
+        
+        for client_ip in [ip for ip, until in self.blocked_ips.items() if until <= now]:
+            del self.blocked_ips[client_ip]
+    
+    async def run_sweeper(self):
+        """Sweep idle keys every `sweep_interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Rate limiter sweep failed: {e}")
+
 
+# Token bucket kept in a Redis hash; the server clock keeps workers consistent.
+# KEYS[1] = bucket key, ARGV = capacity, refill rate (tokens/s), ttl (s).
+# Returns {allowed (0|1), tokens left as a string}.
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+return {allowed, tostring(tokens)}
+"""
 
-# Global rate limiter instance
-rate_limiter = RateLimiter()
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Rate limiter whose request buckets live in Redis, so the limit holds across
+    all worker processes. Falls back to the in-process buckets if Redis fails.
+    
+    Failed-login tracking and IP blocks stay per-process.
+    """
+    
+    def __init__(self, redis):
+        super().__init__()
+        self.redis = redis
+        self._token_bucket = redis.register_script(_TOKEN_BUCKET_LUA)
+    
+    async def check(self, client_ip: str, endpoint: str) -> Tuple[bool, Optional[int]]:
+        retry_after = self.blocked_for(client_ip)
+        if retry_after is not None:
+            return False, retry_after
+        
+        capacity = self.rate_limit_requests
+        refill_rate = capacity / self.rate_limit_window
+        try:
+            allowed, tokens = await self._token_bucket(
+                keys=[f"rl:{client_ip}:{endpoint}"],
+                args=[capacity, refill_rate, self.rate_limit_window]
+            )
+        except Exception as e:
+            logger.warning(f"Redis rate limiting unavailable, using in-process limits: {e}")
+            return self.is_allowed(client_ip, endpoint)
+        
+        if int(allowed):
+            return True, None
+        return False, math.ceil((1 - float(tokens)) / refill_rate)
+
+
+# Global rate limiter instance (RATE_LIMIT_BACKEND=redis shares limits across workers)
+if settings.rate_limit_backend == "redis":
+    rate_limiter: RateLimiter = RedisRateLimiter(get_redis())
+else:
+    rate_limiter = RateLimiter()
 
 # OAuth2 bearer scheme
 oauth2_scheme = HTTPBearer(auto_error=False)
@@ -94,8 +245,13 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
     def __init__(self, app):
         super().__init__(app)
         
+        # Forwarded headers are only consulted behind a trusted proxy
+        self.trust_proxy_headers = settings.trust_proxy_headers
+        self._xff_key = "x-forwarded-for"
+        self._xrip_key = "x-real-ip"
+        
         # Public paths that don't require authentication
-        self.public_paths = {
+        self.public_paths = frozenset((
             "/",
             "/health",
             "/docs",
@@ -104,7 +260,14 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
             "/rag/auth/login",
             "/rag/auth/register",
             "/rag/auth/refresh"
-        }
+        ))
+        
+        # Public paths that still honour IP blocks from failed logins
+        self.auth_paths = frozenset((
+            "/rag/auth/login",
+            "/rag/auth/register",
+            "/rag/auth/refresh"
+        ))
     
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
         """
@@ -125,24 +288,33 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
             self._add_security_headers(response)
             return response
         
+        path = request.url.path
+        
+        # Skip authentication and rate limiting for public paths
+        if path in self.public_paths:
+            if path in self.auth_paths:
+                retry_after = rate_limiter.blocked_for(self._get_client_ip(request))
+                if retry_after is not None:
+                    return self._rate_limit_response(retry_after)
+            
+            response = await call_next(request)
+            self._add_security_headers(response)
+            return response
+        
         # Get client IP
         client_ip = self._get_client_ip(request)
         
         # Apply rate limiting
-        is_allowed, retry_after = rate_limiter.is_allowed(client_ip, request.url.path)
+        is_allowed, retry_after = await rate_limiter.check(client_ip, path)
         if not is_allowed:
             return self._rate_limit_response(retry_after)
         
-        # Skip authentication for public paths
-        if request.url.path in self.public_paths:
-            response = await call_next(request)
-        else:
-            # Authenticate request
-            auth_result = await self._authenticate_request(request)
-            if auth_result is not True:
-                return auth_result  # Return error response
-            
-            response = await call_next(request)
+        # Authenticate request
+        auth_result = await self._authenticate_request(request)
+        if auth_result is not True:
+            return auth_result  # Return error response
+        
+        response = await call_next(request)
         
         # Add security headers
         self._add_security_headers(response)
@@ -193,12 +365,15 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
     
     def _get_client_ip(self, request: Request) -> str:
         """Extract client IP from request."""
+        if not self.trust_proxy_headers:
+            return request.client.host if request.client else "unknown"
+        
         # Check for forwarded headers (for reverse proxies)
-        forwarded_for = request.headers.get("X-Forwarded-For")
+        forwarded_for = request.headers.get(self._xff_key)
         if forwarded_for:
             return forwarded_for.split(",")[0].strip()
         
-        real_ip = request.headers.get("X-Real-IP")
+        real_ip = request.headers.get(self._xrip_key)
         if real_ip:
             return real_ip
         
@@ -212,7 +387,7 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
             headers["Retry-After"] = str(retry_after)
         
         return Response(
-            content='{"detail":"Rate limit exceeded"}',
+            content=_RATE_LIMIT_BODY,
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             headers=headers,
             media_type="application/json"
@@ -221,17 +396,13 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
     def _auth_error_response(self, detail: str) -> Response:
         """Create authentication error response."""
         return Response(
-            content=f'{{"detail":"{detail}"}}',
+            content=orjson.dumps({"detail": detail}),
             status_code=status.HTTP_401_UNAUTHORIZED,
             headers={"WWW-Authenticate": "Bearer"},
             media_type="application/json"
         )
     
     def _add_security_headers(self, response: Response):
-        """Add security headers to response."""
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()" 
\ No newline at end of file
+        """Add security headers to response, keeping any the route already set."""
+        present = {name for name, _ in response.headers.raw}
+        response.headers.raw.extend(header for header in _SECURITY_HEADERS_RAW if header[0] not in present)
\ No newline at end of file
@@ -4,15 +4,17 @@ Error Handler Middleware
 Handles exceptions and provides consistent error responses.
 """
 
+import logging
 import traceback
 from typing import Callable
 from fastapi import Request, Response, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 
 class ErrorHandlerMiddleware(BaseHTTPMiddleware):
@@ -36,7 +38,7 @@ class ErrorHandlerMiddleware(BaseHTTPMiddleware):
             return response
             
         except HTTPException as e:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=e.status_code,
                 content={
                     "error": True,
@@ -47,7 +49,7 @@ class ErrorHandlerMiddleware(BaseHTTPMiddleware):
             )
             
         except ValueError as e:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "error": True,
@@ -61,8 +63,8 @@ class ErrorHandlerMiddleware(BaseHTTPMiddleware):
             # Log the error in production
             if settings.environment == "production":
                 # In production, log the full traceback but return generic message
-                print(f"Unhandled exception: {traceback.format_exc()}")
-                return JSONResponse(
+                logger.exception("Unhandled exception")
+                return ORJSONResponse(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     content={
                         "error": True,
@@ -72,14 +74,15 @@ class ErrorHandlerMiddleware(BaseHTTPMiddleware):
                     }
                 )
             else:
-                # In development, return detailed error info
-                return JSONResponse(
+                # In development, return detailed error info (stack walk only when debugging)
+                tb = traceback.format_exc() if settings.debug else None
+                return ORJSONResponse(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     content={
                         "error": True,
                         "message": str(e),
                         "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
                         "path": str(request.url.path),
-                        "traceback": traceback.format_exc() if settings.debug else None
+                        "traceback": tb
                     }
                 ) 
\ No newline at end of file
@@ -17,12 +17,15 @@ from .document import (
 
 from .chat import (
     ChatRequest,
+    ChatRequestFast,
     ChatResponse,
     MessageResponse,
     SourceResponse,
     ConversationResponse
 )
 
+from .construct import from_orm_trusted
+
 __all__ = [
     "UserResponse",
     "UserCreate",
@@ -36,8 +39,10 @@ __all__ = [
     "ChunkResponse",
     "UploadResponse",
     "ChatRequest",
+    "ChatRequestFast",
     "ChatResponse",
     "MessageResponse",
     "SourceResponse",
-    "ConversationResponse"
+    "ConversationResponse",
+    "from_orm_trusted"
 ]
\ No newline at end of file
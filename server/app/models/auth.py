@@ -1,42 +1,76 @@
-from typing import Optional
+import re
+from typing import Annotated
 from datetime import datetime
-from pydantic import Field, EmailStr, BaseModel
+from pydantic import AfterValidator, Field, EmailStr, BaseModel, ConfigDict
+from pydantic_core import PydanticCustomError
+
+# Lets auth models be built from ORM rows. Whitespace stripping is left off: it
+# would silently change passwords.
+AUTH_MODEL_CONFIG = ConfigDict(from_attributes=True)
+
+# Dot-atom local part @ LDH labels with an alphabetic TLD
+_EMAIL_RE = re.compile(
+    r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+    r"@(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,63}"
+)
+
+
+def _validate_email(value: str) -> str:
+    """Validate an email with a precompiled regex and lowercase its domain, like EmailStr."""
+    if len(value) > 254 or not _EMAIL_RE.fullmatch(value):
+        raise PydanticCustomError("value_error", "value is not a valid email address")
+    local, _, domain = value.rpartition("@")
+    return f"{local}@{domain.lower()}"
+
+
+# Used on the login/register hot paths instead of EmailStr (no email-validator call per request)
+FastEmailStr = Annotated[str, AfterValidator(_validate_email)]
 
 class UserBase(BaseModel):
+    model_config = AUTH_MODEL_CONFIG
+
     email: EmailStr = Field(..., description="User email address")
 
 class UserCreate(UserBase):
+    email: FastEmailStr = Field(..., description="User email address")
     password: str = Field(..., min_length=8, description="User password (min 8 characters)")
     role: str = Field(default="user", description="User role (user/admin)")
 
 class UserResponse(UserBase):
+    model_config = ConfigDict(**AUTH_MODEL_CONFIG, frozen=True, extra="ignore")
+
     id: str = Field(..., description="User ID")
     role: str = Field(..., description="User role")
     created_at: datetime = Field(..., description="Account creation timestamp")
     document_count: int = Field(default=0, description="Number of uploaded documents")
     query_count: int = Field(default=0, description="Total number of queries made")
 
-    class Config:
-        from_attributes = True
-
 class UserLogin(BaseModel):
-    email: EmailStr = Field(..., description="User email address")
+    model_config = AUTH_MODEL_CONFIG
+
+    email: FastEmailStr = Field(..., description="User email address")
     password: str = Field(..., description="User password")
 
 class UserUpdate(BaseModel):
-    full_name: Optional[str] = Field(None, description="Updated full name")
-    email: Optional[EmailStr] = Field(None, description="Updated email address")
-    is_active: Optional[bool] = Field(None, description="Updated active status")
-    role: Optional[str] = Field(None, description="Updated user role") 
+    model_config = AUTH_MODEL_CONFIG
+
+    full_name: str | None = Field(None, description="Updated full name")
+    email: EmailStr | None = Field(None, description="Updated email address")
+    is_active: bool | None = Field(None, description="Updated active status")
+    role: str | None = Field(None, description="Updated user role") 
 
 class PasswordUpdate(BaseModel):
+    model_config = AUTH_MODEL_CONFIG
+
     current_password: str = Field(..., description="Current password")
     new_password: str = Field(..., min_length=8, description="New password (min 8 characters)")
 
 class LLMConfigUpdate(BaseModel):
-    llm_provider: Optional[str] = Field(None, description="LLM provider (groq, openai, etc.)")
-    model: Optional[str] = Field(None, description="Specific model to use")
-    api_key: Optional[str] = Field(None, description="User's own API key")
-    max_tokens: Optional[int] = Field(None, ge=1, le=8000, description="Maximum tokens per request")
-    temperature: Optional[float] = Field(None, ge=0.0, le=2.0, description="Response creativity")
-    base_url: Optional[str] = Field(None, description="Custom API base URL") 
\ No newline at end of file
+    model_config = AUTH_MODEL_CONFIG
+
+    llm_provider: str | None = Field(None, description="LLM provider (groq, openai, etc.)")
+    model: str | None = Field(None, description="Specific model to use")
+    api_key: str | None = Field(None, description="User's own API key")
+    max_tokens: int | None = Field(None, ge=1, le=8000, description="Maximum tokens per request")
+    temperature: float | None = Field(None, ge=0.0, le=2.0, description="Response creativity")
+    base_url: str | None = Field(None, description="Custom API base URL") 
\ No newline at end of file
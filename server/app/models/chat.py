@@ -4,10 +4,14 @@ Chat Models
 Pydantic models for chat functionality, LLM interactions, and conversation management.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import Any
 from datetime import datetime
 from enum import Enum
+import msgspec
 from pydantic import BaseModel, Field
+from pydantic.dataclasses import dataclass
+
+from .config import RESPONSE_MODEL_CONFIG, RESPONSE_DATACLASS_CONFIG
 
 
 class MessageRole(str, Enum):
@@ -27,8 +31,8 @@ class LLMProvider(str, Enum):
 class ChatRequest(BaseModel):
     """Model for chat request."""
     message: str = Field(..., description="User message")
-    conversation_id: Optional[str] = Field(None, description="Conversation ID for context")
-    document_ids: Optional[List[int]] = Field(None, description="Specific document IDs to query")
+    conversation_id: str | None = Field(None, description="Conversation ID for context")
+    document_ids: list[int] | None = Field(None, description="Specific document IDs to query")
     max_chunks: int = Field(default=5, description="Maximum number of context chunks")
     max_sources: int = Field(default=5, description="Max sources to return")
     temperature: float = Field(default=0.7, description="LLM temperature for response generation")
@@ -36,86 +40,99 @@ class ChatRequest(BaseModel):
     include_sources: bool = Field(default=True, description="Include source documents in response")
 
 
-class SourceResponse(BaseModel):
+class ChatRequestFast(msgspec.Struct, kw_only=True):
+    """ChatRequest decoded with msgspec on the /chat hot path; fields mirror ChatRequest."""
+    message: str
+    conversation_id: str | None = None
+    document_ids: list[int] | None = None
+    max_chunks: int = 5
+    max_sources: int = 5
+    temperature: float = 0.7
+    stream: bool = False
+    include_sources: bool = True
+
+
+@dataclass(slots=True, frozen=True, config=RESPONSE_DATACLASS_CONFIG)
+class SourceResponse:
     """Model for source document information in chat response."""
     document_id: str = Field(..., description="Source document ID")
     document_name: str = Field(..., description="Source document name")
     chunk_id: str = Field(..., description="Source chunk ID")
-    page_number: Optional[int] = Field(None, description="Source page number")
+    page_number: int | None = Field(None, description="Source page number")
     content: str = Field(..., description="Relevant text snippet")
     similarity_score: float = Field(..., description="Similarity score")
-    start_char: Optional[int] = Field(None, description="Start character position in document")
-    end_char: Optional[int] = Field(None, description="End character position in document")
+    start_char: int | None = Field(None, description="Start character position in document")
+    end_char: int | None = Field(None, description="End character position in document")
 
 
-class MessageResponse(BaseModel):
+@dataclass(slots=True, frozen=True, config=RESPONSE_DATACLASS_CONFIG)
+class MessageResponse:
     """Model for individual chat message."""
     id: int = Field(..., description="Message ID")
     role: MessageRole = Field(..., description="Message role")
     content: str = Field(..., description="Message content")
     timestamp: datetime = Field(..., description="Message timestamp")
-    sources: List[SourceResponse] = Field(default_factory=list, description="Source documents")
-    metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional message metadata")
-
-    class Config:
-        from_attributes = True
+    sources: list[SourceResponse] = Field(default_factory=list, description="Source documents")
+    metadata: dict[str, Any] = Field(default_factory=dict, description="Additional message metadata")
 
 
 class ChatResponse(BaseModel):
     """Model for chat response."""
+    model_config = RESPONSE_MODEL_CONFIG
+
     message: str = Field(..., description="Assistant response message")
-    sources: List[SourceResponse] = Field(default_factory=list, description="Source documents")
+    sources: list[SourceResponse] = Field(default_factory=list, description="Source documents")
     conversation_id: str = Field(..., description="Conversation ID")
     message_id: str = Field(..., description="Message ID")
-    tokens_used: Optional[int] = Field(None, description="Number of tokens used")
+    tokens_used: int | None = Field(None, description="Number of tokens used")
     model_used: str = Field(..., description="Model used for generation")
 
 
 class ConversationResponse(BaseModel):
     """Model for conversation history."""
+    model_config = RESPONSE_MODEL_CONFIG
+
     id: str = Field(..., description="Conversation ID")
     user_id: int = Field(..., description="User ID")
     title: str = Field(..., description="Conversation title")
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
     message_count: int = Field(..., description="Number of messages")
-    messages: List[MessageResponse] = Field(default_factory=list, description="Conversation messages")
-
-    class Config:
-        from_attributes = True
+    messages: list[MessageResponse] = Field(default_factory=list, description="Conversation messages")
 
 
-class StreamingResponse(BaseModel):
+@dataclass(slots=True, frozen=True, config=RESPONSE_DATACLASS_CONFIG)
+class StreamingResponse:
     """Model for streaming chat response chunks."""
-    conversation_id: str = Field(..., description="Conversation ID")
-    message_id: int = Field(..., description="Message ID")
-    content_delta: str = Field(..., description="Incremental content chunk")
-    is_final: bool = Field(default=False, description="Whether this is the final chunk")
-    sources: Optional[List[SourceResponse]] = Field(None, description="Sources (only in final chunk)")
+    conversation_id: str
+    message_id: int
+    content_delta: str
+    is_final: bool = False
+    sources: list[SourceResponse] | None = None
 
 
 class ConversationCreate(BaseModel):
     """Model for creating a new conversation."""
-    title: Optional[str] = Field(None, description="Conversation title")
-    user_id: int = Field(..., description="User ID")
+    title: str | None = None
+    user_id: int
 
 
 class ConversationUpdate(BaseModel):
     """Model for updating conversation information."""
-    title: Optional[str] = Field(None, description="Updated conversation title")
+    title: str | None = None
 
 
 class FeedbackRequest(BaseModel):
     """Model for message feedback."""
-    message_id: int = Field(..., description="Message ID")
-    rating: int = Field(..., ge=1, le=5, description="Rating from 1-5")
-    feedback_text: Optional[str] = Field(None, description="Optional feedback text")
+    message_id: int
+    rating: int = Field(..., ge=1, le=5)
+    feedback_text: str | None = None
 
 
 class ChatStats(BaseModel):
     """Model for chat statistics."""
-    total_conversations: int = Field(..., description="Total number of conversations")
-    total_messages: int = Field(..., description="Total number of messages")
-    avg_response_time: float = Field(..., description="Average response time in seconds")
-    popular_topics: List[str] = Field(default_factory=list, description="Most queried topics")
-    user_satisfaction: float = Field(..., description="Average user rating") 
\ No newline at end of file
+    total_conversations: int
+    total_messages: int
+    avg_response_time: float
+    popular_topics: list[str] = Field(default_factory=list)
+    user_satisfaction: float
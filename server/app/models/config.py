@@ -0,0 +1,17 @@
+"""
+Response Model Configuration
+
+Shared pydantic configuration for API response models.
+"""
+
+from pydantic import ConfigDict
+
+# Response models are built once and only serialized afterwards
+RESPONSE_MODEL_CONFIG = ConfigDict(
+    from_attributes=True, frozen=True, extra="ignore", use_enum_values=True
+)
+
+# Small, high-volume response types are slotted dataclasses (no per-instance __dict__)
+RESPONSE_DATACLASS_CONFIG = ConfigDict(
+    from_attributes=True, extra="ignore", use_enum_values=True
+)
@@ -0,0 +1,46 @@
+"""
+Trusted Model Construction
+
+Builds response models from rows that were already validated on the way into
+the database, skipping pydantic validation.
+"""
+
+from typing import Any, Optional, Type, TypeVar
+
+ModelT = TypeVar("ModelT")
+
+
+def from_orm_trusted(model_cls: Type[ModelT], row: Optional[Any] = None, **values: Any) -> ModelT:
+    """
+    Construct a response model from a trusted ORM/ODM row without validation.
+
+    Only use this for data the application wrote itself; values are not coerced,
+    so overrides must already have the field's type. Works for BaseModel
+    subclasses and (slotted, frozen) pydantic dataclasses.
+
+    Args:
+        model_cls: Response model class to build
+        row: Object whose attributes named like the model's fields are copied
+        **values: Field values that override (or replace) attributes of `row`
+
+    Returns:
+        ModelT: Model instance; missing fields take their defaults
+    """
+    dataclass_fields = getattr(model_cls, "__pydantic_fields__", None)
+    fields = dataclass_fields if dataclass_fields is not None else model_cls.model_fields
+
+    data = {}
+    for name in fields:
+        if name in values:
+            data[name] = values[name]
+        elif row is not None and hasattr(row, name):
+            data[name] = getattr(row, name)
+
+    if dataclass_fields is None:
+        return model_cls.model_construct(**data)
+
+    instance = object.__new__(model_cls)
+    for name, field in dataclass_fields.items():
+        value = data[name] if name in data else field.get_default(call_default_factory=True)
+        object.__setattr__(instance, name, value)
+    return instance
@@ -4,10 +4,13 @@ Document Models
 Pydantic models for document upload, processing, and management.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import Any
 from datetime import datetime
 from enum import Enum
 from pydantic import BaseModel, Field
+from pydantic.dataclasses import dataclass
+
+from .config import RESPONSE_MODEL_CONFIG, RESPONSE_DATACLASS_CONFIG
 
 
 class DocumentStatus(str, Enum):
@@ -29,18 +32,20 @@ class DocumentType(str, Enum):
 class DocumentBase(BaseModel):
     """Base document model with common fields."""
     name: str = Field(..., description="Original filename")
-    description: Optional[str] = Field(None, description="Document description")
+    description: str | None = Field(None, description="Document description")
 
 
 class DocumentCreate(DocumentBase):
     """Model for document creation during upload."""
-    file_size: int = Field(..., description="File size in bytes")
-    file_type: DocumentType = Field(..., description="Document type")
-    user_id: str = Field(..., description="Owner user ID")
+    file_size: int
+    file_type: DocumentType
+    user_id: str
 
 
 class DocumentResponse(DocumentBase):
     """Model for document response."""
+    model_config = RESPONSE_MODEL_CONFIG
+
     id: str = Field(..., description="Document ID")
     file_size: int = Field(..., description="File size in bytes")
     file_type: DocumentType = Field(..., description="Document type")
@@ -48,63 +53,64 @@ class DocumentResponse(DocumentBase):
     chunk_count: int = Field(default=0, description="Number of text chunks")
     query_count: int = Field(default=0, description="Number of queries against this document")
     uploaded_at: datetime = Field(..., description="Upload timestamp")
-    processed_at: Optional[datetime] = Field(None, description="Processing completion timestamp")
+    processed_at: datetime | None = Field(None, description="Processing completion timestamp")
     user_id: str = Field(..., description="Owner user ID")
     file_path: str = Field(..., description="File storage path")
 
-    class Config:
-        from_attributes = True
-
 
 class DocumentUpdate(BaseModel):
     """Model for updating document information."""
-    name: Optional[str] = Field(None, description="Updated filename")
-    description: Optional[str] = Field(None, description="Updated description")
-    status: Optional[DocumentStatus] = Field(None, description="Updated status")
+    name: str | None = None
+    description: str | None = None
+    status: DocumentStatus | None = None
 
 
-class ChunkResponse(BaseModel):
+@dataclass(slots=True, frozen=True, config=RESPONSE_DATACLASS_CONFIG)
+class ChunkResponse:
     """Model for document chunk information."""
     id: str = Field(..., description="Chunk ID")
     document_id: str = Field(..., description="Parent document ID")
     content: str = Field(..., description="Chunk text content")
     chunk_index: int = Field(..., description="Chunk position in document")
-    page_number: Optional[int] = Field(None, description="Source page number")
-    similarity_score: Optional[float] = Field(None, description="Similarity score for retrieval")
-    metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional chunk metadata")
-
-    class Config:
-        from_attributes = True
+    page_number: int | None = Field(None, description="Source page number")
+    similarity_score: float | None = Field(None, description="Similarity score for retrieval")
+    metadata: dict[str, Any] = Field(default_factory=dict, description="Additional chunk metadata")
 
 
 class UploadResponse(BaseModel):
     """Model for file upload response."""
+    model_config = RESPONSE_MODEL_CONFIG
+
     success: bool = Field(..., description="Upload success status")
     message: str = Field(..., description="Status message")
-    document: Optional[DocumentResponse] = Field(None, description="Created document information")
-    processing_id: Optional[str] = Field(None, description="Background processing task ID")
+    document: DocumentResponse | None = Field(None, description="Created document information")
+    processing_id: str | None = Field(None, description="Background processing task ID")
 
 
 class ProcessingStatus(BaseModel):
     """Model for processing status check."""
-    document_id: str = Field(..., description="Document ID")
-    status: DocumentStatus = Field(..., description="Current processing status")
-    progress: int = Field(..., description="Processing progress percentage")
-    chunks_processed: int = Field(default=0, description="Number of chunks processed")
-    total_chunks: int = Field(default=0, description="Total number of chunks")
-    error_message: Optional[str] = Field(None, description="Error message if failed")
+    model_config = RESPONSE_MODEL_CONFIG
+
+    document_id: str
+    status: DocumentStatus
+    progress: int
+    chunks_processed: int = 0
+    total_chunks: int = 0
+    error_message: str | None = None
 
 
 class DocumentSearchRequest(BaseModel):
     """Model for document search request."""
     query: str = Field(..., description="Search query")
-    document_ids: Optional[List[str]] = Field(None, description="Specific document IDs to search")
+    document_ids: list[str] | None = Field(None, description="Specific document IDs to search")
     limit: int = Field(default=10, description="Maximum number of results")
     similarity_threshold: float = Field(default=0.7, description="Minimum similarity threshold")
 
 
 class DocumentSearchResponse(BaseModel):
     """Model for document search response."""
+    model_config = RESPONSE_MODEL_CONFIG
+
     total_results: int = Field(..., description="Total number of matching chunks")
-    chunks: List[ChunkResponse] = Field(..., description="Retrieved chunks")
+    chunks: list[ChunkResponse] = Field(..., description="Retrieved chunks")
     query_time: float = Field(..., description="Query execution time in seconds") 
\ No newline at end of file
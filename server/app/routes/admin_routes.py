@@ -1,14 +1,20 @@
+import logging
 from typing import Optional
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
-import asyncio
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
+from ..config import get_settings
 from ..controllers.admin_vector_controller import AdminVectorController
-from ..utils.auth import require_role
-from ..utils.sse import VectorRebuildEventEmitter, create_rebuild_sse_generator, get_sse_headers
+from ..utils.auth import ADMIN_DEP
+from ..utils.background import BackgroundTaskPool
+from ..utils.etag import etag_headers, etag_matches, not_modified
+from ..utils.sse import VectorRebuildEventEmitter, create_rebuild_sse_generator, SSE_HEADERS
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/admin/vector", tags=["Admin Vector Store"])
 admin_vector_controller = AdminVectorController()
+rebuild_tasks = BackgroundTaskPool("vector-rebuild", get_settings().rebuild_concurrency)
 
 
 
@@ -17,7 +23,7 @@ async def rebuild_vector_store(
     user_filter: Optional[str] = Query(None, description="Filter by specific user ID"),
     document_filter: Optional[str] = Query(None, description="Filter by specific document ID"),
     batch_size: int = Query(100, ge=10, le=1000, description="Batch size for processing"),
-    _: dict = Depends(require_role("admin"))
+    _: dict = ADMIN_DEP
 ):
     """
     Rebuild vector store from MongoDB backup.
@@ -51,7 +57,7 @@ async def rebuild_vector_store_stream(
     user_filter: Optional[str] = Query(None, description="Filter by specific user ID"),
     document_filter: Optional[str] = Query(None, description="Filter by specific document ID"),
     batch_size: int = Query(100, ge=10, le=1000, description="Batch size for processing"),
-    _: dict = Depends(require_role("admin"))
+    _: dict = ADMIN_DEP
 ):
     """
     Rebuild vector store from MongoDB backup with real-time SSE progress updates.
@@ -87,11 +93,12 @@ async def rebuild_vector_store_stream(
                 event_emitter=event_emitter
             )
         except Exception as e:
-            # Error will be emitted by the service
-            pass
+            logger.exception("Background vector rebuild failed")
+            # Close the client's stream now instead of letting it hit the SSE timeout
+            await event_emitter.emit_failed(f"Rebuild failed: {str(e)}")
     
-    # Start rebuild processing in background
-    asyncio.create_task(process_rebuild())
+    # Start rebuild processing in background (queued if the pool is busy)
+    rebuild_tasks.submit(process_rebuild())
     
     # Create SSE generator
     sse_generator = create_rebuild_sse_generator(event_emitter, timeout=600)
@@ -99,13 +106,14 @@ async def rebuild_vector_store_stream(
     return StreamingResponse(
         sse_generator,
         media_type="text/event-stream",
-        headers=get_sse_headers()
+        headers=SSE_HEADERS
     )
 
 
 @router.get("/backup/stats")
 async def get_backup_statistics(
-    _: dict = Depends(require_role("admin"))
+    request: Request,
+    _: dict = ADMIN_DEP
 ):
     """
     Get detailed statistics about MongoDB backup data availability.
@@ -120,5 +128,12 @@ async def get_backup_statistics(
     - Data availability for rebuild operations
     
     Use this to assess backup data before initiating a rebuild.
+    
+    Supports `If-None-Match`: returns 304 while the backup data is unchanged.
     """
-    return await admin_vector_controller.get_backup_statistics() 
\ No newline at end of file
+    etag = await admin_vector_controller.get_backup_statistics_etag()
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    stats = await admin_vector_controller.get_backup_statistics()
+    return ORJSONResponse(stats, headers=etag_headers(etag)) 
\ No newline at end of file
@@ -5,48 +5,104 @@ Defines HTTP endpoints for chat functionality and delegates all logic to control
 """
 
 from typing import List
-from fastapi import APIRouter, Depends, Query
+import msgspec
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 
 from ..controllers import ChatController
-from ..models import ChatRequest, ChatResponse, ConversationResponse
-from ..db import get_postgres_database  # For user verification
-from ..utils import get_current_user
+from ..models import ChatRequest, ChatRequestFast, ChatResponse, ConversationResponse
+from ..utils import CURRENT_USER_DEP, MsgspecJSONResponse, etag_headers, etag_matches, not_modified
+from ..utils.sse import SSE_HEADERS
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 chat_controller = ChatController()
 
+# The body is decoded by msgspec; ChatRequest still documents it in the OpenAPI schema
+_chat_request_decoder = msgspec.json.Decoder(ChatRequestFast)
+_CHAT_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": ChatRequest.model_json_schema()}}
+    }
+}
 
-@router.post("/", response_model=ChatResponse)
+
+async def _decode_chat_request(request: Request) -> ChatRequestFast:
+    """Decode and validate a chat request body with msgspec."""
+    try:
+        return _chat_request_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+
+def _use_search_cache(request: Request) -> bool:
+    """Lets clients (and tests) force a fresh vector search with X-Bypass-Cache: 1."""
+    return request.headers.get("x-bypass-cache") != "1"
+
+
+@router.post("/", response_model=ChatResponse, openapi_extra=_CHAT_REQUEST_BODY)
 async def send_message(
-    chat_request: ChatRequest,
-    current_user = Depends(get_current_user),
-    db_session = Depends(get_postgres_database)  # For user verification
+    request: Request,
+    current_user = CURRENT_USER_DEP
 ):
-    return await chat_controller.send_message(
-        chat_request, current_user.id, db_session
+    chat_request = await _decode_chat_request(request)
+    response = await chat_controller.send_message(
+        chat_request,
+        current_user.id,
+        use_search_cache=_use_search_cache(request)
     )
+    return MsgspecJSONResponse(response)
+
+
+@router.post("/stream", response_class=StreamingResponse, openapi_extra=_CHAT_REQUEST_BODY)
+async def stream_message(
+    request: Request,
+    current_user = CURRENT_USER_DEP
+):
+    """
+    Send a chat message and stream the reply as Server-Sent Events.
+    
+    Events: `sources` (conversation ID and sources), `token` (one per
+    generated chunk), then `done` (stored message ID) or `error`.
+    """
+    chat_request = await _decode_chat_request(request)
+    events = await chat_controller.stream_message(
+        chat_request,
+        current_user.id,
+        use_search_cache=_use_search_cache(request)
+    )
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
 
 
 @router.get("/conversations", response_model=List[ConversationResponse])
 async def get_conversations(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user = Depends(get_current_user),
-    db_session = Depends(get_postgres_database)  # For user verification
+    current_user = CURRENT_USER_DEP
 ):
     """Get conversations endpoint - delegates to controller."""
-    return await chat_controller.get_conversations(
-        current_user.id, skip, limit, db_session
+    # Polling clients that already have this page get a 304 without the full pipeline
+    etag = await chat_controller.get_conversations_etag(current_user.id, skip, limit)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    conversations = await chat_controller.get_conversations(
+        current_user.id, skip, limit
     )
+    return MsgspecJSONResponse(conversations, headers=etag_headers(etag))
 
 
 @router.get("/conversations/{conversation_id}", response_model=ConversationResponse)
 async def get_conversation(
     conversation_id: str,
-    current_user = Depends(get_current_user),
-    db_session = Depends(get_postgres_database)  # For user verification
+    current_user = CURRENT_USER_DEP
 ):
     """Get specific conversation endpoint - delegates to controller."""
-    return await chat_controller.get_conversation(
-        conversation_id, current_user.id, db_session
-    ) 
\ No newline at end of file
+    conversation = await chat_controller.get_conversation(
+        conversation_id, current_user.id
+    )
+    return MsgspecJSONResponse(conversation) 
\ No newline at end of file
@@ -1,33 +1,46 @@
 
-from typing import List
-from fastapi import APIRouter, Depends, File, UploadFile, Query
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, UploadFile, Query, Request
 from fastapi.responses import StreamingResponse
-import asyncio
 
-from ..utils import get_current_user
-from ..db import get_postgres_database
-from ..utils.sse import get_sse_headers, create_sse_generator, DocumentProcessingEventEmitter
+from ..config import get_settings
+from ..utils import (
+    CURRENT_USER_DEP, BackgroundTaskPool, MsgspecJSONResponse, etag_headers, etag_matches, not_modified
+)
+from ..utils.sse import SSE_HEADERS, create_sse_generator, DocumentProcessingEventEmitter
 from ..services import DocumentService
 from ..models import DocumentResponse
 from ..controllers import UploadController
 from ..dependencies import get_vector_store
+from ..db.milvus_vector_store import MilvusVectorStore
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/upload", tags=["Document Upload"])
 document_service = DocumentService()
 upload_controller = UploadController()
+upload_tasks = BackgroundTaskPool("document-upload", get_settings().upload_concurrency)
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
 @router.post("/", response_class=StreamingResponse)
 async def upload_document_stream(
     file: UploadFile = File(...),
-    current_user = Depends(get_current_user),
-    db_session = Depends(get_postgres_database)
+    current_user = CURRENT_USER_DEP,
+    vector_store: MilvusVectorStore = Depends(get_vector_store)
 ):
     """
     Document upload endpoint with real-time SSE progress updates.
     
+    The file is validated and its document record created before the stream
+    starts; invalid uploads get a plain 4xx response. Processing then runs in
+    the background upload pool, independent of this response: it continues if
+    the client disconnects, and the outcome is saved on the document (poll
+    `GET /upload/{document_id}`).
+    
     Returns a Server-Sent Events stream with processing status updates:
-    - started: Processing begins
-    - validating: File validation
+    - started: Processing begins (carries `document_id`)
     - extracting: Text extraction
     - chunking: Text chunking
     - embedding: Embedding generation
@@ -36,65 +49,87 @@ async def upload_document_stream(
     - failed: Processing failed
     """
     
+    document, file_path = await document_service.accept_upload(
+        file=file,
+        user_id=current_user.id
+    )
+    
     # Create event emitter for progress updates
     event_emitter = DocumentProcessingEventEmitter()
     
-    # Get vector store with lazy initialization
-    vector_store = await get_vector_store()
-    
     async def process_document():
         try:
-            await document_service.upload_document(
-                file=file,
-                user_id=current_user.id,
-                db=db_session,
+            await document_service.process_upload(
+                file_path=file_path,
+                document=document,
                 vector_store=vector_store,
                 event_emitter=event_emitter
             )
         except Exception as e:
-            # Error will be emitted by the service
-            pass
+            logger.exception(f"Background processing failed for {file.filename}")
+            # Close the client's stream now instead of letting it hit the SSE timeout
+            await event_emitter.emit_failed(f"Document processing failed: {str(e)}")
+    
+    async def discard_document():
+        await document_service.discard_upload(file_path, document)
+        await event_emitter.emit_failed("Document processing cancelled")
     
-    # Start document processing in background
-    asyncio.create_task(process_document())
+    # Queue processing (it waits if the pool is busy); the task is not tied to the stream
+    upload_tasks.submit(process_document(), on_discard=discard_document)
     
-    # Create SSE generator
     sse_generator = create_sse_generator(event_emitter, timeout=300)
     
     # Return streaming response
     return StreamingResponse(
         sse_generator,
         media_type="text/event-stream",
-        headers=get_sse_headers()
+        headers=SSE_HEADERS
     )
 
 @router.get("/", response_model=List[DocumentResponse])
 async def get_documents(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user = Depends(get_current_user),
-    db_session = Depends(get_postgres_database)
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    current_user = CURRENT_USER_DEP
 ):
-    return await upload_controller.get_documents(
-        current_user.id, skip, limit, db_session
+    """
+    List the user's documents, newest first.
+    
+    Full pages carry an `X-Next-Cursor` header; pass it back as `cursor` to
+    fetch the next page without an offset scan.
+    """
+    documents = await upload_controller.get_documents(
+        current_user.id, skip, limit, cursor
     )
+    headers = {NEXT_CURSOR_HEADER: documents[-1].id} if len(documents) == limit else None
+    return MsgspecJSONResponse(documents, headers=headers)
 
 @router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
+    request: Request,
     document_id: str,
-    current_user = Depends(get_current_user),
-    db_session = Depends(get_postgres_database)
+    current_user = CURRENT_USER_DEP
 ):
-    return await upload_controller.get_document(
-        document_id, current_user.id, db_session
+    """
+    Get one of the user's documents.
+    
+    Supports `If-None-Match`: status polls for an unchanged document get a 304.
+    """
+    etag = await upload_controller.get_document_etag(document_id, current_user.id)
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+    
+    document = await upload_controller.get_document(
+        document_id, current_user.id
     )
+    return MsgspecJSONResponse(document, headers=etag_headers(etag) if etag else None)
 
 @router.delete("/{document_id}", response_model=dict)
 async def delete_document(
     document_id: str,
-    current_user = Depends(get_current_user),
-    db_session = Depends(get_postgres_database)
+    current_user = CURRENT_USER_DEP
 ):
     return await upload_controller.delete_document(
-        document_id, current_user.id, db_session
+        document_id, current_user.id
     ) 
\ No newline at end of file
@@ -1,24 +1,29 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 
 from ..controllers import UserController
 from ..db import get_postgres_database
 from ..models import UserResponse, UserUpdate, PasswordUpdate, LLMConfigUpdate
-from ..utils import get_current_user, require_role
+from ..utils import CURRENT_USER_DEP, ADMIN_DEP, MsgspecJSONResponse, etag_headers, etag_matches, not_modified
 
 router = APIRouter(prefix="/user", tags=["User"])
 user_controller = UserController()
 
 @router.get("/profile", response_model=UserResponse)
 async def get_profile(
-    current_user = Depends(get_current_user),
+    request: Request,
+    current_user = CURRENT_USER_DEP,
     db_session = Depends(get_postgres_database)
 ):
-    return await user_controller.get_profile(current_user.id, db_session)
+    profile = await user_controller.get_profile(current_user.id, db_session)
+    etag = user_controller.get_profile_etag(profile)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return MsgspecJSONResponse(profile, headers=etag_headers(etag))
 
 @router.put("/profile", response_model=UserResponse)
 async def update_profile(
     user_update: UserUpdate,
-    current_user = Depends(get_current_user),
+    current_user = CURRENT_USER_DEP,
     db_session = Depends(get_postgres_database)
 ):
     return await user_controller.update_profile(
@@ -28,7 +33,7 @@ async def update_profile(
 @router.post("/change-password", response_model=dict)
 async def change_password(
     password_data: PasswordUpdate,
-    current_user = Depends(get_current_user),
+    current_user = CURRENT_USER_DEP,
     db_session = Depends(get_postgres_database)
 ):
     return await user_controller.change_password(
@@ -38,7 +43,7 @@ async def change_password(
 @router.put("/llm-config", response_model=dict)
 async def update_llm_config(
     llm_config: LLMConfigUpdate,
-    current_user = Depends(require_role("admin")),
+    current_user = ADMIN_DEP,
     db_session = Depends(get_postgres_database)
 ):
     return await user_controller.update_llm_config(
@@ -47,7 +52,7 @@ async def update_llm_config(
 
 @router.get("/llm-config", response_model=dict)
 async def get_llm_config(
-    current_user = Depends(require_role("admin")),
+    current_user = ADMIN_DEP,
     db_session = Depends(get_postgres_database)
 ):
     return await user_controller.get_llm_config(current_user.id, db_session)
\ No newline at end of file
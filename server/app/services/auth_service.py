@@ -1,28 +1,138 @@
+import asyncio
 import logging
-from typing import Optional
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, NamedTuple, Callable, Awaitable
 from fastapi import HTTPException, status
-from datetime import datetime, timezone
+from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.config import get_settings
 from ..db.postgres import User
 from ..models.auth import UserCreate, UserResponse, UserLogin
+from ..models.construct import from_orm_trusted
 from ..utils.auth import (
     hash_password,
-    verify_password,
-    create_access_token,
-    create_refresh_token,
+    hash_password_async,
+    password_needs_rehash,
+    verify_password_async,
+    create_token_pair,
     verify_refresh_token
 )
+from ..utils.errors import wrap_errors
+from ..utils.ttl_cache import TTLCache
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Settings are fixed for the process; hoisted out of the refresh path
+_ACCESS_TTL_SEC = settings.access_token_expire_minutes * 60
+
+# Verified against when the email is unknown so both failure modes cost one hash check
+_DUMMY_HASH = hash_password("!invalid!")
+
+
+class CachedUser(NamedTuple):
+    """Read-only snapshot of the user columns login and token refresh need."""
+    id: str
+    email: str
+    hashed_password: str
+    role: str
+    status: str
+    created_at: datetime
+
+
+# Login/refresh lookups keyed by "email:<lowercased email>" and "id:<user id>".
+# Entries may be up to 30s stale; writers call invalidate_cached_user.
+_user_cache = TTLCache(maxsize=10_000, ttl_seconds=30)
+
+
+# Only the snapshot's columns are selected (no llm_config JSON, no ORM identity map)
+_CACHED_USER_COLUMNS = (User.id, User.email, User.hashed_password, User.role, User.status, User.created_at)
+
+# Statements built once; each call only binds its parameter
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+# Email matches are case-insensitive, like the uq_user_email_lower index that serves them
+_EMAIL_TAKEN = select(
+    exists().where(func.lower(User.email) == func.lower(bindparam("email")), User.id != bindparam("user_id"))
+)
+_CACHED_USER_BY_EMAIL = select(*_CACHED_USER_COLUMNS).where(
+    func.lower(User.email) == func.lower(bindparam("email"))
+)
+_CACHED_USER_BY_ID = select(*_CACHED_USER_COLUMNS).where(User.id == bindparam("user_id"))
+
+
+def _cache_user(row) -> CachedUser:
+    """Snapshot a projected user row and cache it under both of its keys."""
+    cached = CachedUser(*row)
+    _user_cache.set(f"email:{cached.email.lower()}", cached)
+    _user_cache.set(f"id:{cached.id}", cached)
+    return cached
+
+
+# Cache misses currently being fetched, so concurrent identical lookups share one query
+_inflight_lookups: Dict[str, asyncio.Future] = {}
+
+
+async def _single_flight(key: str, fetch: Callable[[], Awaitable[Optional[CachedUser]]]) -> Optional[CachedUser]:
+    """
+    Run `fetch` once for all concurrent callers asking for the same key.
+    
+    Snapshots are immutable and session-independent, so followers can safely
+    reuse the leader's result even though their own session never runs a query.
+    
+    Args:
+        key: Lookup key (same format as the user cache)
+        fetch: Coroutine factory performing the query
+        
+    Returns:
+        Optional[CachedUser]: The shared lookup result
+    """
+    pending = _inflight_lookups.get(key)
+    if pending is not None:
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            # Only our own cancellation propagates; if the leader was cancelled, query ourselves
+            if not pending.cancelled():
+                raise
+    
+    future = asyncio.get_running_loop().create_future()
+    _inflight_lookups[key] = future
+    try:
+        result = await fetch()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # Mark retrieved so an unawaited failure is not logged twice
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        if _inflight_lookups.get(key) is future:
+            del _inflight_lookups[key]
+
+
+def invalidate_cached_user(user_id: str, *emails: str) -> None:
+    """
+    Drop cached login/refresh lookups for a user after a write.
+    
+    Args:
+        user_id: User ID
+        *emails: Email addresses the user is (or was) cached under
+    """
+    _user_cache.pop(f"id:{user_id}")
+    for email in emails:
+        _user_cache.pop(f"email:{email.lower()}")
+
 class AuthService:
 
+    @wrap_errors("Registration failed")
     async def register_user(
         self, 
         user_data: UserCreate, 
@@ -41,52 +151,77 @@ class AuthService:
         Raises:
             HTTPException: If registration fails
         """
+        # Create new user
+        hashed_password = await hash_password_async(user_data.password)
+        # One round trip: an existing (case-insensitive) email makes the insert a no-op,
+        # and RETURNING gives back the generated columns without a refresh SELECT
         try:
-            # Check if user already exists
-            existing_user = await self._get_user_by_email(db, user_data.email)
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="User with this email already exists"
+            result = await db.execute(
+                pg_insert(User)
+                .values(
+                    email=user_data.email,
+                    hashed_password=hashed_password,
+                    role="user",  # Default role
                 )
-            
-            # Create new user
-            user = User(
-                email=user_data.email,
-                hashed_password=hash_password(user_data.password),
-                role="user",  # Default role
+                .on_conflict_do_nothing()
+                .returning(User.id, User.email, User.role, User.created_at)
             )
-            
-            db.add(user)
+            user = result.first()
             await db.commit()
-            await db.refresh(user)
-            
-            logger.info(f"User registered successfully: {user.email}")
-            
-            return UserResponse(
-                id=str(user.id),
-                email=user.email,
-                role=user.role,
-                created_at=user.created_at,
-                status=user.status,
-                updated_at=user.updated_at,
-            )
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.error(f"User registration failed: {str(e)}")
+        except Exception:
             await db.rollback()
+            raise
+        
+        if user is None:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Registration failed"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User with this email already exists"
             )
         
+        invalidate_cached_user(user.id, user.email)
+        logger.info(f"User registered successfully: {user.email}")
+        
+        # Row was just written from validated input; construct without re-validating
+        return from_orm_trusted(UserResponse, user, id=str(user.id))
+    
     async def _get_user_by_email(self, db: AsyncSession, email: str) -> Optional[User]:
         """Get user by email address."""
-        result = await db.execute(select(User).where(User.email == email))
+        result = await db.execute(_USER_BY_EMAIL, {"email": email})
         return result.scalar_one_or_none()
     
+    async def _email_exists(self, db: AsyncSession, email: str, exclude_user_id: Optional[str] = None) -> bool:
+        """Check whether another user already has an email, without loading the row."""
+        result = await db.execute(_EMAIL_TAKEN, {"email": email, "user_id": exclude_user_id or ""})
+        return result.scalar()
+    
+    async def _lookup_user_by_email(self, db: AsyncSession, email: str) -> Optional[CachedUser]:
+        """Get a cached read-only user snapshot by email; concurrent misses share one query."""
+        key = f"email:{email.lower()}"
+        cached = _user_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        async def fetch() -> Optional[CachedUser]:
+            result = await db.execute(_CACHED_USER_BY_EMAIL, {"email": email})
+            row = result.first()
+            return _cache_user(row) if row else None
+        
+        return await _single_flight(key, fetch)
+    
+    async def _lookup_user_by_id(self, db: AsyncSession, user_id: str) -> Optional[CachedUser]:
+        """Get a cached read-only user snapshot by ID; concurrent misses share one query."""
+        cached = _user_cache.get(f"id:{user_id}")
+        if cached is not None:
+            return cached
+        
+        async def fetch() -> Optional[CachedUser]:
+            result = await db.execute(_CACHED_USER_BY_ID, {"user_id": user_id})
+            row = result.first()
+            return _cache_user(row) if row else None
+        
+        return await _single_flight(f"id:{user_id}", fetch)
+    
+    @wrap_errors("Login failed")
     async def login_user(
         self, 
         login_data: UserLogin,
@@ -106,27 +241,39 @@ class AuthService:
         Raises:
             HTTPException: If login fails
         """
-        try:
-            # Get user by email
-            user = await self._get_user_by_email(db, login_data.email)
-            
-            if not user or not verify_password(login_data.password, user.hashed_password):
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid email or password"
-                )
-            
-            return user
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.error(f"Login failed for {login_data.email}: {str(e)}")
+        # Get user by email
+        user = await self._lookup_user_by_email(db, login_data.email)
+        
+        target_hash = user.hashed_password if user else _DUMMY_HASH
+        password_ok = await verify_password_async(login_data.password, target_hash)
+        
+        if not user or not password_ok:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Login failed"
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid email or password"
             )
         
+        if password_needs_rehash(user.hashed_password):
+            await self._upgrade_password_hash(db, user, login_data.password)
+        
+        return user
+    
+    async def _upgrade_password_hash(self, db: AsyncSession, user: CachedUser, password: str) -> None:
+        """
+        Replace a legacy (bcrypt) or outdated hash after a successful login.
+        
+        Failures are logged and ignored; the old hash keeps working.
+        """
+        try:
+            new_hash = await hash_password_async(password)
+            await db.execute(update(User).where(User.id == user.id).values(hashed_password=new_hash))
+            await db.commit()
+            invalidate_cached_user(user.id, user.email)
+        except Exception as e:
+            logger.warning(f"Password hash upgrade failed for user {user.id}: {str(e)}")
+            await db.rollback()
+    
+    @wrap_errors("Invalid refresh token", status.HTTP_401_UNAUTHORIZED)
     async def refresh_token(self, refresh_token: str, db: AsyncSession) -> Dict[str, Any]:
         """
         Handle token refresh.
@@ -141,64 +288,47 @@ class AuthService:
         Raises:
             HTTPException: If refresh token is invalid or user not found
         """
-        try:
-            # Verify the refresh token and extract payload
-            token_data = verify_refresh_token(refresh_token)
-            user_id = token_data.get("user_id")
-            print("user_id",user_id)
-            
-            if not user_id:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid refresh token payload"
-                )
-            
-            # Fetch user from PostgreSQL database
-            user = await self._get_user_by_id(db, user_id)
-            
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="User not found"
-                )
-            
-            # Create new access and refresh tokens
-            new_token_data = {"sub": user.email, "user_id": str(user.id), "role": user.role}
-            
-            new_access_token = create_access_token(new_token_data)
-            new_refresh_token = create_refresh_token(new_token_data)
-            
-            # Update user's last login time
-            user.last_login = datetime.now(timezone.utc)
-            await db.commit()
-            
-            # Return token response
-            return {
-                "access_token": new_access_token,
-                "refresh_token": new_refresh_token,
-                "token_type": "bearer",
-                "expires_in": settings.access_token_expire_minutes * 60,
-                "user": {
-                    "id": str(user.id),
-                    "email": user.email,
-                    "role": user.role,
-                    "created_at": user.created_at,
-                    "document_count": 0,  # TODO: Get actual count from MongoDB
-                    "query_count": 0,     # TODO: Get actual count from MongoDB
-                }
-            }
-            
-        except HTTPException:
-            # Re-raise HTTPExceptions (like invalid token)
-            raise
-        except Exception as e:
-            logger.error(f"Token refresh failed: {str(e)}")
+        # Verify the refresh token and extract payload
+        token_data = verify_refresh_token(refresh_token)
+        user_id = token_data.get("user_id")
+        
+        if not user_id:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid refresh token"
+                detail="Invalid refresh token payload"
             )
+        
+        # Fetch user (cached snapshot, PostgreSQL on a miss)
+        user = await self._lookup_user_by_id(db, user_id)
+        
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+        
+        # Create new access and refresh tokens
+        new_token_data = {"sub": user.email, "user_id": str(user.id), "role": user.role}
+        
+        new_access_token, new_refresh_token = create_token_pair(new_token_data)
+        
+        # Return token response
+        return {
+            "access_token": new_access_token,
+            "refresh_token": new_refresh_token,
+            "token_type": "bearer",
+            "expires_in": _ACCESS_TTL_SEC,
+            "user": {
+                "id": str(user.id),
+                "email": user.email,
+                "role": user.role,
+                "created_at": user.created_at,
+                "document_count": 0,  # TODO: Get actual count from MongoDB
+                "query_count": 0,     # TODO: Get actual count from MongoDB
+            }
+        }
     
     async def _get_user_by_id(self, db: AsyncSession, user_id: str) -> Optional[User]:
         """Get user by ID."""
-        result = await db.execute(select(User).where(User.id == user_id))
+        result = await db.execute(_USER_BY_ID, {"user_id": user_id})
         return result.scalar_one_or_none() 
\ No newline at end of file
@@ -1,20 +1,58 @@
+import asyncio
+import hashlib
 import logging
-from typing import List, Optional, Dict, Any
+from typing import AsyncGenerator, List, NamedTuple, Optional, Dict, Any, Tuple
 from datetime import datetime, timezone
-from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
+from beanie import PydanticObjectId
 
-from ..db.postgres import User
-from ..db.mongodb import Conversation, Message, MessageRole, QueryLog
+from ..db.mongodb import Conversation, Document, Message, MessageRole, QueryLog
 from ..models.chat import (
     ChatRequest, ChatResponse, ConversationResponse, MessageResponse, 
     SourceResponse
 )
+from ..models.construct import from_orm_trusted
+from ..utils.errors import wrap_errors
+from ..utils.sse import SSEMessage
+from ..utils.ttl_cache import TTLCache
 from ..llm.llm_manager import LLMManager
 from ..db.milvus_vector_store import MilvusVectorStore
 
 logger = logging.getLogger(__name__)
 
+# Latest messages inlined with each conversation in the list view
+RECENT_MESSAGES_PREVIEW = 5
+
+class ChatTurn(NamedTuple):
+    """A chat message with its loaded conversation, retrieved sources and LLM prompt."""
+    received_at: datetime
+    conversation: Conversation
+    user_message: Message
+    source_records: List[Dict[str, Any]]
+    sources: List[SourceResponse]
+    llm_messages: List[Dict[str, str]]
+
+
+# Prior messages sent to the LLM with each turn, and the fields read for them
+LLM_HISTORY_LIMIT = 10
+LLM_HISTORY_FIELDS = {"_id": 0, "role": 1, "content": 1}
+LLM_ROLES = {MessageRole.USER.value: "user", MessageRole.ASSISTANT.value: "assistant"}
+
+NO_CONTEXT_SYSTEM_PROMPT = (
+    "You are a helpful AI assistant. I could not find any relevant information in the uploaded documents for this query. "
+    "Please provide a general response based on your knowledge, but start your response with: "
+    "'I could not find any relevant information in the documents, but here's what I can tell you:'"
+)
+
+# Vector search hits per (user, documents version, query, k, document filter).
+# The version is the user's latest Document.updated_at, read from MongoDB, so a
+# document change made through any worker moves every worker onto new keys.
+_search_cache = TTLCache(maxsize=10_000, ttl_seconds=300)
+
+
+# Message fields read to build a MessageResponse
+MESSAGE_RESPONSE_FIELDS = {"role": 1, "content": 1, "created_at": 1, "sources": 1, "message_metadata": 1}
+
 
 class ChatService:
     
@@ -22,23 +60,24 @@ class ChatService:
         self.llm_manager = None  # Will be initialized with tenant context
         self.vector_store = None  # Will be injected
     
+    @wrap_errors("Chat processing failed")
     async def process_chat_message(
         self,
         chat_request: ChatRequest,
         user_id: str,
-        db: AsyncSession,
         vector_store: MilvusVectorStore,
-        tenant_id: Optional[str] = None
+        tenant_id: Optional[str] = None,
+        use_search_cache: bool = True
     ) -> ChatResponse:
         """
         Process a chat message and return response.
         
         Args:
             chat_request: Chat request data
-            user_id: User ID
-            db: PostgreSQL database session (for user verification)
+            user_id: ID of the authenticated user (already loaded by the route)
             vector_store: Vector store manager
             tenant_id: Tenant ID for LLM configuration
+            use_search_cache: Reuse recent identical vector searches
             
         Returns:
             ChatResponse: Chat response with answer and sources
@@ -46,164 +85,277 @@ class ChatService:
         Raises:
             HTTPException: If processing fails
         """
+        # Initialize LLM manager with tenant context
+        self.llm_manager = LLMManager(tenant_id=tenant_id)
+        
+        turn = await self._prepare_turn(chat_request, user_id, vector_store, use_search_cache)
+        
+        # Generate response from LLM
+        logger.info(f"Generating LLM response for user {user_id} - Has context: {bool(turn.sources)}, Sources: {len(turn.sources)}")
+        
         try:
-            # Verify user exists
-            user = await self._get_user_by_id(db, user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found"
-                )
-            
-            # Initialize LLM manager with tenant context
-            self.llm_manager = LLMManager(tenant_id=tenant_id)
-            
-            # Get or create conversation
-            conversation = await self._get_or_create_conversation(
-                chat_request.conversation_id, user_id
+            llm_response = await self.llm_manager.generate_response(
+                messages=turn.llm_messages,
+                max_tokens=2000,
+                temperature=0.7
             )
             
-            # Store user message
-            user_message = Message(
-                conversation_id=str(conversation.id),
-                role=MessageRole.USER,
-                content=chat_request.message,
-                user_id=user_id,
-                created_at=datetime.now(timezone.utc)
-            )
-            await user_message.save()
+            # Log successful generation
+            logger.info(f"LLM response generated successfully - Provider: {llm_response.provider}, Model: {llm_response.model}")
             
-            # Retrieve relevant context from vector store with user isolation
-            context_results = await vector_store.search_similar_chunks(
-                query=chat_request.message,
-                user_id=user_id,
-                k=chat_request.max_chunks or 5,
-                doc_ids=chat_request.document_ids,
-                similarity_threshold=0.5  # Lower threshold for better results
+        except Exception as e:
+            logger.error(f"LLM generation failed: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to generate response: {str(e)}"
             )
+        finally:
+            await self.llm_manager.cleanup()
+        
+        ai_message = await self._persist_turn(
+            turn,
+            chat_request,
+            user_id,
+            content=llm_response.content,
+            metadata={
+                "model_used": llm_response.model,
+                "provider": llm_response.provider,
+                "chunk_count": len(turn.sources),
+                "usage": llm_response.usage
+            },
+            tokens_used=llm_response.usage.get("total_tokens", 0)
+        )
+        
+        logger.info(f"Chat message processed for user {user_id}")
+        
+        return ChatResponse(
+            message=llm_response.content,
+            sources=turn.sources,
+            conversation_id=str(turn.conversation.id),
+            message_id=str(ai_message.id),
+            tokens_used=llm_response.usage.get("total_tokens"),
+            model_used=llm_response.model
+        )
+    
+    async def stream_chat_message(
+        self,
+        chat_request: ChatRequest,
+        user_id: str,
+        vector_store: MilvusVectorStore,
+        tenant_id: Optional[str] = None,
+        use_search_cache: bool = True
+    ) -> AsyncGenerator[str, None]:
+        """
+        Process a chat message and stream the reply as Server-Sent Events.
+        
+        Events, in order: `sources` (conversation ID and sources), one `token`
+        per generated chunk, then `done` (message ID) once the turn is stored,
+        or `error` if processing fails. Nothing is stored if the client
+        disconnects before the reply is complete.
+        
+        Args:
+            chat_request: Chat request data
+            user_id: ID of the authenticated user (already loaded by the route)
+            vector_store: Vector store manager
+            tenant_id: Tenant ID for LLM configuration
+            use_search_cache: Reuse recent identical vector searches
             
-            # Prepare context and sources with fallback handling
-            if context_results:
-                # Found relevant chunks - use them as context
-                context_text = "\n\n".join([result["text"] for result in context_results])
-                sources = [
-                    SourceResponse(
-                        document_id=result["doc_id"],
-                        document_name=result.get("source", "Unknown Document"),
-                        chunk_id=result["chunk_id"],
-                        content=result["text"],
-                        similarity_score=result["similarity_score"],
-                        page_number=result["metadata"].get("page_number") if result.get("metadata") else None,
-                        start_char=result["metadata"].get("start_char") if result.get("metadata") else None,
-                        end_char=result["metadata"].get("end_char") if result.get("metadata") else None
-                    )
-                    for result in context_results
-                ]
-                has_context = True
-            else:
-                # No relevant chunks found - prepare fallback response
-                context_text = ""
-                sources = []
-                has_context = False
-                logger.info(f"No relevant chunks found for user {user_id} query: '{chat_request.message[:100]}...'")
-            
-            # Prepare messages for LLM
-            messages = await self._prepare_llm_messages(conversation, chat_request.message, context_text, has_context)
-            
-            # Generate response from LLM
-            logger.info(f"Generating LLM response for user {user_id} - Has context: {has_context}, Sources: {len(sources)}")
-            
-            try:
-                llm_response = await self.llm_manager.generate_response(
-                    messages=messages,
-                    max_tokens=2000,
-                    temperature=0.7
-                )
-                
-                # Log successful generation
-                logger.info(f"LLM response generated successfully - Provider: {llm_response.provider}, Model: {llm_response.model}")
-                
-            except Exception as e:
-                logger.error(f"LLM generation failed: {str(e)}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to generate response: {str(e)}"
-                )
-            
-            # Store AI message
-            ai_message = Message(
-                conversation_id=str(conversation.id),
-                role=MessageRole.ASSISTANT,
-                content=llm_response.content,
-                user_id=user_id,
-                sources=[source.dict() for source in sources],
-                message_metadata={
-                    "model_used": llm_response.model,
-                    "provider": llm_response.provider,
-                    "chunk_count": len(context_results),
-                    "usage": llm_response.usage
+        Yields:
+            str: Formatted SSE messages
+        """
+        # Local manager: the service instance is shared between requests
+        llm_manager = LLMManager(tenant_id=tenant_id)
+        try:
+            turn = await self._prepare_turn(chat_request, user_id, vector_store, use_search_cache)
+            conversation_id = str(turn.conversation.id)
+            yield SSEMessage(
+                event="sources",
+                data={"conversation_id": conversation_id, "sources": turn.source_records}
+            ).format()
+            
+            parts = []
+            async for chunk in llm_manager.stream_response(
+                turn.llm_messages,
+                max_tokens=2000,
+                temperature=0.7
+            ):
+                parts.append(chunk)
+                yield SSEMessage(event="token", data={"content": chunk}).format()
+            
+            provider = llm_manager.providers.get(llm_manager.streamed_by)
+            ai_message = await self._persist_turn(
+                turn,
+                chat_request,
+                user_id,
+                content="".join(parts),
+                metadata={
+                    "model_used": getattr(provider, "model", None),
+                    "provider": llm_manager.streamed_by,
+                    "chunk_count": len(turn.sources),
+                    "streamed": True
                 },
-                created_at=datetime.now(timezone.utc)
+                tokens_used=0  # Streaming responses carry no usage
             )
-            await ai_message.save()
             
-            # Log query for analytics
-            await self._log_query(
-                user_id=user_id,
-                query=chat_request.message,
-                response=llm_response.content,
-                sources_count=len(sources),
-                tokens_used=llm_response.usage.get("total_tokens", 0),
-                response_time=0.0  # We can calculate this later if needed
-            )
-            
-            # Update conversation metadata
-            conversation.updated_at = datetime.now(timezone.utc)
-            previous_message_count = conversation.message_count or 0
-            conversation.message_count = previous_message_count + 2
-            
-            # Update conversation title to first user message if this is the first interaction
-            if previous_message_count == 0:
-                # Truncate message to reasonable title length
-                title = chat_request.message.strip()
-                if len(title) > 50:
-                    title = title[:47] + "..."
-                conversation.title = title
-                logger.info(f"Updated conversation title to: {title}")
-            
-            await conversation.save()
+            logger.info(f"Chat message streamed for user {user_id}")
+            yield SSEMessage(
+                event="done",
+                data={"conversation_id": conversation_id, "message_id": str(ai_message.id)}
+            ).format()
             
-            logger.info(f"Chat message processed for user {user_id}")
+        except Exception as e:
+            logger.error(f"Chat streaming failed: {str(e)}")
+            yield SSEMessage(event="error", data={"message": "Chat processing failed"}).format()
+        finally:
+            await llm_manager.cleanup()
+    
+    async def _prepare_turn(
+        self,
+        chat_request: ChatRequest,
+        user_id: str,
+        vector_store: MilvusVectorStore,
+        use_search_cache: bool = True
+    ) -> ChatTurn:
+        """
+        Load the conversation and context for a chat message and build the LLM prompt.
+        
+        Args:
+            chat_request: Chat request data
+            user_id: User ID
+            vector_store: Vector store manager
+            use_search_cache: Reuse recent identical vector searches
             
-            return ChatResponse(
-                message=llm_response.content,
-                sources=sources,
-                conversation_id=str(conversation.id),
-                message_id=str(ai_message.id),
-                tokens_used=llm_response.usage.get("total_tokens"),
-                model_used=llm_response.model
-            )
+        Returns:
+            ChatTurn: Everything needed to generate and store the reply
+        """
+        # Two clock reads per turn: when the message arrived and when the reply was ready
+        received_at = datetime.now(timezone.utc)
+        
+        # The conversation lookup (Mongo) and the retrieval (Milvus) are
+        # independent, so they run concurrently
+        conversation, context_results = await asyncio.gather(
+            self._get_or_create_conversation(chat_request.conversation_id, user_id, received_at),
+            self._search_context(vector_store, chat_request, user_id, use_search_cache)
+        )
+        
+        # Build the user message now; it is written together with the reply
+        # once the LLM has answered
+        user_message = Message(
+            id=PydanticObjectId(),
+            conversation_id=str(conversation.id),
+            role=MessageRole.USER,
+            content=chat_request.message,
+            user_id=user_id,
+            created_at=received_at
+        )
+        
+        # Prepare context and sources with fallback handling
+        if context_results:
+            # Found relevant chunks - one pass collects the context texts, the stored
+            # source dicts and the response objects backed by them
+            context_texts = []
+            source_records = []
+            sources = []
+            for result in context_results:
+                record = self._source_record(result)
+                context_texts.append(record["content"])
+                source_records.append(record)
+                sources.append(from_orm_trusted(SourceResponse, **record))
+            context_text = "\n\n".join(context_texts)
+            has_context = True
+        else:
+            # No relevant chunks found - prepare fallback response
+            context_text = ""
+            source_records = []
+            sources = []
+            has_context = False
+            logger.info(f"No relevant chunks found for user {user_id} query: '{chat_request.message[:100]}...'")
+        
+        # Prepare messages for LLM
+        llm_messages = await self._prepare_llm_messages(conversation, chat_request.message, context_text, has_context)
+        
+        return ChatTurn(received_at, conversation, user_message, source_records, sources, llm_messages)
+    
+    async def _persist_turn(
+        self,
+        turn: ChatTurn,
+        chat_request: ChatRequest,
+        user_id: str,
+        content: str,
+        metadata: Dict[str, Any],
+        tokens_used: int
+    ) -> Message:
+        """
+        Store both messages of a chat turn, bump the conversation and log the query.
+        
+        Args:
+            turn: Prepared chat turn
+            chat_request: Chat request data
+            user_id: User ID
+            content: Reply text
+            metadata: Reply metadata (model, provider, usage)
+            tokens_used: Tokens consumed by the reply
             
-        except Exception as e:
-            logger.error(f"Chat processing failed: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Chat processing failed"
+        Returns:
+            Message: The stored AI message
+        """
+        # Store AI message (stamped after the user message so history order holds)
+        replied_at = datetime.now(timezone.utc)
+        ai_message = Message(
+            id=PydanticObjectId(),
+            conversation_id=str(turn.conversation.id),
+            role=MessageRole.ASSISTANT,
+            content=content,
+            user_id=user_id,
+            sources=turn.source_records,
+            message_metadata=metadata,
+            created_at=replied_at
+        )
+        
+        # Update conversation metadata
+        conversation_update = {"updated_at": replied_at}
+        
+        # Update conversation title to first user message if this is the first interaction
+        if not turn.conversation.message_count:
+            # Truncate message to reasonable title length
+            title = chat_request.message.strip()
+            if len(title) > 50:
+                title = title[:47] + "..."
+            conversation_update["title"] = title
+            logger.info(f"Updated conversation title to: {title}")
+        
+        # Independent writes go out together: both messages in one insert, an
+        # in-place conversation update, and the analytics log
+        await asyncio.gather(
+            Message.insert_many([turn.user_message, ai_message]),
+            Conversation.get_motor_collection().update_one(
+                {"_id": turn.conversation.id},
+                {"$set": conversation_update, "$inc": {"message_count": 2}}
+            ),
+            self._log_query(
+                user_id=user_id,
+                query=chat_request.message,
+                response=content,
+                sources_count=len(turn.sources),
+                tokens_used=tokens_used,
+                response_time=(replied_at - turn.received_at).total_seconds(),
+                created_at=replied_at
             )
+        )
+        return ai_message
     
+    @wrap_errors("Failed to retrieve conversation")
     async def get_conversation_history(
         self,
         conversation_id: str,
-        user_id: str,
-        db: AsyncSession
+        user_id: str
     ) -> ConversationResponse:
         """
         Get conversation history.
         
         Args:
             conversation_id: Conversation ID
-            user_id: User ID
-            db: PostgreSQL database session (for user verification)
+            user_id: ID of the authenticated user (already loaded by the route)
             
         Returns:
             ConversationResponse: Conversation with messages
@@ -211,204 +363,276 @@ class ChatService:
         Raises:
             HTTPException: If conversation not found
         """
-        try:
-            # Verify user exists
-            user = await self._get_user_by_id(db, user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found"
-                )
-            
-            # Get conversation from MongoDB
-            conversation = await Conversation.get(conversation_id)
-            
-            if not conversation or conversation.user_id != user_id:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Conversation not found"
-                )
-            
-            # Get messages
-            messages = await Message.find(
-                Message.conversation_id == conversation_id
-            ).sort("+created_at").to_list()
-            
-            message_responses = [
-                MessageResponse(
-                    id=hash(str(msg.id)) % (10**9),  # Convert ObjectId to int
-                    role=msg.role,
-                    content=msg.content,
-                    timestamp=msg.created_at,
-                    sources=[SourceResponse(**source) for source in (msg.sources or [])],
-                    metadata=msg.message_metadata or {}
-                )
-                for msg in messages
-            ]
-            
-            return ConversationResponse(
-                id=str(conversation.id),
-                user_id=hash(conversation.user_id) % (10**9),  # Convert string user_id to int
-                title=conversation.title,
-                created_at=conversation.created_at,
-                updated_at=conversation.updated_at,
-                message_count=conversation.message_count or len(message_responses),
-                messages=message_responses
-            )
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.error(f"Get conversation history failed: {str(e)}")
+        # Get conversation from MongoDB
+        conversation = await Conversation.get(conversation_id)
+        
+        if not conversation or conversation.user_id != user_id:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to retrieve conversation"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found"
             )
+        
+        # Get messages as raw documents: Beanie would validate every Message on load
+        messages = await Message.get_motor_collection().find(
+            {"conversation_id": conversation_id}, MESSAGE_RESPONSE_FIELDS
+        ).sort("created_at", 1).to_list(length=None)
+        
+        # Messages and sources were validated when stored; construct without re-validating
+        message_responses = [
+            from_orm_trusted(
+                MessageResponse,
+                id=hash(str(msg["_id"])) % (10**9),  # Convert ObjectId to int
+                role=MessageRole(msg["role"]),
+                content=msg["content"],
+                timestamp=msg["created_at"],
+                sources=[from_orm_trusted(SourceResponse, **source) for source in (msg.get("sources") or [])],
+                metadata=msg.get("message_metadata") or {}
+            )
+            for msg in messages
+        ]
+        
+        return ConversationResponse.model_construct(
+            id=str(conversation.id),
+            user_id=hash(conversation.user_id) % (10**9),  # Convert string user_id to int
+            title=conversation.title,
+            created_at=conversation.created_at,
+            updated_at=conversation.updated_at,
+            message_count=conversation.message_count or len(message_responses),
+            messages=message_responses
+        )
     
+    @wrap_errors("Failed to retrieve conversations")
     async def get_user_conversations(
         self,
         user_id: str,
         skip: int,
-        limit: int,
-        db: AsyncSession
+        limit: int
     ) -> List[ConversationResponse]:
         """
         Get user's conversations.
         
         Args:
-            user_id: User ID
+            user_id: ID of the authenticated user (already loaded by the route)
             skip: Number of conversations to skip
             limit: Maximum number of conversations to return
-            db: PostgreSQL database session (for user verification)
             
         Returns:
             List[ConversationResponse]: List of user conversations
-            
-        Raises:
-            HTTPException: If user not found
         """
-        try:
-            logger.info(f"Getting conversations for user: {user_id}")
-            
-            # Verify user exists
-            user = await self._get_user_by_id(db, user_id)
-            if not user:
-                logger.error(f"User not found: {user_id}")
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found"
-                )
-            
-            logger.info(f"User verified: {user.email}")
-            
-            # Get conversations from MongoDB
-            logger.info(f"Fetching conversations from MongoDB for user: {user_id}")
-            conversations = await Conversation.find(
-                Conversation.user_id == user_id
-            ).sort("-updated_at").skip(skip).limit(limit).to_list()
-            
-            logger.info(f"Found {len(conversations)} conversations for user {user_id}")
-            
-            conversation_responses = []
-            for i, conv in enumerate(conversations):
-                try:
-                    logger.info(f"Processing conversation {i+1}/{len(conversations)}: {conv.id}")
-                    
-                    # Get recent messages for preview
-                    recent_messages = await Message.find(
-                        Message.conversation_id == str(conv.id)
-                    ).sort("-created_at").limit(5).to_list()
-                    
-                    logger.info(f"Found {len(recent_messages)} messages for conversation {conv.id}")
-                    
-                    message_responses = []
-                    for j, msg in enumerate(reversed(recent_messages)):
-                        try:
-                            logger.info(f"Processing message {j+1}/{len(recent_messages)}: {msg.id}")
-                            
-                            # Process sources safely
-                            sources = []
-                            if msg.sources:
-                                for source in msg.sources:
-                                    try:
-                                        sources.append(SourceResponse(**source))
-                                    except Exception as source_error:
-                                        logger.warning(f"Failed to process source in message {msg.id}: {source_error}")
-                            
-                            message_response = MessageResponse(
-                                id=hash(str(msg.id)) % (10**9),  # Convert ObjectId to int
-                                role=msg.role,
-                                content=msg.content,
-                                timestamp=msg.created_at,
-                                sources=sources,
-                                metadata=msg.message_metadata or {}
-                            )
-                            message_responses.append(message_response)
-                            logger.info(f"Successfully processed message {msg.id}")
-                            
-                        except Exception as msg_error:
-                            logger.error(f"Failed to process message {msg.id}: {str(msg_error)}")
-                            # Continue with other messages instead of failing completely
-                            continue
-                    
-                    conversation_response = ConversationResponse(
-                        id=str(conv.id),
-                        user_id=hash(conv.user_id) % (10**9),  # Convert string user_id to int
-                        title=conv.title,
-                        created_at=conv.created_at,
-                        updated_at=conv.updated_at,
-                        message_count=conv.message_count or 0,
-                        messages=message_responses
-                    )
-                    conversation_responses.append(conversation_response)
-                    logger.info(f"Successfully processed conversation {conv.id}")
-                    
-                except Exception as conv_error:
-                    logger.error(f"Failed to process conversation {conv.id}: {str(conv_error)}")
-                    # Continue with other conversations instead of failing completely
-                    continue
-            
-            logger.info(f"Successfully processed {len(conversation_responses)} conversations for user {user_id}")
-            return conversation_responses
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.error(f"Get user conversations failed for user {user_id}: {str(e)}", exc_info=True)
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to retrieve conversations: {str(e)}"
-            )
+        logger.info(f"Getting conversations for user: {user_id}")
+        
+        # One aggregation returns the page of conversations with their latest
+        # messages inlined, instead of one message query per conversation
+        conversations = await Conversation.get_motor_collection().aggregate(
+            self._conversations_page_pipeline(user_id, skip, limit)
+        ).to_list(length=None)
+        
+        logger.info(f"Found {len(conversations)} conversations for user {user_id}")
+        
+        conversation_responses = []
+        for conv in conversations:
+            try:
+                message_responses = []
+                for msg in reversed(conv["recent_messages"]):
+                    try:
+                        # Process sources safely
+                        sources = []
+                        for source in msg.get("sources") or []:
+                            try:
+                                sources.append(from_orm_trusted(SourceResponse, **source))
+                            except Exception as source_error:
+                                logger.warning(f"Failed to process source in message {msg['_id']}: {source_error}")
+                        
+                        message_responses.append(from_orm_trusted(
+                            MessageResponse,
+                            id=hash(str(msg["_id"])) % (10**9),  # Convert ObjectId to int
+                            role=MessageRole(msg["role"]),
+                            content=msg["content"],
+                            timestamp=msg["created_at"],
+                            sources=sources,
+                            metadata=msg.get("message_metadata") or {}
+                        ))
+                        
+                    except Exception as msg_error:
+                        logger.error(f"Failed to process message {msg.get('_id')}: {str(msg_error)}")
+                        # Continue with other messages instead of failing completely
+                        continue
+                
+                conversation_responses.append(ConversationResponse.model_construct(
+                    id=str(conv["_id"]),
+                    user_id=hash(conv["user_id"]) % (10**9),  # Convert string user_id to int
+                    title=conv["title"],
+                    created_at=conv["created_at"],
+                    updated_at=conv["updated_at"],
+                    message_count=conv.get("message_count") or 0,
+                    messages=message_responses
+                ))
+                
+            except Exception as conv_error:
+                logger.error(f"Failed to process conversation {conv.get('_id')}: {str(conv_error)}")
+                # Continue with other conversations instead of failing completely
+                continue
+        
+        logger.info(f"Successfully processed {len(conversation_responses)} conversations for user {user_id}")
+        return conversation_responses
     
     # Private helper methods
     
-    async def _get_user_by_id(self, db: AsyncSession, user_id: str) -> Optional[User]:
-        """Get user by ID from PostgreSQL."""
-        from sqlalchemy import select
-        result = await db.execute(select(User).where(User.id == user_id))
-        return result.scalar_one_or_none()
+    @staticmethod
+    def _conversations_page_pipeline(user_id: str, skip: int, limit: int) -> List[Dict[str, Any]]:
+        """
+        Build the aggregation for a page of conversations with their recent messages.
+        
+        The `$lookup` sub-pipeline is served by the messages
+        (conversation_id, created_at) index.
+        
+        Args:
+            user_id: User ID
+            skip: Number of conversations to skip
+            limit: Maximum number of conversations to return
+            
+        Returns:
+            List[Dict[str, Any]]: Aggregation pipeline
+        """
+        return [
+            {"$match": {"user_id": user_id}},
+            {"$sort": {"updated_at": -1}},
+            {"$skip": skip},
+            {"$limit": limit},
+            {"$project": {"title": 1, "user_id": 1, "created_at": 1, "updated_at": 1, "message_count": 1}},
+            {"$lookup": {
+                "from": Message.get_collection_name(),
+                "let": {"conversation_id": {"$toString": "$_id"}},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$conversation_id", "$$conversation_id"]}}},
+                    {"$sort": {"created_at": -1}},
+                    {"$limit": RECENT_MESSAGES_PREVIEW},
+                    {"$project": MESSAGE_RESPONSE_FIELDS}
+                ],
+                "as": "recent_messages"
+            }}
+        ]
+    
+    async def get_conversations_version(self, user_id: str) -> Tuple[int, Optional[datetime]]:
+        """
+        Get a cheap version key for a user's conversation list.
+        
+        Any new conversation or message bumps one of the values, because
+        sending a message updates the conversation's `updated_at`.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            Tuple[int, Optional[datetime]]: Conversation count and latest update time
+        """
+        # One round trip over the (user_id, updated_at) index; no documents are loaded
+        rows = await Conversation.get_motor_collection().aggregate([
+            {"$match": {"user_id": user_id}},
+            {"$group": {"_id": None, "count": {"$sum": 1}, "latest": {"$max": "$updated_at"}}}
+        ]).to_list(length=1)
+        if not rows:
+            return 0, None
+        return rows[0]["count"], rows[0]["latest"]
     
     async def _get_or_create_conversation(
         self, 
         conversation_id: Optional[str], 
-        user_id: str
+        user_id: str,
+        now: Optional[datetime] = None
     ) -> Conversation:
-        """Get existing conversation or create new one."""
+        """Get existing conversation or create new one (stamped with `now`)."""
         if conversation_id:
             conversation = await Conversation.get(conversation_id)
             if conversation and conversation.user_id == user_id:
                 return conversation
         
         # Create new conversation
+        now = now or datetime.now(timezone.utc)
         conversation = Conversation(
             user_id=user_id,
             title="New Conversation",
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc)
+            created_at=now,
+            updated_at=now
         )
         await conversation.save()
         return conversation
     
+    async def _search_context(
+        self,
+        vector_store: MilvusVectorStore,
+        chat_request: ChatRequest,
+        user_id: str,
+        use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve relevant chunks for a chat message, reusing recent identical searches.
+        
+        Empty results are not cached, so a document that finishes processing
+        is picked up on the next message.
+        
+        Args:
+            vector_store: Vector store manager
+            chat_request: Chat request data
+            user_id: User ID
+            use_cache: Whether to read the search cache
+            
+        Returns:
+            List[Dict[str, Any]]: Search hits
+        """
+        k = chat_request.max_chunks or 5
+        latest = await Document.get_motor_collection().find_one(
+            {"user_id": user_id},
+            {"_id": 0, "updated_at": 1},
+            sort=[("updated_at", -1)]
+        )
+        key = (
+            user_id,
+            latest["updated_at"] if latest else None,
+            hashlib.blake2b(chat_request.message.encode("utf-8"), digest_size=16).digest(),
+            k,
+            tuple(chat_request.document_ids or ())
+        )
+        if use_cache:
+            cached = _search_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        # Retrieve relevant context from vector store with user isolation
+        results = await vector_store.search_similar_chunks(
+            query=chat_request.message,
+            user_id=user_id,
+            k=k,
+            doc_ids=chat_request.document_ids,
+            similarity_threshold=0.5  # Lower threshold for better results
+        )
+        if results:
+            _search_cache.set(key, results)
+        return results
+    
+    @staticmethod
+    def _source_record(result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the stored form of a source from a vector search hit.
+        
+        Args:
+            result: Search result from the vector store
+            
+        Returns:
+            Dict[str, Any]: Source fields, as stored in Message.sources
+        """
+        metadata = result.get("metadata") or {}
+        return {
+            "document_id": result["doc_id"],
+            "document_name": result.get("source", "Unknown Document"),
+            "chunk_id": result["chunk_id"],
+            "page_number": metadata.get("page_number"),
+            "content": result["text"],
+            "similarity_score": result["similarity_score"],
+            "start_char": metadata.get("start_char"),
+            "end_char": metadata.get("end_char")
+        }
+    
     async def _prepare_llm_messages(
         self, 
         conversation: Conversation, 
@@ -417,20 +641,18 @@ class ChatService:
         has_context: bool = True
     ) -> List[Dict[str, str]]:
         """Prepare messages for LLM."""
-        # Get recent conversation history
-        recent_messages = await Message.find(
-            Message.conversation_id == str(conversation.id)
-        ).sort("-created_at").limit(10).to_list()
+        # Get recent conversation history (only role and content; a new conversation has none)
+        recent_messages = []
+        if conversation.message_count:
+            recent_messages = await Message.get_motor_collection().find(
+                {"conversation_id": str(conversation.id)}, LLM_HISTORY_FIELDS
+            ).sort("created_at", -1).limit(LLM_HISTORY_LIMIT).to_list(length=None)
         
         # Prepare system message based on whether we have context
         if has_context and context:
             system_content = f"You are a helpful AI assistant. Use the following context to answer questions accurately:\n\n{context}"
         else:
-            system_content = (
-                "You are a helpful AI assistant. I could not find any relevant information in the uploaded documents for this query. "
-                "Please provide a general response based on your knowledge, but start your response with: "
-                "'I could not find any relevant information in the documents, but here's what I can tell you:'"
-            )
+            system_content = NO_CONTEXT_SYSTEM_PROMPT
         
         messages = [
             {
@@ -442,8 +664,8 @@ class ChatService:
         # Add conversation history (in chronological order)
         for msg in reversed(recent_messages):
             messages.append({
-                "role": "user" if msg.role == MessageRole.USER else "assistant",
-                "content": msg.content
+                "role": LLM_ROLES.get(msg["role"], "assistant"),
+                "content": msg["content"]
             })
         
         # Add current message
@@ -461,7 +683,8 @@ class ChatService:
         response: str,
         sources_count: int,
         tokens_used: int,
-        response_time: float
+        response_time: float,
+        created_at: Optional[datetime] = None
     ):
         """Log query for analytics."""
         query_log = QueryLog(
@@ -471,6 +694,6 @@ class ChatService:
             sources_count=sources_count,
             tokens_used=tokens_used,
             response_time=response_time,
-            created_at=datetime.now(timezone.utc)
+            created_at=created_at or datetime.now(timezone.utc)
         )
         await query_log.save() 
\ No newline at end of file
@@ -4,24 +4,35 @@ Document Service
 Business logic for document upload, processing, and management.
 """
 
+import asyncio
 import os
 import logging
-from typing import List, Optional, Dict, Any
+import tempfile
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timezone
-from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status, UploadFile
 from bson import ObjectId
+import aiofiles
 
-from ..db.postgres import User
-from ..db.mongodb import Document, Chunk
+from ..db.mongodb import Document, ChunkRaw, bulk_insert_chunks, delete_chunks
+from ..db.clock import pinned_now
+from ..models.construct import from_orm_trusted
 from ..models.document import (
-    DocumentResponse, UploadResponse, ProcessingStatus, DocumentStatus, DocumentType
+    DocumentResponse, ProcessingStatus, DocumentStatus, DocumentType
 )
-from ..utils.document_processor import DocumentProcessor
+from ..utils.document_processor import DocumentProcessor, UPLOAD_CHUNK_SIZE
 from ..db.milvus_vector_store import MilvusVectorStore
 from ..utils.sse import DocumentProcessingEventEmitter, ProcessingStatus
+from ..config import get_settings
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Document fields read to build a DocumentResponse in the list view
+DOCUMENT_LIST_FIELDS = {
+    "original_filename": 1, "file_size": 1, "file_type": 1, "status": 1, "total_chunks": 1,
+    "uploaded_at": 1, "processed_at": 1, "user_id": 1, "file_path": 1
+}
 
 
 class DocumentService:
@@ -30,78 +41,52 @@ class DocumentService:
     def __init__(self):
         self.processor = DocumentProcessor()
     
-    async def upload_document(
+    async def accept_upload(
         self, 
         file: UploadFile, 
-        user_id: str, 
-        db: AsyncSession,
-        vector_store: MilvusVectorStore,
-        event_emitter: DocumentProcessingEventEmitter = None
-    ) -> UploadResponse:
+        user_id: str
+    ) -> Tuple[Document, str]:
         """
-        Upload and process a document.
+        Validate an upload, spool it to disk and create its document record.
+        
+        Processing is left to `process_upload`, which is meant to run outside
+        the request.
         
         Args:
             file: Uploaded file
-            user_id: User ID
-            db: PostgreSQL database session
-            vector_store: Milvus vector store instance
-            event_emitter: Optional event emitter for progress updates
+            user_id: ID of the authenticated user (already loaded by the route)
             
         Returns:
-            UploadResponse: Upload result
+            Tuple[Document, str]: The PROCESSING document record and the spooled
+            file path (handed to `process_upload`, which deletes it)
+            
+        Raises:
+            HTTPException: If the user or file is invalid or the record cannot be created
         """
+        file_path = None
+        accepted = False
         try:
-            # Emit starting status
-            if event_emitter:
-                await event_emitter.emit_status(ProcessingStatus.STARTED)
-            
-            # Validate user exists
-            if event_emitter:
-                await event_emitter.emit_status(ProcessingStatus.VALIDATING, "Validating user and file...")
-                
-            user = await self._get_user_by_id(db, user_id)
-            if not user:
-                error_msg = "User not found"
-                if event_emitter:
-                    await event_emitter.emit_status(ProcessingStatus.FAILED, error_msg)
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=error_msg
-                )
-            
             # Validate file
             if not file or not file.filename:
-                error_msg = "No file provided or filename is empty"
-                if event_emitter:
-                    await event_emitter.emit_status(ProcessingStatus.FAILED, error_msg)
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=error_msg
+                    detail="No file provided or filename is empty"
                 )
             
-            # Read file content once and store it
+            # Spool the upload to a temp file in chunks instead of reading it into memory
             try:
-                file_content = await file.read()
-                file_size = len(file_content)
-                
-                # Validate file size
-                if file_size == 0:
-                    error_msg = "File is empty"
-                    if event_emitter:
-                        await event_emitter.emit_status(ProcessingStatus.FAILED, error_msg)
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=error_msg
-                    )
-                    
+                file_path, file_size = await self._spool_upload(file)
             except Exception as e:
-                error_msg = f"Failed to read file content: {str(e)}"
-                if event_emitter:
-                    await event_emitter.emit_status(ProcessingStatus.FAILED, error_msg)
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=error_msg
+                    detail=f"Failed to read file content: {str(e)}"
+                )
+            
+            # Validate file size
+            if file_size == 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="File is empty"
                 )
             
             # Determine file type
@@ -118,16 +103,18 @@ class DocumentService:
             
             # Create document record (MongoDB) with all required fields
             try:
-                document = Document(
-                    filename=safe_filename,
-                    original_filename=file.filename,
-                    file_path=f"/uploads/{user_id}/{safe_filename}",
-                    file_type=file_type,
-                    file_size=file_size,
-                    user_id=user_id,
-                    status=DocumentStatus.PROCESSING,
-                    record_status=1  # Set as active document
-                )
+                # One timestamp for the record's uploaded/updated fields
+                with pinned_now():
+                    document = Document(
+                        filename=safe_filename,
+                        original_filename=file.filename,
+                        file_path=f"/uploads/{user_id}/{safe_filename}",
+                        file_type=file_type,
+                        file_size=file_size,
+                        user_id=user_id,
+                        status=DocumentStatus.PROCESSING,
+                        record_status=1  # Set as active document
+                    )
                 
                 # Save document to MongoDB
                 await document.save()
@@ -135,24 +122,14 @@ class DocumentService:
             except Exception as e:
                 error_msg = f"Failed to create document record: {str(e)}"
                 logger.error(error_msg)
-                if event_emitter:
-                    await event_emitter.emit_status(ProcessingStatus.FAILED, error_msg)
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=error_msg
                 )
             
-            # Process document with progress updates (pass file content directly)
-            await self._process_document(file_content, file.filename, document, vector_store, event_emitter)
-            
             logger.info(f"Document uploaded: {file.filename} by user {user_id}")
-            
-            return UploadResponse(
-                document_id=str(document.id),
-                filename=file.filename,
-                status=DocumentStatus.PROCESSING,
-                message="Document upload initiated. Processing in background."
-            )
+            accepted = True
+            return document, file_path
             
         except HTTPException:
             # Re-raise HTTP exceptions (they already have proper status codes)
@@ -160,29 +137,129 @@ class DocumentService:
         except Exception as e:
             error_msg = f"Document upload failed: {str(e)}" if str(e) else "Document upload failed: Unknown error"
             logger.error(error_msg)
-            
-            # Emit failure status for SSE
-            if event_emitter:
-                await event_emitter.emit_status(ProcessingStatus.FAILED, error_msg)
-            
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=error_msg
             )
+        finally:
+            # The spooled file is handed to process_upload only once the record exists
+            if not accepted and file_path is not None:
+                os.unlink(file_path)
+    
+    async def process_upload(
+        self,
+        file_path: str,
+        document: Document,
+        vector_store: MilvusVectorStore,
+        event_emitter: DocumentProcessingEventEmitter = None
+    ) -> None:
+        """
+        Process an accepted upload and delete its spooled file.
+        
+        The document record tracks the outcome (COMPLETED or FAILED), so this
+        can run in a background worker after the request has returned.
+        
+        Args:
+            file_path: Spooled file returned by `accept_upload`
+            document: Document record returned by `accept_upload`
+            vector_store: Milvus vector store instance
+            event_emitter: Optional event emitter for progress updates
+        """
+        try:
+            if event_emitter:
+                await event_emitter.emit_status(ProcessingStatus.STARTED, data={"document_id": str(document.id)})
+            
+            await self._process_document(
+                file_path, document.original_filename, document, vector_store, event_emitter
+            )
+        finally:
+            os.unlink(file_path)
+    
+    async def _spool_upload(self, file: UploadFile) -> Tuple[str, int]:
+        """
+        Copy an upload to a temporary file chunk by chunk, enforcing the size limit.
+        
+        Args:
+            file: Uploaded file
+            
+        Returns:
+            Tuple[str, int]: Temp file path (caller deletes it) and file size in bytes
+            
+        Raises:
+            ValueError: If the file exceeds `max_upload_bytes`
+        """
+        fd, path = tempfile.mkstemp(prefix="upload-", suffix=os.path.splitext(file.filename)[1])
+        os.close(fd)
+        size = 0
+        try:
+            async with aiofiles.open(path, "wb") as out:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > settings.max_upload_bytes:
+                        raise ValueError(f"File exceeds the {settings.max_upload_bytes // (1024 * 1024)} MB upload limit")
+                    await out.write(chunk)
+        except BaseException:
+            os.unlink(path)
+            raise
+        return path, size
     
+    async def discard_upload(self, file_path: str, document: Document) -> None:
+        """
+        Clean up an accepted upload whose processing never started.
+        
+        Deletes the spooled file and marks the document FAILED so it does not
+        stay PROCESSING.
+        
+        Args:
+            file_path: Spooled file returned by `accept_upload`
+            document: Document record returned by `accept_upload`
+        """
+        os.unlink(file_path)
+        document.status = DocumentStatus.FAILED
+        document.error_message = "Processing cancelled"
+        document.processed_at = datetime.now(timezone.utc)
+        document.updated_at = document.processed_at
+        await document.save()
+        logger.info(f"Document processing cancelled before it started: {document.filename}")
+    
+    async def get_document_version(
+        self,
+        document_id: str,
+        user_id: str
+    ) -> Optional[datetime]:
+        """
+        Get a cheap version key for one of the user's documents.
+
+        Status changes bump `updated_at`, so it identifies every version of
+        the document response. Only that field is read from MongoDB.
+
+        Args:
+            document_id: Document ID
+            user_id: User ID
+
+        Returns:
+            Optional[datetime]: Last update time, or None if the document is missing
+        """
+        if not ObjectId.is_valid(document_id):
+            return None
+
+        raw = await Document.get_motor_collection().find_one(
+            {"_id": ObjectId(document_id), "user_id": user_id, "record_status": 1},
+            {"updated_at": 1}
+        )
+        return raw.get("updated_at") if raw else None
+
     async def get_document(
         self, 
         document_id: str, 
-        user_id: str, 
-        db: AsyncSession
+        user_id: str
     ) -> DocumentResponse:
         """
         Get a specific document.
         
         Args:
             document_id: Document ID
-            user_id: User ID
-            db: PostgreSQL database session (for user verification)
+            user_id: ID of the authenticated user (already loaded by the route)
             
         Returns:
             DocumentResponse: Document information
@@ -191,14 +268,6 @@ class DocumentService:
             HTTPException: If document not found
         """
         try:
-            # Verify user exists
-            user = await self._get_user_by_id(db, user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found"
-                )
-            
             # Get document from MongoDB (only active documents)
             try:
                 obj_id = ObjectId(document_id)
@@ -247,52 +316,59 @@ class DocumentService:
         self, 
         user_id: str, 
         skip: int, 
-        limit: int, 
-        db: AsyncSession
+        limit: int,
+        cursor: Optional[str] = None
     ) -> List[DocumentResponse]:
         """
-        Get user's documents with pagination.
+        Get user's documents with pagination, newest first.
         
         Args:
-            user_id: User ID
-            skip: Number of documents to skip
+            user_id: ID of the authenticated user (already loaded by the route)
+            skip: Number of documents to skip (ignored when `cursor` is given)
             limit: Maximum number of documents to return
-            db: PostgreSQL database session (for user verification)
+            cursor: ID of the last document of the previous page (keyset pagination)
             
         Returns:
             List[DocumentResponse]: List of user documents
             
         Raises:
-            HTTPException: If user not found
+            HTTPException: If the cursor is invalid or retrieval fails
         """
         try:
-            # Verify user exists
-            user = await self._get_user_by_id(db, user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found"
-                )
+            # Get documents from MongoDB (only active documents) as raw, projected
+            # rows: the list never needs text_content or processing_metadata
+            query = {"user_id": user_id, "record_status": 1}
+            if cursor is not None:
+                try:
+                    after_id = ObjectId(cursor)
+                except Exception:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Invalid cursor"
+                    )
+                # Keyset: continue below the last seen _id instead of re-scanning skipped rows
+                query["_id"] = {"$lt": after_id}
             
-            # Get documents from MongoDB (only active documents)
-            documents = await Document.find(
-                Document.user_id == user_id,
-                Document.record_status == 1
-            ).skip(skip).limit(limit).to_list()
+            rows = Document.get_motor_collection().find(query, DOCUMENT_LIST_FIELDS).sort("_id", -1)
+            if cursor is None:
+                rows = rows.skip(skip)
+            documents = await rows.limit(limit).to_list(length=limit)
             
+            # Rows were validated when stored; construct without re-validating
             return [
-                DocumentResponse(
-                    id=str(doc.id),
-                    name=doc.original_filename,
-                    file_size=doc.file_size,
-                    file_type=doc.file_type,
-                    status=doc.status,
-                    chunk_count=doc.total_chunks,
+                from_orm_trusted(
+                    DocumentResponse,
+                    id=str(doc["_id"]),
+                    name=doc["original_filename"],
+                    file_size=doc["file_size"],
+                    file_type=DocumentType(doc["file_type"]),
+                    status=DocumentStatus(doc["status"]),
+                    chunk_count=doc.get("total_chunks") or 0,
                     query_count=0,  # Default value, can be enhanced later
-                    uploaded_at=doc.uploaded_at,
-                    processed_at=doc.processed_at,
-                    user_id=doc.user_id,
-                    file_path=doc.file_path
+                    uploaded_at=doc["uploaded_at"],
+                    processed_at=doc.get("processed_at"),
+                    user_id=doc["user_id"],
+                    file_path=doc["file_path"]
                 )
                 for doc in documents
             ]
@@ -309,8 +385,7 @@ class DocumentService:
     async def delete_document(
         self, 
         document_id: str, 
-        user_id: str, 
-        db: AsyncSession,
+        user_id: str,
         vector_store: MilvusVectorStore
     ) -> Dict[str, Any]:
         """
@@ -318,8 +393,7 @@ class DocumentService:
         
         Args:
             document_id: Document ID
-            user_id: User ID
-            db: PostgreSQL database session (for user verification)
+            user_id: ID of the authenticated user (already loaded by the route)
             vector_store: Vector store manager
             
         Returns:
@@ -329,14 +403,6 @@ class DocumentService:
             HTTPException: If deletion fails
         """
         try:
-            # Verify user exists
-            user = await self._get_user_by_id(db, user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found"
-                )
-            
             # Get document from MongoDB (only active documents)
             try:
                 obj_id = ObjectId(document_id)
@@ -358,14 +424,15 @@ class DocumentService:
                     detail="Document not found"
                 )
             
+            # Remove from vector store first: bumping updated_at below is what
+            # moves chat search onto fresh cache keys
+            await vector_store.delete_document_chunks(user_id, document_id)
+            
             # Soft delete: update record_status to -1
             document.record_status = -1
             document.updated_at = datetime.now(timezone.utc)
             await document.save()
             
-            # Remove from vector store
-            await vector_store.delete_document_chunks(user_id, document_id)
-            
             logger.info(f"Document soft deleted: {document.filename} by user {user_id}")
             
             return {"message": "Document deleted successfully"}
@@ -382,16 +449,14 @@ class DocumentService:
     async def get_processing_status(
         self, 
         document_id: str, 
-        user_id: str, 
-        db: AsyncSession
+        user_id: str
     ) -> ProcessingStatus:
         """
         Get document processing status.
         
         Args:
             document_id: Document ID
-            user_id: User ID
-            db: PostgreSQL database session (for user verification)
+            user_id: ID of the authenticated user (already loaded by the route)
             
         Returns:
             ProcessingStatus: Processing status information
@@ -400,14 +465,6 @@ class DocumentService:
             HTTPException: If document not found
         """
         try:
-            # Verify user exists
-            user = await self._get_user_by_id(db, user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found"
-                )
-            
             # Get document from MongoDB (only active documents)
             try:
                 obj_id = ObjectId(document_id)
@@ -448,15 +505,9 @@ class DocumentService:
     
     # Private helper methods
     
-    async def _get_user_by_id(self, db: AsyncSession, user_id: str) -> Optional[User]:
-        """Get user by ID from PostgreSQL."""
-        from sqlalchemy import select
-        result = await db.execute(select(User).where(User.id == user_id))
-        return result.scalar_one_or_none()
-    
     async def _process_document(
         self, 
-        file_content: bytes,
+        file_path: str,
         filename: str, 
         document: Document, 
         vector_store: MilvusVectorStore,
@@ -468,7 +519,7 @@ class DocumentService:
             if event_emitter:
                 await event_emitter.emit_status(ProcessingStatus.EXTRACTING, "Extracting text from document...")
             
-            result = await self.processor.process_document_content(file_content, filename)
+            result = await self.processor.process_document_file(file_path, filename)
             
             # Update progress - chunking
             if event_emitter:
@@ -478,7 +529,44 @@ class DocumentService:
                     {"chunk_count": len(result["chunks"]), "word_count": result["word_count"]}
                 )
             
-            # Update document record
+            # Chunk rows in MongoDB and embeddings in Milvus are independent writes;
+            # run them together so embedding overlaps with the Mongo round trips
+            if event_emitter:
+                await event_emitter.emit_status(ProcessingStatus.EMBEDDING, "Generating embeddings...")
+            
+            # One timestamp shared by the whole batch
+            with pinned_now():
+                chunk_rows = [
+                    ChunkRaw(
+                        document_id=str(document.id),
+                        content=chunk_data["content"],
+                        chunk_index=i,
+                        chunk_metadata=chunk_data["metadata"]
+                    )
+                    for i, chunk_data in enumerate(result["chunks"])
+                ]
+            
+            # Let both writes finish before raising, so a failed Mongo insert can't be
+            # followed by vectors landing after the cleanup below has run
+            outcomes = await asyncio.gather(
+                bulk_insert_chunks(chunk_rows),
+                vector_store.add_document_chunks(
+                    user_id=document.user_id,
+                    doc_id=str(document.id),
+                    source=document.filename,
+                    chunks=[chunk["content"] for chunk in result["chunks"]],
+                    chunk_metadata=[chunk["metadata"] for chunk in result["chunks"]]
+                ),
+                return_exceptions=True
+            )
+            for outcome in outcomes:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+            
+            # Final storage step: only mark the document completed once its chunks are stored
+            if event_emitter:
+                await event_emitter.emit_status(ProcessingStatus.STORING, "Finalizing document storage...")
+            
             document.text_content = result["full_text"][:5000]  # Store first 5000 chars as preview
             document.total_chunks = len(result["chunks"])
             document.processing_metadata = {
@@ -488,35 +576,8 @@ class DocumentService:
             }
             document.processed_at = datetime.now(timezone.utc)
             document.status = DocumentStatus.COMPLETED
+            document.updated_at = document.processed_at
             await document.save()
-
-            # Save chunks to MongoDB
-            for i, chunk_data in enumerate(result["chunks"]):
-                chunk = Chunk(
-                    document_id=str(document.id),
-                    content=chunk_data["content"],
-                    chunk_index=i,
-                    chunk_metadata=chunk_data["metadata"],
-                    created_at=datetime.now(timezone.utc)
-                )
-                await chunk.save()
-
-            # Generate embeddings and store in vector database
-            if event_emitter:
-                await event_emitter.emit_status(ProcessingStatus.EMBEDDING, "Generating embeddings...")
-            
-            chunk_metadata = [chunk["metadata"] for chunk in result["chunks"]]
-            await vector_store.add_document_chunks(
-                user_id=document.user_id,
-                doc_id=str(document.id),
-                source=document.filename,
-                chunks=[chunk["content"] for chunk in result["chunks"]],
-                chunk_metadata=chunk_metadata
-            )
-            
-            # Final storage step
-            if event_emitter:
-                await event_emitter.emit_status(ProcessingStatus.STORING, "Finalizing document storage...")
             
             # Emit completion status
             if event_emitter:
@@ -532,10 +593,14 @@ class DocumentService:
                 )
             
         except Exception as e:
+            await self._discard_vectors(document, vector_store)
+            await self._discard_chunks(document)
+            
             # Update document with error status
             document.status = DocumentStatus.FAILED
             document.error_message = str(e)
             document.processed_at = datetime.now(timezone.utc)
+            document.updated_at = document.processed_at
             await document.save()
             
             # Emit failure status
@@ -543,4 +608,30 @@ class DocumentService:
                 await event_emitter.emit_status(ProcessingStatus.FAILED, f"Processing failed: {str(e)}")
             
             logger.error(f"Document processing failed: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+        except asyncio.CancelledError:
+            # Worker shut down mid-run; don't leave the document stuck in PROCESSING
+            await self._discard_vectors(document, vector_store)
+            await self._discard_chunks(document)
+            document.status = DocumentStatus.FAILED
+            document.error_message = "Processing cancelled"
+            document.processed_at = datetime.now(timezone.utc)
+            document.updated_at = document.processed_at
+            await document.save()
+            
+            logger.info(f"Document processing cancelled: {document.filename}")
+            raise
+    
+    async def _discard_vectors(self, document: Document, vector_store: MilvusVectorStore) -> None:
+        """Remove any vectors a failed processing run wrote, so chat search can't return them."""
+        try:
+            await vector_store.delete_document_chunks(document.user_id, str(document.id))
+        except Exception as e:
+            logger.error(f"Failed to discard vectors of document {document.id}: {str(e)}")
+    
+    async def _discard_chunks(self, document: Document) -> None:
+        """Remove any chunks a failed processing run stored, so a vector rebuild can't re-index them."""
+        try:
+            await delete_chunks(str(document.id))
+        except Exception as e:
+            logger.error(f"Failed to discard chunks of document {document.id}: {str(e)}")
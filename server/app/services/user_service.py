@@ -3,14 +3,16 @@ from typing import Dict, Any
 from fastapi import HTTPException, status
 from datetime import datetime, timezone
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
-from .auth_service import AuthService
+from .auth_service import AuthService, invalidate_cached_user
 from ..models.auth import UserResponse, UserUpdate, LLMConfigUpdate
+from ..models.construct import from_orm_trusted
 from ..utils.auth import (
-    hash_password,
-    verify_password
+    hash_password_async,
+    verify_password_async
 )
 
 settings = get_settings()
@@ -57,11 +59,10 @@ class UserSerivce:
             # Count total queries made by user
             query_count = await mongo_db["query_logs"].count_documents({"user_id": user_id})
             
-            return UserResponse(
+            return from_orm_trusted(
+                UserResponse,
+                user,
                 id=str(user.id),
-                email=user.email,
-                role=user.role,
-                created_at=user.created_at,
                 document_count=document_count,
                 query_count=query_count
             )
@@ -103,6 +104,8 @@ class UserSerivce:
                     detail="User not found"
                 )
             
+            previous_email = user.email
+            
             # Update fields if provided
             if update_data.full_name is not None:
                 user.full_name = update_data.full_name
@@ -111,8 +114,7 @@ class UserSerivce:
             
             if update_data.email is not None:
                 # Check if new email is already taken
-                existing_user = await self.auth_service._get_user_by_email(db, update_data.email)
-                if existing_user and existing_user.id != user.id:
+                if await self.auth_service._email_exists(db, update_data.email, exclude_user_id=user.id):
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
                         detail="Email already in use"
@@ -120,8 +122,18 @@ class UserSerivce:
                 user.email = update_data.email
             
             user.updated_at = datetime.now(timezone.utc)
-            await db.commit()
-            await db.refresh(user)
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Lost a race with another user taking the same email
+                await db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Email already in use"
+                )
+            # Sessions don't expire on commit and every changed column was set here,
+            # so the in-memory user already matches the row; no refresh SELECT
+            invalidate_cached_user(user.id, previous_email, user.email)
             
             logger.info(f"Profile updated for user: {user.email}")
             
@@ -135,11 +147,10 @@ class UserSerivce:
             # Count total queries made by user
             query_count = await mongo_db["query_logs"].count_documents({"user_id": user_id})
             
-            return UserResponse(
+            return from_orm_trusted(
+                UserResponse,
+                user,
                 id=str(user.id),
-                email=user.email,
-                role=user.role,
-                created_at=user.created_at,
                 document_count=document_count,
                 query_count=query_count
             )
@@ -185,16 +196,17 @@ class UserSerivce:
                 )
             
             # Verify current password
-            if not verify_password(current_password, user.hashed_password):
+            if not await verify_password_async(current_password, user.hashed_password):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Current password is incorrect"
                 )
             
             # Update password
-            user.hashed_password = hash_password(new_password)
+            user.hashed_password = await hash_password_async(new_password)
             user.updated_at = datetime.now(timezone.utc)
             await db.commit()
+            invalidate_cached_user(user.id, user.email)
             
             logger.info(f"Password changed for user: {user.email}")
             
@@ -1,9 +1,9 @@
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime, timezone
 
 from ..db.milvus_vector_store import MilvusVectorStore
-from ..db.mongodb import Chunk, Document
+from ..db.mongodb import Chunk, Document, get_chunk_texts
 from ..utils.document_processor import DocumentProcessor
 from ..utils.sse import VectorRebuildEventEmitter, RebuildStatus
 
@@ -282,21 +282,25 @@ class VectorRebuildService:
                 chunk_texts = []
                 chunk_metadata = []
                 
+                # Fetch compressed content for the whole batch in one query
+                texts_by_id = await get_chunk_texts(chunks)
+                
                 for i, chunk in enumerate(chunks):
                     try:
                         # Validate chunk content
-                        if not chunk.content or not isinstance(chunk.content, str):
+                        content = texts_by_id.get(str(chunk.id))
+                        if not content:
                             logger.warning(f"Invalid chunk content for chunk {chunk.id}")
                             continue
                             
-                        chunk_texts.append(chunk.content)
+                        chunk_texts.append(content)
                         
                         # Prepare metadata - ensure all values are JSON-serializable
                         metadata = {
                             "mongo_chunk_id": str(chunk.id),
                             "file_type": str(document.file_type),
-                            "char_count": len(chunk.content),
-                            "word_count": len(chunk.content.split()),
+                            "char_count": len(content),
+                            "word_count": len(content.split()),
                         }
                         
                         # Add chunk metadata if available (filter to ensure JSON compatibility)
@@ -307,7 +311,7 @@ class VectorRebuildService:
                                     metadata[key] = value
                         
                         chunk_metadata.append(metadata)
-                        logger.debug(f"Prepared chunk {i+1}/{len(chunks)}: {len(chunk.content)} chars")
+                        logger.debug(f"Prepared chunk {i+1}/{len(chunks)}: {len(content)} chars")
                         
                     except Exception as chunk_error:
                         logger.error(f"Error preparing chunk {chunk.id}: {str(chunk_error)}", exc_info=True)
@@ -349,6 +353,24 @@ class VectorRebuildService:
             rebuild_stats["errors"].append(error_msg)
             logger.error(error_msg, exc_info=True)  # Include full traceback
     
+    async def get_backup_stats_version(self) -> Tuple[int, int, Optional[datetime]]:
+        """
+        Get a cheap version key for the backup statistics.
+        
+        Uses collection metadata counts instead of scanning, plus the latest
+        document update (status changes and deletions bump `updated_at`).
+        
+        Returns:
+            Tuple[int, int, Optional[datetime]]: Document count, chunk count, latest document update
+        """
+        total_documents = await Document.get_motor_collection().estimated_document_count()
+        total_chunks = await Chunk.get_motor_collection().estimated_document_count()
+        # Served by the updated_at index; only that field is read
+        latest = await Document.get_motor_collection().find_one(
+            {}, {"_id": 0, "updated_at": 1}, sort=[("updated_at", -1)]
+        )
+        return total_documents, total_chunks, latest.get("updated_at") if latest else None
+    
     async def get_mongodb_backup_stats(self) -> Dict[str, Any]:
         """Get statistics about available backup data in MongoDB."""
         try:
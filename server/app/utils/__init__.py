@@ -1,11 +1,17 @@
 from .auth import (
     hash_password,
+    hash_password_async,
+    password_needs_rehash,
     create_user_token,
+    create_token_pair,
     verify_password,
+    verify_password_async,
     verify_token,
     verify_refresh_token,
     get_current_user,
-    require_role
+    require_role,
+    CURRENT_USER_DEP,
+    ADMIN_DEP
 )
 
 from .sse import (
@@ -13,7 +19,8 @@ from .sse import (
     ProcessingStatus,
     SSEMessage,
     create_sse_generator,
-    get_sse_headers
+    get_sse_headers,
+    SSE_HEADERS
 )
 
 from .document_processor import (
@@ -23,23 +30,48 @@ from .document_processor import (
     chunk_text
 )
 
+from .responses import MsgspecJSONResponse
+
+from .background import BackgroundTaskPool
+
+from .etag import make_etag, etag_matches, etag_headers, not_modified
+
+from .ttl_cache import TTLCache
+
+from .errors import wrap_errors
+
 
 
 __all__ = [
     "hash_password",
+    "hash_password_async",
+    "password_needs_rehash",
     "create_user_token",
+    "create_token_pair",
     "verify_password",
+    "verify_password_async",
     "verify_token",
     "verify_refresh_token",
     "get_current_user",
     "require_role",
+    "CURRENT_USER_DEP",
+    "ADMIN_DEP",
     "DocumentProcessingEventEmitter",
     "ProcessingStatus",
     "SSEMessage",
     "create_sse_generator",
     "get_sse_headers",
+    "SSE_HEADERS",
     "DocumentProcessor",
     "extract_text_from_pdf",
     "extract_text_from_txt",
-    "chunk_text"
+    "chunk_text",
+    "MsgspecJSONResponse",
+    "BackgroundTaskPool",
+    "make_etag",
+    "etag_matches",
+    "etag_headers",
+    "not_modified",
+    "TTLCache",
+    "wrap_errors"
 ]
\ No newline at end of file
@@ -1,21 +1,63 @@
+import asyncio
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 import jwt
-from typing import Optional, Dict, Any
+from argon2 import PasswordHasher, Type
+from argon2.exceptions import InvalidHashError, VerificationError
+from functools import lru_cache
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta, timezone
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 
 from ..db import User,get_postgres_database
 from ..config import get_settings
+from .ttl_cache import TTLCache
 
 settings = get_settings()
 security = HTTPBearer(auto_error=False)
 
+# Signing key and algorithm list resolved once instead of per token
+_JWT_KEY = settings.secret_key.encode("utf-8")
+_JWT_ALGORITHM = settings.algorithm
+_JWT_ALGORITHMS = [_JWT_ALGORITHM]
+# PyJWT already checks `exp` while decoding; only its presence needs requiring
+_JWT_DECODE_OPTIONS = {"require": ["exp"]}
+
+# Built once; each request only binds the user ID
+_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
+# Decoded refresh tokens keyed by a digest of the token; entries also carry the token's exp
+_refresh_token_cache = TTLCache(maxsize=10_000, ttl_seconds=60)
+
+# Token lifetimes are fixed for the process; computed once
+_ACCESS_TTL_SEC = settings.access_token_expire_minutes * 60
+_ACCESS_TOKEN_LIFETIME = timedelta(seconds=_ACCESS_TTL_SEC)
+_REFRESH_TOKEN_LIFETIME = timedelta(days=settings.refresh_token_expire_days)
+
+# argon2id via libargon2's optimized (SSE) implementation; bcrypt hashes ($2...) and
+# hashes with outdated parameters are still verified and upgraded on the next login
+_password_hasher = PasswordHasher(
+    time_cost=settings.argon2_time_cost,
+    memory_cost=settings.argon2_memory_cost_kib,
+    parallelism=settings.argon2_parallelism,
+    type=Type.ID
+)
+_BCRYPT_PREFIX = "$2"
+
+# argon2/bcrypt release the GIL, so hashing on worker threads runs on all cores
+# without blocking the event loop (and without pickling like a process pool would)
+_HASH_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="pwhash")
+
 def hash_password(password: str) -> str:
     """
-    Hash a password using bcrypt.
+    Hash a password using argon2id.
     
     Args:
         password: Plain text password
@@ -23,9 +65,33 @@ def hash_password(password: str) -> str:
     Returns:
         str: Hashed password
     """
-    password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password_bytes, salt).decode('utf-8')
+    return _password_hasher.hash(password)
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the hashing pool instead of the event loop.
+    
+    Args:
+        password: Plain text password
+        
+    Returns:
+        str: Hashed password
+    """
+    return await asyncio.get_running_loop().run_in_executor(_HASH_POOL, hash_password, password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a stored hash should be replaced with a current argon2id hash.
+    
+    Args:
+        hashed_password: Stored password hash
+        
+    Returns:
+        bool: True for legacy bcrypt hashes or outdated argon2 parameters
+    """
+    if hashed_password.startswith(_BCRYPT_PREFIX):
+        return True
+    return _password_hasher.check_needs_rehash(hashed_password)
 
 def create_user_token(user: User) -> Dict[str, Any]:
     """
@@ -39,14 +105,13 @@ def create_user_token(user: User) -> Dict[str, Any]:
     """
     token_data = {"sub": user.email, "user_id": str(user.id), "role": user.role}
     
-    access_token = create_access_token(token_data)
-    refresh_token = create_refresh_token(token_data)
+    access_token, refresh_token = create_token_pair(token_data)
     
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
         "token_type": "bearer",
-        "expires_in": settings.access_token_expire_minutes * 60,
+        "expires_in": _ACCESS_TTL_SEC,
         "user": {
             "id": str(user.id),
             "email": user.email,
@@ -70,10 +135,10 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
+        expire = datetime.now(timezone.utc) + _ACCESS_TOKEN_LIFETIME
     
     to_encode.update({"exp": expire, "type": "access"})
-    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    return jwt.encode(to_encode, _JWT_KEY, algorithm=_JWT_ALGORITHM)
 
 
 def create_refresh_token(data: Dict[str, Any]) -> str:
@@ -87,9 +152,35 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
         str: JWT refresh token
     """
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
+    expire = datetime.now(timezone.utc) + _REFRESH_TOKEN_LIFETIME
     to_encode.update({"exp": expire, "type": "refresh"})
-    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    return jwt.encode(to_encode, _JWT_KEY, algorithm=_JWT_ALGORITHM)
+
+def create_token_pair(data: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Create an access and a refresh token for the same claims.
+    
+    Both tokens share one clock read; signing is HMAC with the preloaded key,
+    so it stays inline (a thread hop would cost more than the signature).
+    
+    Args:
+        data: Data to encode in both tokens
+        
+    Returns:
+        Tuple[str, str]: Access token and refresh token
+    """
+    now = datetime.now(timezone.utc)
+    access_token = jwt.encode(
+        {**data, "exp": now + _ACCESS_TOKEN_LIFETIME, "type": "access"},
+        _JWT_KEY,
+        algorithm=_JWT_ALGORITHM
+    )
+    refresh_token = jwt.encode(
+        {**data, "exp": now + _REFRESH_TOKEN_LIFETIME, "type": "refresh"},
+        _JWT_KEY,
+        algorithm=_JWT_ALGORITHM
+    )
+    return access_token, refresh_token
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -102,9 +193,29 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         bool: True if password matches
     """
-    return bcrypt.checkpw(
-        plain_password.encode('utf-8'), 
-        hashed_password.encode('utf-8')
+    if hashed_password.startswith(_BCRYPT_PREFIX):
+        return bcrypt.checkpw(
+            plain_password.encode('utf-8'), 
+            hashed_password.encode('utf-8')
+        )
+    try:
+        return _password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the hashing pool instead of the event loop.
+    
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password
+        
+    Returns:
+        bool: True if password matches
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _HASH_POOL, verify_password, plain_password, hashed_password
     )
 
 def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
@@ -122,7 +233,7 @@ def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
         HTTPException: If token is invalid
     """
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS, options=_JWT_DECODE_OPTIONS)
         
         # Check token type
         if payload.get("type") != token_type:
@@ -131,16 +242,13 @@ def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
                 detail=f"Invalid token type. Expected {token_type}"
             )
         
-        # Check expiration
-        exp = payload.get("exp")
-        if exp is None or datetime.fromtimestamp(exp, tz=timezone.utc) < datetime.now(timezone.utc):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has expired"
-            )
-        
         return payload
         
+    except (jwt.ExpiredSignatureError, jwt.MissingRequiredClaimError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has expired"
+        )
     except jwt.InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -151,22 +259,41 @@ def verify_refresh_token(refresh_token: str) -> Dict[str, Any]:
     """
     Verify a refresh token.
     
+    Successful decodes are memoized for a short while (never past the token's
+    own `exp`), so a burst of refreshes with the same token verifies its
+    signature once.
+    
     Args:
         refresh_token: JWT refresh token
         
     Returns:
         Dict[str, Any]: Token payload
     """
-    return verify_token(refresh_token, "refresh")
+    key = hashlib.blake2b(refresh_token.encode("utf-8"), digest_size=16).digest()
+    cached = _refresh_token_cache.get(key)
+    if cached is not None:
+        payload, expires_at = cached
+        if expires_at > time.time():
+            return dict(payload)
+        _refresh_token_cache.pop(key)
+    
+    payload = verify_token(refresh_token, "refresh")
+    _refresh_token_cache.set(key, (payload, payload["exp"]))
+    return dict(payload)
 
 async def get_current_user(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: AsyncSession = Depends(get_postgres_database)
 ) -> User:
     """
     Get the current authenticated user.
     
+    The session is the request's shared `get_postgres_database` session (FastAPI
+    caches dependencies per request), so routes that also take it reuse it.
+    
     Args:
+        request: Incoming request
         credentials: JWT credentials from request
         db: PostgreSQL database session
         
@@ -182,9 +309,11 @@ async def get_current_user(
             detail="Not authenticated"
         )
     
-    # Verify token
-    payload = verify_token(credentials.credentials)
-    user_id = payload.get("user_id")
+    # AuthenticationMiddleware already verified this bearer token; don't decode it twice
+    user_id = getattr(request.state, "user_id", None)
+    if user_id is None:
+        payload = verify_token(credentials.credentials)
+        user_id = payload.get("user_id")
     
     if not user_id:
         raise HTTPException(
@@ -193,7 +322,7 @@ async def get_current_user(
         )
     
     # Get user from PostgreSQL
-    result = await db.execute(select(User).where(User.id == user_id))
+    result = await db.execute(_USER_BY_ID, {"user_id": user_id})
     user = result.scalar_one_or_none()
     
     if not user:
@@ -204,10 +333,14 @@ async def get_current_user(
     
     return user
 
+@lru_cache(maxsize=None)
 def require_role(required_role: str):
     """
     Decorator to require a specific user role.
     
+    Cached per role so every route shares one dependency callable, which lets
+    FastAPI resolve it once per request.
+    
     Args:
         required_role: Required user role
         
@@ -222,4 +355,9 @@ def require_role(required_role: str):
             )
         return current_user
     
-    return role_checker 
\ No newline at end of file
+    return role_checker
+
+
+# Shared dependency markers for route signatures
+CURRENT_USER_DEP = Depends(get_current_user)
+ADMIN_DEP = Depends(require_role("admin"))
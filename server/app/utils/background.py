@@ -0,0 +1,85 @@
+"""
+Bounded background task pool.
+
+Fire-and-forget work started from a request (document processing, vector
+rebuilds) is submitted here instead of a bare `asyncio.create_task`. The pool
+keeps a reference to every task so it cannot be garbage collected mid-run, and
+caps how many run at once; the rest wait on the semaphore.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Coroutine, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTaskPool:
+    """Runs background coroutines with a concurrency cap and retained task references."""
+
+    def __init__(self, name: str, concurrency: int):
+        """
+        Initialize the pool.
+
+        Args:
+            name: Pool name used in logs and task names
+            concurrency: Maximum number of coroutines running at once
+        """
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._active: Set[asyncio.Task] = set()
+
+    def submit(
+        self,
+        coro: Coroutine[Any, Any, Any],
+        on_discard: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> asyncio.Task:
+        """
+        Schedule a coroutine; it starts once a slot is free.
+
+        Args:
+            coro: Coroutine to run
+            on_discard: Cleanup awaited if the task is cancelled before `coro` starts
+                (e.g. on shutdown), since `coro`'s own error handling never runs then
+
+        Returns:
+            asyncio.Task: The scheduled task
+        """
+        task = asyncio.create_task(self._run(coro, on_discard), name=f"{self.name}-{len(self._active)}")
+        self._active.add(task)
+        task.add_done_callback(self._active.discard)
+        return task
+
+    async def _run(
+        self,
+        coro: Coroutine[Any, Any, Any],
+        on_discard: Optional[Callable[[], Awaitable[Any]]]
+    ) -> Any:
+        started = False
+        try:
+            async with self._semaphore:
+                started = True
+                return await coro
+        finally:
+            # No-op once it ran; avoids "never awaited" if cancelled while queued
+            coro.close()
+            if not started and on_discard is not None:
+                try:
+                    await on_discard()
+                except Exception:
+                    logger.exception("Cleanup of discarded %s task failed", self.name)
+
+    @property
+    def active(self) -> int:
+        """Number of submitted tasks that have not finished (running or waiting)."""
+        return len(self._active)
+
+    async def shutdown(self):
+        """Cancel all pending and running tasks and wait for them to finish."""
+        tasks = list(self._active)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            logger.info("Cancelling %d %s task(s)", len(tasks), self.name)
+            await asyncio.gather(*tasks, return_exceptions=True)
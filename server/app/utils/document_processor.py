@@ -1,14 +1,20 @@
+import os
 import re
 import logging
-from typing import List, Dict, Any, Tuple
+import tempfile
+from typing import List, Dict, Any, Tuple, Union
+
+import aiofiles
 from fastapi import UploadFile
-import fitz  # PyMuPDF
 
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Read size when copying an upload to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 class DocumentProcessor:
     
@@ -44,25 +50,67 @@ class DocumentProcessor:
             else:
                 raise ValueError(f"Unsupported file type: {file_extension}")
                 
-            # Clean the text
-            full_text = self._clean_text(full_text)
+            return await self._build_result(full_text, page_texts, file_extension, len(content))
             
-            # Create chunks with metadata
-            chunks = await self._create_logical_chunks(full_text, file_extension)
+        except Exception as e:
+            logger.error(f"Document processing failed: {str(e)}")
+            raise
+
+    async def process_document_file(
+        self,
+        path: str,
+        filename: str
+    ) -> Dict[str, Any]:
+        """
+        Process a document stored on disk.
+        
+        PDFs are opened from the file by PyMuPDF, so the raw bytes are never
+        held in memory; text files are read since their text is needed anyway.
+        
+        Args:
+            path (str): Path of the document file
+            filename (str): Original filename for type detection
             
-            return {
-                "full_text": full_text,
-                "chunks": chunks,
-                "file_size": len(content),
-                "file_type": file_extension,
-                "page_count": len(page_texts) if isinstance(page_texts, list) else 1,
-                "word_count": len(full_text.split()),
-                "char_count": len(full_text)
-            }
+        Returns:
+            Dict[str, Any]: Processing result with chunks and metadata
+        """
+        file_extension = filename.split('.')[-1].lower() if '.' in filename else 'txt'
+        if file_extension != "pdf":
+            async with aiofiles.open(path, "rb") as f:
+                content = await f.read()
+            return await self.process_document_content(content, filename)
+        
+        try:
+            full_text, _ = await self._extract_from_pdf(path)
+            return await self._build_result(full_text, [full_text], file_extension, os.path.getsize(path))
             
         except Exception as e:
             logger.error(f"Document processing failed: {str(e)}")
             raise
+    
+    async def _build_result(
+        self,
+        full_text: str,
+        page_texts: List[str],
+        file_extension: str,
+        file_size: int
+    ) -> Dict[str, Any]:
+        """Clean and chunk extracted text into the processing result."""
+        # Clean the text
+        full_text = self._clean_text(full_text)
+        
+        # Create chunks with metadata
+        chunks = await self._create_logical_chunks(full_text, file_extension)
+        
+        return {
+            "full_text": full_text,
+            "chunks": chunks,
+            "file_size": file_size,
+            "file_type": file_extension,
+            "page_count": len(page_texts) if isinstance(page_texts, list) else 1,
+            "word_count": len(full_text.split()),
+            "char_count": len(full_text)
+        }
 
     async def process_document(
         self, 
@@ -71,27 +119,38 @@ class DocumentProcessor:
         """
         Process an uploaded document and extract text with metadata.
         
+        The upload is copied to a temporary file in chunks instead of being
+        read into memory, then processed from disk.
+        
         Args:
             file (UploadFile): Uploaded document file
             
         Returns:
             Dict[str, Any]: Processing result with chunks and metadata
         """
+        fd, path = tempfile.mkstemp(prefix="upload-", suffix=os.path.splitext(file.filename)[1])
+        os.close(fd)
         try:
-            # Read file content
-            content = await file.read()
+            async with aiofiles.open(path, "wb") as out:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    await out.write(chunk)
             
-            # Use the content-based processing method
-            return await self.process_document_content(content, file.filename)
+            return await self.process_document_file(path, file.filename)
             
         except Exception as e:
             logger.error(f"Document processing failed: {str(e)}")
             raise
+        finally:
+            os.unlink(path)
             
-    async def _extract_from_pdf(self, content: bytes) -> Tuple[str, List[str]]:
-        """Extract text from PDF using PyMuPDF."""
+    async def _extract_from_pdf(self, content: Union[bytes, str]) -> Tuple[str, List[str]]:
+        """Extract text from PDF bytes or a PDF file path using PyMuPDF."""
         try:
-            doc = fitz.open(stream=content, filetype="pdf")
+            import fitz  # PyMuPDF, only needed once a PDF is uploaded
+            if isinstance(content, str):
+                doc = fitz.open(content, filetype="pdf")
+            else:
+                doc = fitz.open(stream=content, filetype="pdf")
             full_text = ""
             page_texts = []
             
@@ -259,9 +318,8 @@ class DocumentProcessor:
 # Legacy compatibility functions
 async def extract_text_from_pdf(file_path: str) -> Tuple[str, List[str]]:
     processor = DocumentProcessor()
-    with open(file_path, 'rb') as f:
-        content = f.read()
-    return await processor._extract_from_pdf(content)
+    # PyMuPDF reads the file itself; no need to load it into memory first
+    return await processor._extract_from_pdf(file_path)
 
 
 async def extract_text_from_txt(file_path: str) -> str:
@@ -0,0 +1,49 @@
+"""
+Error mapping for service methods.
+
+Service methods raise `HTTPException` for expected failures (not found, bad
+credentials). Anything else is logged and turned into a generic HTTP error by
+`wrap_errors`, so each method does not repeat the same try/except scaffolding.
+"""
+
+import functools
+import logging
+from typing import Any, Awaitable, Callable, TypeVar
+
+from fastapi import HTTPException, status
+
+T = TypeVar("T")
+
+
+def wrap_errors(
+    detail: str,
+    status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Map unexpected exceptions raised by an async function to an HTTPException.
+
+    HTTPExceptions raised by the function propagate unchanged.
+
+    Args:
+        detail: Error detail returned to the client
+        status_code: HTTP status for unexpected errors
+
+    Returns:
+        Callable: Decorator for async functions
+    """
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        logger = logging.getLogger(fn.__module__)
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            try:
+                return await fn(*args, **kwargs)
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error(f"{fn.__qualname__} failed: {str(e)}", exc_info=True)
+                raise HTTPException(status_code=status_code, detail=detail)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,59 @@
+"""
+ETag helpers for conditional GETs.
+
+Polled endpoints derive a cheap version key from the data (counts, latest
+update time) and answer `If-None-Match` hits with 304 before running the full
+query + serialization pipeline.
+"""
+
+import hashlib
+from typing import Any, Mapping, Optional
+
+from fastapi import Request, Response, status
+
+# Clients must revalidate every time, but may reuse the body on a 304
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from the values that identify a response version.
+
+    Args:
+        *parts: Values whose change must change the ETag
+
+    Returns:
+        str: Quoted ETag header value
+    """
+    key = "\x1f".join(map(str, parts)).encode()
+    return f'"{hashlib.blake2b(key, digest_size=8).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check whether the request's If-None-Match header matches an ETag.
+
+    Args:
+        request: Incoming request
+        etag: Current ETag of the resource
+
+    Returns:
+        bool: True if the client already has this version
+    """
+    if_none_match: Optional[str] = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" matches "x"
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def etag_headers(etag: str) -> Mapping[str, str]:
+    """Headers sent with both 200 and 304 responses for an ETag'd resource."""
+    return {"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    """Build a 304 Not Modified response for an ETag."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
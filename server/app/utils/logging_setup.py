@@ -0,0 +1,52 @@
+"""
+Non-blocking logging setup.
+
+Handlers that write to streams or files block the calling thread. Routing every
+record through a QueueHandler keeps the event loop to a cheap queue put, while a
+QueueListener thread does the actual formatting and I/O.
+"""
+
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_queue_logging(level: int = logging.INFO, fmt: Optional[str] = None) -> QueueListener:
+    """
+    Install a QueueHandler on the root logger and start its listener thread.
+    
+    Args:
+        level: Root log level
+        fmt: Log record format for the output handler
+        
+    Returns:
+        QueueListener: The running listener (call stop_queue_logging on shutdown)
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(fmt))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_queue_logging() -> None:
+    """Flush pending records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,34 @@
+"""
+JSON responses encoded with msgspec.
+
+Routes that return large response models (chat replies, conversation lists)
+return `MsgspecJSONResponse` so FastAPI does not re-validate the value against
+`response_model` and pydantic's serializer chain is skipped. `response_model`
+stays on the route so the OpenAPI schema is unchanged.
+"""
+
+from typing import Any
+
+import msgspec
+from fastapi import Response
+from pydantic import BaseModel
+
+
+def _enc_hook(obj: Any) -> Any:
+    """Encode pydantic models as their field values; msgspec handles the rest."""
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError(f"Objects of type {type(obj).__name__} are not JSON serializable")
+
+
+# One encoder per process so its internal buffers are reused across requests
+_encoder = msgspec.json.Encoder(enc_hook=_enc_hook)
+
+
+class MsgspecJSONResponse(Response):
+    """JSON response rendered with a shared msgspec encoder."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return _encoder.encode(content)
@@ -1,8 +1,11 @@
-import json
 import asyncio
-from typing import Dict, Any, AsyncGenerator
+from types import MappingProxyType
+from collections import deque
+from typing import Dict, Any, AsyncGenerator, Deque, Mapping, Optional
 from enum import Enum
 
+import orjson
+
 
 class ProcessingStatus(str, Enum):
     STARTED = "started"
@@ -47,7 +50,7 @@ class SSEMessage:
         
         if self.data is not None:
             if isinstance(self.data, (dict, list)):
-                data_str = json.dumps(self.data)
+                data_str = orjson.dumps(self.data, option=orjson.OPT_NON_STR_KEYS).decode()
             else:
                 data_str = str(self.data)
             lines.append(f"data: {data_str}")
@@ -99,6 +102,11 @@ class DocumentProcessingEventEmitter:
                 # Log error but don't stop processing
                 pass
     
+    async def emit_failed(self, message: str):
+        """Emit a FAILED status unless the processing code already reported one."""
+        if self.current_status != ProcessingStatus.FAILED:
+            await self.emit_status(ProcessingStatus.FAILED, message)
+    
     def _get_default_message(self, status: ProcessingStatus) -> str:
         messages = {
             ProcessingStatus.STARTED: "Starting document processing...",
@@ -169,6 +177,11 @@ class VectorRebuildEventEmitter:
                 # Log error but don't stop processing
                 pass
     
+    async def emit_failed(self, message: str):
+        """Emit a FAILED status unless the rebuild code already reported one."""
+        if self.current_status != RebuildStatus.FAILED:
+            await self.emit_status(RebuildStatus.FAILED, message)
+    
     def _get_default_message(self, status: RebuildStatus) -> str:
         messages = {
             RebuildStatus.STARTED: "Starting vector store rebuild...",
@@ -192,9 +205,64 @@ class VectorRebuildEventEmitter:
         self.processed_documents = processed_documents
 
 
+# Idle streams get a comment frame this often so proxies don't drop them mid-embedding
+SSE_PING_INTERVAL = 15.0
+SSE_PING = ": ping\n\n"
+
+
+class CoalescingEventBuffer:
+    """
+    Event buffer for SSE generators that collapses bursts of progress updates.
+    
+    Events whose status is `coalesce_status` replace each other and are released
+    at most once per `min_interval` seconds; every other event (phase changes,
+    completed, failed) is delivered in order and supersedes a pending update.
+    """
+    
+    def __init__(self, coalesce_status: Optional[str] = None, min_interval: float = 0.1):
+        self.coalesce_status = coalesce_status
+        self.min_interval = min_interval
+        self._events: Deque[Dict[str, Any]] = deque()
+        self._progress: Optional[Dict[str, Any]] = None
+        self._last_progress_at = 0.0
+        self._ready = asyncio.Event()
+    
+    async def put(self, event_data: Dict[str, Any]):
+        """Emitter callback: buffer an event."""
+        if self.coalesce_status is not None and event_data["status"] == self.coalesce_status:
+            self._progress = event_data
+        else:
+            self._progress = None
+            self._events.append(event_data)
+        self._ready.set()
+    
+    async def get(self) -> Dict[str, Any]:
+        """Wait for the next event to send."""
+        loop = asyncio.get_running_loop()
+        while True:
+            if self._events:
+                return self._events.popleft()
+            
+            wait = None
+            if self._progress is not None:
+                wait = self._last_progress_at + self.min_interval - loop.time()
+                if wait <= 0:
+                    event_data, self._progress = self._progress, None
+                    self._last_progress_at = loop.time()
+                    return event_data
+            
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+
 async def create_sse_generator(
     emitter: DocumentProcessingEventEmitter,
-    timeout: int = 300  # 5 minutes timeout
+    timeout: int = 300,  # 5 minutes timeout
+    task: Optional[asyncio.Task] = None,
+    ping_interval: float = SSE_PING_INTERVAL
 ) -> AsyncGenerator[str, None]:
     """
     Create an SSE generator that yields formatted SSE messages.
@@ -202,18 +270,15 @@ async def create_sse_generator(
     Args:
         emitter: Event emitter instance
         timeout: Maximum time to wait for completion (seconds)
+        task: Background task producing the events; cancelled if the client disconnects
+        ping_interval: Seconds of silence before a keep-alive comment is sent
         
     Yields:
         Formatted SSE message strings
     """
     start_time = asyncio.get_event_loop().time()
-    events_queue = asyncio.Queue()
-    
-    # Add callback to emitter to put events in queue
-    async def queue_callback(event_data):
-        await events_queue.put(event_data)
-    
-    emitter.add_callback(queue_callback)
+    events = CoalescingEventBuffer()
+    emitter.add_callback(events.put)
     
     try:
         while True:
@@ -229,7 +294,14 @@ async def create_sse_generator(
                     yield timeout_msg.format()
                     break
                 
-                event_data = await asyncio.wait_for(events_queue.get(), timeout=remaining_time)
+                wait = min(remaining_time, ping_interval)
+                try:
+                    event_data = await asyncio.wait_for(events.get(), timeout=wait)
+                except asyncio.TimeoutError:
+                    if wait < remaining_time:
+                        yield SSE_PING
+                        continue
+                    raise
                 
                 # Format as SSE message
                 sse_msg = SSEMessage(
@@ -253,6 +325,11 @@ async def create_sse_generator(
                 yield timeout_msg.format()
                 break
                 
+    except (asyncio.CancelledError, GeneratorExit):
+        # Client disconnected: stop the work nobody is listening to anymore
+        if task is not None and not task.done():
+            task.cancel()
+        raise
     except Exception as e:
         # Send error message
         error_msg = SSEMessage(
@@ -264,7 +341,8 @@ async def create_sse_generator(
 
 async def create_rebuild_sse_generator(
     emitter: VectorRebuildEventEmitter,
-    timeout: int = 600  # 10 minutes timeout for rebuild
+    timeout: int = 600,  # 10 minutes timeout for rebuild
+    ping_interval: float = SSE_PING_INTERVAL
 ) -> AsyncGenerator[str, None]:
     """
     Create an SSE generator for vector rebuild progress.
@@ -272,18 +350,15 @@ async def create_rebuild_sse_generator(
     Args:
         emitter: Vector rebuild event emitter instance
         timeout: Maximum time to wait for completion (seconds)
+        ping_interval: Seconds of silence before a keep-alive comment is sent
         
     Yields:
         Formatted SSE message strings
     """
     start_time = asyncio.get_event_loop().time()
-    events_queue = asyncio.Queue()
-    
-    # Add callback to emitter to put events in queue
-    async def queue_callback(event_data):
-        await events_queue.put(event_data)
-    
-    emitter.add_callback(queue_callback)
+    # Per-batch PROCESSING updates are coalesced to at most 10 frames per second
+    events = CoalescingEventBuffer(coalesce_status=RebuildStatus.PROCESSING.value)
+    emitter.add_callback(events.put)
     
     try:
         while True:
@@ -299,7 +374,14 @@ async def create_rebuild_sse_generator(
                     yield timeout_msg.format()
                     break
                 
-                event_data = await asyncio.wait_for(events_queue.get(), timeout=remaining_time)
+                wait = min(remaining_time, ping_interval)
+                try:
+                    event_data = await asyncio.wait_for(events.get(), timeout=wait)
+                except asyncio.TimeoutError:
+                    if wait < remaining_time:
+                        yield SSE_PING
+                        continue
+                    raise
                 
                 # Format as SSE message
                 sse_msg = SSEMessage(
@@ -355,11 +437,16 @@ def create_heartbeat_generator(interval: int = 30) -> AsyncGenerator[str, None]:
 
 
 # Utility function to create SSE response headers
-def get_sse_headers() -> Dict[str, str]:
-    return {
-        "Content-Type": "text/event-stream",
-        "Cache-Control": "no-cache",
-        "Connection": "keep-alive",
-        "Access-Control-Allow-Origin": "*",  # Configure based on your CORS policy
-        "Access-Control-Allow-Headers": "Cache-Control"
-    } 
\ No newline at end of file
+# Built once; Starlette copies the headers into each response, so sharing is safe
+SSE_HEADERS: Mapping[str, str] = MappingProxyType({
+    "Content-Type": "text/event-stream",
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # Stop nginx-style proxies from buffering the stream
+    "Access-Control-Allow-Origin": "*",  # Configure based on your CORS policy
+    "Access-Control-Allow-Headers": "Cache-Control"
+})
+
+
+def get_sse_headers() -> Mapping[str, str]:
+    return SSE_HEADERS
@@ -0,0 +1,71 @@
+"""
+In-process LRU cache with per-entry expiry.
+
+Used for small, hot lookups (e.g. users by email) where a few seconds of
+staleness is acceptable in exchange for skipping a database round trip.
+Not thread-safe; callers share it from the event loop thread.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """LRU mapping whose entries expire `ttl_seconds` after they were set."""
+
+    def __init__(self, maxsize: int = 10_000, ttl_seconds: float = 30.0):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries before LRU eviction
+            ttl_seconds: Seconds an entry stays fresh
+        """
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a fresh value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Optional[Any]: Cached value, or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entries past `maxsize`.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Drop an entry if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
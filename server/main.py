@@ -1,31 +1,40 @@
+import asyncio
 import logging
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
 from app.routes import api_router
+from app.routes.upload_routes import upload_tasks
+from app.routes.admin_routes import rebuild_tasks
 from app.db import (
     init_postgres_db, connect_to_postgres, disconnect_from_postgres,
     init_mongodb_db, connect_to_mongodb, disconnect_from_mongodb,
+    disconnect_from_redis,
     MilvusVectorStore
 )
+from app.llm import get_shared_client, close_shared_client
 from app.middlewares import (
     AuthenticationMiddleware,
-    ErrorHandlerMiddleware
+    ErrorHandlerMiddleware,
+    rate_limiter
 )
 
-# Configure logging
-logging.basicConfig(
+from app.utils.logging_setup import setup_queue_logging, stop_queue_logging
+
+# Configure logging (records are handed to a background listener thread)
+setup_queue_logging(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 # Import dependencies for cleanup
-from app.dependencies import cleanup_vector_store
+from app.dependencies import get_vector_store, cleanup_vector_store
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -42,8 +51,20 @@ async def lifespan(app: FastAPI):
         await init_mongodb_db()
         logger.info("✅ MongoDB initialized successfully")
 
-        # Vector store will be initialized lazily on first request
-        logger.info("✅ Vector store will be initialized on first request")
+        # Shared HTTP client for LLM API calls
+        app.state.http_client = get_shared_client()
+        logger.info("✅ LLM HTTP client initialized")
+
+        # Periodically drop idle rate limiter keys
+        app.state.rate_limit_sweeper = asyncio.create_task(rate_limiter.run_sweeper())
+
+        if settings.vector_store_eager_init:
+            # One shared client for every request, created before traffic arrives
+            app.state.vector_store = await get_vector_store()
+            logger.info("✅ Vector store initialized at startup")
+        else:
+            # Vector store will be initialized lazily on first request
+            logger.info("✅ Vector store will be initialized on first request")
         logger.info("🚀 Application startup completed successfully")
         
     except Exception as e:
@@ -54,19 +75,28 @@ async def lifespan(app: FastAPI):
     
     try:
         # Cleanup resources
+        app.state.rate_limit_sweeper.cancel()
+        # Stop background work before the stores it writes to go away
+        await upload_tasks.shutdown()
+        await rebuild_tasks.shutdown()
         await cleanup_vector_store()
+        await close_shared_client()
         await disconnect_from_postgres()
         await disconnect_from_mongodb()
+        await disconnect_from_redis()
         logger.info("✅ Application shutdown completed successfully")
         
     except Exception as e:
         logger.error(f"❌ Error during shutdown: {e}")
+    finally:
+        stop_queue_logging()
 
 app = FastAPI(
     title='Q&A RAG',
     description="AI-powered document chat application with RAG capabilities",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 origins = [
@@ -89,7 +119,8 @@ app.add_middleware(
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"]
 )
 app.add_middleware(AuthenticationMiddleware)
 app.add_middleware(ErrorHandlerMiddleware)
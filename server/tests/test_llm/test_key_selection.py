@@ -0,0 +1,79 @@
+"""
+Unit tests for GroqProvider API key selection.
+"""
+
+import pytest
+from collections import Counter
+
+from app.llm.cache import LLMCache
+from app.llm.providers import GroqProvider
+
+
+@pytest.fixture
+def provider():
+    """Groq provider with three keys and a 30 RPM limit."""
+    return GroqProvider(
+        {"api_keys": ["key-a", "key-b", "key-c"], "rate_limit_rpm": 30, "rate_limit_tpm": 6000},
+        cache=LLMCache()
+    )
+
+
+@pytest.mark.unit
+class TestKeySelection:
+    """Test cases for weighted round-robin key selection."""
+
+    def test_equal_headroom_rotates_evenly(self, provider):
+        """Test that keys with equal headroom share traffic equally."""
+        picks = Counter(provider._wrr_pick([3, 3, 3]) for _ in range(9))
+
+        assert picks == {0: 3, 1: 3, 2: 3}
+
+    def test_traffic_follows_weights(self, provider):
+        """Test that keys are picked in proportion to their weight."""
+        picks = Counter(provider._wrr_pick([1, 4, 0]) for _ in range(10))
+
+        assert picks == {0: 2, 1: 8}
+
+    def test_all_zero_weights(self, provider):
+        """Test that no key is picked when every weight is zero."""
+        assert provider._wrr_pick([0, 0, 0]) is None
+
+    def test_key_with_more_headroom_gets_more_traffic(self, provider):
+        """Test that a nearly used-up key receives less traffic."""
+        provider._req[0] = 29
+
+        picks = Counter()
+        for _ in range(20):
+            key = provider._get_next_available_key()
+            provider._record_usage(key)
+            picks[key] += 1
+
+        assert picks["key-a"] <= 1
+        assert picks["key-b"] + picks["key-c"] >= 19
+
+    def test_exhausted_keys_are_skipped(self, provider):
+        """Test that exhausted keys are never selected."""
+        provider._mark_key_exhausted("key-a")
+        provider._mark_key_exhausted("key-b")
+
+        assert {provider._get_next_available_key() for _ in range(5)} == {"key-c"}
+
+    def test_all_exhausted_returns_none(self, provider):
+        """Test that no key is returned when every key is exhausted."""
+        for key in provider.api_keys:
+            provider._mark_key_exhausted(key)
+
+        assert provider._get_next_available_key() is None
+
+    def test_stats_aggregate_key_state(self, provider):
+        """Test that stats are summed across all keys."""
+        provider._record_usage("key-a", 100)
+        provider._record_usage("key-b", 50)
+        provider._mark_key_exhausted("key-c")
+
+        stats = provider.get_stats()
+
+        assert stats["total_requests"] == 2
+        assert stats["total_tokens_used"] == 150
+        assert stats["available_keys"] == 2
+        assert stats["exhausted_keys"] == 1
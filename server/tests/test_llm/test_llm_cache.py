@@ -0,0 +1,151 @@
+"""
+Unit tests for the LLM response cache and its use in GroqProvider.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+from app.llm.cache import LLMCache, MemoryBackend, RedisBackend
+from app.llm.providers import GroqProvider, LLMResponse
+
+
+def make_response(content: str = "answer") -> LLMResponse:
+    return LLMResponse(content=content, provider="groq", model="test-model", usage={"total_tokens": 10})
+
+
+@pytest.fixture
+def provider():
+    """Groq provider with a private cache and a mocked API call."""
+    groq = GroqProvider({"api_keys": ["key-1"], "model": "test-model"}, cache=LLMCache())
+    groq._request_completion = AsyncMock(return_value=make_response())
+    return groq
+
+
+@pytest.mark.unit
+class TestLLMCache:
+    """Test cases for LLMCache."""
+
+    def test_key_is_stable_and_request_specific(self):
+        """Test that identical requests share a key and different ones do not."""
+        messages = [{"role": "user", "content": "hi"}]
+        key = LLMCache.make_key("m", messages, 0.0, 100)
+
+        assert key == LLMCache.make_key("m", [dict(messages[0])], 0.0, 100)
+        assert key != LLMCache.make_key("m", messages, 0.0, 200)
+
+    async def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = LLMCache(max_entries=2)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("a")
+        await cache.set("c", 3)
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == 1
+        assert await cache.get("c") == 3
+
+    async def test_ttl_expiry(self):
+        """Test that expired entries are not returned."""
+        cache = LLMCache(ttl_seconds=0)
+        await cache.set("a", 1)
+
+        assert await cache.get("a") is None
+        assert len(cache) == 0
+
+    async def test_l2_hit_populates_l1(self):
+        """Test that a value found only in the shared tier is served and kept locally."""
+        l2 = MemoryBackend()
+        await l2.set("a", {"content": "shared"}, 60)
+        cache = LLMCache(l2=l2)
+
+        assert await cache.get("a") == {"content": "shared"}
+        assert len(cache) == 1
+
+    async def test_set_writes_through_to_l2(self):
+        """Test that stored values reach the shared tier."""
+        l2 = MemoryBackend()
+        cache = LLMCache(l2=l2)
+
+        await cache.set("a", {"content": "x"})
+
+        assert await l2.get("a") == {"content": "x"}
+
+    async def test_redis_backend_round_trip(self):
+        """Test that the Redis tier stores and decodes JSON values."""
+        fakeredis = pytest.importorskip("fakeredis")
+        backend = RedisBackend(fakeredis.FakeAsyncRedis())
+
+        await backend.set("a", {"content": "x", "usage": {"total_tokens": 3}}, 60)
+
+        assert await backend.get("a") == {"content": "x", "usage": {"total_tokens": 3}}
+        assert await backend.get("missing") is None
+
+    async def test_l2_failure_is_a_miss(self):
+        """Test that an unavailable shared tier degrades to a cache miss."""
+        broken = AsyncMock()
+        broken.get.side_effect = ConnectionError("redis down")
+        broken.set.side_effect = ConnectionError("redis down")
+        cache = LLMCache(l2=broken)
+
+        await cache.set("a", 1)
+        cache.clear()
+
+        assert await cache.get("a") is None
+
+    async def test_deterministic_requests_are_cached(self, provider):
+        """Test that a repeated temperature-0 request skips the API."""
+        messages = [{"role": "user", "content": "hi"}]
+
+        first = await provider.generate_response(messages, temperature=0)
+        second = await provider.generate_response(messages, temperature=0)
+
+        provider._request_completion.assert_awaited_once()
+        assert "cache_hit" not in first.metadata
+        assert second.metadata["cache_hit"] is True
+        assert second.content == first.content
+
+    async def test_sampled_requests_are_not_cached(self, provider):
+        """Test that non-deterministic requests always hit the API."""
+        messages = [{"role": "user", "content": "hi"}]
+
+        await provider.generate_response(messages, temperature=0.7)
+        await provider.generate_response(messages, temperature=0.7)
+
+        assert provider._request_completion.await_count == 2
+
+    async def test_concurrent_misses_share_one_call(self, provider):
+        """Test single-flight behaviour on a cold cache."""
+        async def slow_completion(*args):
+            await asyncio.sleep(0.01)
+            return make_response()
+
+        provider._request_completion = AsyncMock(side_effect=slow_completion)
+        messages = [{"role": "user", "content": "hi"}]
+
+        results = await asyncio.gather(
+            *(provider.generate_response(messages, temperature=0) for _ in range(5))
+        )
+
+        provider._request_completion.assert_awaited_once()
+        assert all(result.content == "answer" for result in results)
+
+    async def test_concurrent_waiters_share_failure(self, provider):
+        """Test that waiters see the in-flight call's error and nothing is cached."""
+        async def failing_completion(*args):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        provider._request_completion = AsyncMock(side_effect=failing_completion)
+        messages = [{"role": "user", "content": "hi"}]
+
+        results = await asyncio.gather(
+            *(provider.generate_response(messages, temperature=0) for _ in range(3)),
+            return_exceptions=True
+        )
+
+        provider._request_completion.assert_awaited_once()
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert len(provider.cache) == 0
+        assert provider.cache.inflight(LLMCache.make_key("test-model", messages, 0, 2048)) is None
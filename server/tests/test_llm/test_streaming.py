@@ -0,0 +1,57 @@
+"""
+Unit tests for GroqProvider response streaming.
+"""
+
+import httpx
+import pytest
+
+from app.llm.cache import LLMCache
+from app.llm.providers import GroqProvider
+
+
+class ChunkedStream(httpx.AsyncByteStream):
+    """Async byte stream that yields the body in fixed-size pieces."""
+
+    def __init__(self, body: bytes, size: int):
+        self.body = body
+        self.size = size
+
+    async def __aiter__(self):
+        for start in range(0, len(self.body), self.size):
+            yield self.body[start:start + self.size]
+
+
+def make_provider(body: bytes, size: int) -> GroqProvider:
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, stream=ChunkedStream(body, size))
+    )
+    return GroqProvider(
+        {"api_keys": ["key-a"], "base_url": "https://groq.test"},
+        client=httpx.AsyncClient(transport=transport),
+        cache=LLMCache()
+    )
+
+
+SSE_BODY = (
+    b'data: {"choices":[{"delta":{"role":"assistant"}}]}\r\n\r\n'
+    b'data: {"choices":[{"delta":{"content":"Hel"}}]}\n\n'
+    b': keep-alive\n\n'
+    b'data: {"choices":[{"delta":{"content":"lo \\u00e9"}}]}\n\n'
+    b'data: not json\n\n'
+    b'data: [DONE]\n\n'
+    b'data: {"choices":[{"delta":{"content":"ignored"}}]}\n\n'
+)
+
+
+@pytest.mark.unit
+class TestStreaming:
+    """Test cases for SSE parsing in stream_response."""
+
+    @pytest.mark.parametrize("size", [1, 7, 64, len(SSE_BODY)])
+    async def test_stream_yields_content_deltas(self, size):
+        """Test that deltas are parsed regardless of network chunk boundaries."""
+        provider = make_provider(SSE_BODY, size)
+
+        pieces = [piece async for piece in provider.stream_response([{"role": "user", "content": "hi"}])]
+
+        assert pieces == ["Hel", "lo é"]
@@ -0,0 +1 @@
+# Middlewares tests package 
@@ -0,0 +1,95 @@
+"""
+Unit tests for AuthenticationMiddleware request routing.
+"""
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.middlewares import auth_middleware
+from app.middlewares.auth_middleware import AuthenticationMiddleware, RateLimiter
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = RateLimiter()
+    monkeypatch.setattr(auth_middleware, "rate_limiter", limiter)
+    return limiter
+
+
+@pytest.fixture
+def client(limiter):
+    app = FastAPI()
+    app.add_middleware(AuthenticationMiddleware)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/")
+    async def root():
+        return JSONResponse({"ok": True}, headers={"X-Frame-Options": "SAMEORIGIN"})
+
+    @app.post("/rag/auth/login")
+    async def login():
+        return {"ok": True}
+
+    @app.get("/rag/private")
+    async def private():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestAuthenticationMiddleware:
+    """Test cases for AuthenticationMiddleware."""
+
+    def test_public_paths_skip_rate_limiting(self, client, limiter):
+        """Test that public paths don't touch the rate limiter buckets."""
+        response = client.get("/health")
+
+        assert response.status_code == 200
+        assert response.headers["x-frame-options"] == "DENY"
+        assert not limiter.buckets
+
+    def test_security_headers_keep_route_values(self, client):
+        """Test that a security header set by the route is not added a second time."""
+        response = client.get("/")
+
+        assert response.headers.get_list("x-frame-options") == ["SAMEORIGIN"]
+        assert response.headers["x-content-type-options"] == "nosniff"
+
+    def test_blocked_ip_cannot_reach_login(self, client, limiter):
+        """Test that IPs blocked for failed logins are rejected on auth paths."""
+        for _ in range(limiter.login_attempts_limit):
+            limiter.record_failed_login("testclient")
+
+        response = client.post("/rag/auth/login")
+
+        assert response.status_code == 429
+        assert response.json() == {"detail": "Rate limit exceeded"}
+        assert client.get("/health").status_code == 200
+
+    def test_private_path_requires_token(self, client, limiter):
+        """Test that private paths are rate limited and need a bearer token."""
+        response = client.get("/rag/private")
+
+        assert response.status_code == 401
+        assert response.json() == {"detail": "Missing or invalid authorization header"}
+        assert limiter.buckets
+
+    @pytest.mark.parametrize("trusted, expected", [(True, "203.0.113.7"), (False, "10.0.0.1")])
+    def test_forwarded_headers_only_when_trusted(self, trusted, expected):
+        """Test that X-Forwarded-For is honoured only behind a trusted proxy."""
+        middleware = AuthenticationMiddleware(None)
+        middleware.trust_proxy_headers = trusted
+        request = Request({
+            "type": "http",
+            "headers": [(b"x-forwarded-for", b"203.0.113.7, 10.0.0.2")],
+            "client": ("10.0.0.1", 1234),
+        })
+
+        assert middleware._get_client_ip(request) == expected
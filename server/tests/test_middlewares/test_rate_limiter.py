@@ -0,0 +1,151 @@
+"""
+Unit tests for the in-memory RateLimiter.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from app.middlewares.auth_middleware import RateLimiter, RedisRateLimiter
+
+
+class FakeClock:
+    """Controllable stand-in for time.monotonic."""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    fake = FakeClock()
+    with patch("app.middlewares.auth_middleware.time.monotonic", fake):
+        yield fake
+
+
+@pytest.fixture
+def limiter():
+    limiter = RateLimiter()
+    limiter.rate_limit_requests = 3
+    limiter.rate_limit_window = 60
+    return limiter
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestRateLimiter:
+    """Test cases for RateLimiter."""
+
+    def test_requests_over_limit_are_rejected(self, limiter, clock):
+        """Test that requests beyond the limit are rejected."""
+        for _ in range(3):
+            assert limiter.is_allowed("1.1.1.1", "/rag/chat") == (True, None)
+
+        allowed, retry_after = limiter.is_allowed("1.1.1.1", "/rag/chat")
+
+        assert allowed is False
+        assert retry_after is not None
+
+    def test_limits_are_per_client_and_endpoint(self, limiter, clock):
+        """Test that clients and endpoints have separate budgets."""
+        for _ in range(3):
+            limiter.is_allowed("1.1.1.1", "/rag/chat")
+
+        assert limiter.is_allowed("2.2.2.2", "/rag/chat")[0] is True
+        assert limiter.is_allowed("1.1.1.1", "/rag/upload")[0] is True
+
+    def test_budget_recovers_after_window(self, limiter, clock):
+        """Test that old requests stop counting once the window passes."""
+        for _ in range(3):
+            limiter.is_allowed("1.1.1.1", "/rag/chat")
+
+        clock.now += 60
+
+        assert limiter.is_allowed("1.1.1.1", "/rag/chat")[0] is True
+
+    def test_tokens_refill_gradually(self, limiter, clock):
+        """Test that one token comes back after a fraction of the window."""
+        for _ in range(3):
+            limiter.is_allowed("1.1.1.1", "/rag/chat")
+
+        allowed, retry_after = limiter.is_allowed("1.1.1.1", "/rag/chat")
+        assert allowed is False
+        assert retry_after == 20
+
+        clock.now += 20
+        assert limiter.is_allowed("1.1.1.1", "/rag/chat")[0] is True
+        assert limiter.is_allowed("1.1.1.1", "/rag/chat")[0] is False
+
+    def test_failed_logins_block_ip(self, limiter, clock):
+        """Test that repeated failed logins block the client IP."""
+        for _ in range(limiter.login_attempts_limit):
+            limiter.record_failed_login("1.1.1.1")
+
+        allowed, retry_after = limiter.is_allowed("1.1.1.1", "/rag/auth/login")
+
+        assert allowed is False
+        assert retry_after == limiter.login_block_duration
+
+        clock.now += limiter.login_block_duration + 1
+        assert limiter.is_allowed("1.1.1.1", "/rag/auth/login")[0] is True
+
+    def test_spread_out_failed_logins_do_not_block(self, limiter, clock):
+        """Test that failures older than the block window fall out of the buffer."""
+        for _ in range(limiter.login_attempts_limit * 2):
+            limiter.record_failed_login("1.1.1.1")
+            clock.now += limiter.login_block_duration / (limiter.login_attempts_limit - 1)
+
+        assert "1.1.1.1" not in limiter.blocked_ips
+        assert len(limiter.failed_logins["1.1.1.1"]) == limiter.login_attempts_limit
+
+    def test_sweep_drops_idle_keys(self, limiter, clock):
+        """Test that the sweeper removes keys with no recent activity."""
+        limiter.is_allowed("1.1.1.1", "/rag/chat")
+        limiter.record_failed_login("2.2.2.2")
+
+        clock.now += limiter.login_block_duration + 1
+        limiter.sweep()
+
+        assert not limiter.buckets
+        assert not limiter.failed_logins
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestRedisRateLimiter:
+    """Test cases for the Redis-backed RateLimiter."""
+
+    @pytest.fixture
+    def redis_limiter(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        limiter = RedisRateLimiter(fakeredis.FakeAsyncRedis())
+        limiter.rate_limit_requests = 3
+        return limiter
+
+    async def test_buckets_are_shared_between_instances(self, redis_limiter):
+        """Test that two limiters on the same Redis draw from one bucket."""
+        other = RedisRateLimiter(redis_limiter.redis)
+        other.rate_limit_requests = 3
+
+        assert await redis_limiter.check("1.1.1.1", "/rag/chat") == (True, None)
+        assert await other.check("1.1.1.1", "/rag/chat") == (True, None)
+        assert await redis_limiter.check("1.1.1.1", "/rag/chat") == (True, None)
+
+        allowed, retry_after = await other.check("1.1.1.1", "/rag/chat")
+
+        assert allowed is False
+        assert retry_after > 0
+        assert not redis_limiter.buckets
+
+    async def test_falls_back_to_memory_when_redis_fails(self, redis_limiter):
+        """Test that a Redis error degrades to the in-process bucket."""
+        async def broken(*args, **kwargs):
+            raise ConnectionError("redis down")
+
+        redis_limiter._token_bucket = broken
+
+        assert await redis_limiter.check("1.1.1.1", "/rag/chat") == (True, None)
+        assert redis_limiter.buckets
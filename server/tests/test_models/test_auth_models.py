@@ -292,4 +292,17 @@ class TestAuthModels:
         json_str = user.model_dump_json()
         assert isinstance(json_str, str)
         assert "user_123" in json_str
-        assert "test@example.com" in json_str 
\ No newline at end of file
+        assert "test@example.com" in json_str 
+
+    def test_login_email_normalizes_domain(self):
+        """Test that the regex validator lowercases the domain like EmailStr."""
+        login = UserLogin(email="User.Name@Example.COM", password="password123")
+
+        assert login.email == "User.Name@example.com"
+
+    def test_login_email_too_long(self):
+        """Test that addresses over 254 characters are rejected."""
+        with pytest.raises(ValidationError) as exc_info:
+            UserLogin(email=f"{'a' * 64}@{'b' * 190}.com", password="password123")
+
+        assert "value is not a valid email address" in str(exc_info.value)
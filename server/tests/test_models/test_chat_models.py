@@ -0,0 +1,41 @@
+"""
+Unit tests for chat request models.
+"""
+
+import msgspec
+import pytest
+
+from app.models.chat import ChatRequest, ChatRequestFast
+
+
+@pytest.mark.unit
+class TestChatRequestFast:
+    """Test cases for the msgspec-decoded ChatRequest mirror."""
+
+    def test_fields_and_defaults_match_chat_request(self):
+        """Test that the struct stays in sync with the pydantic model."""
+        fast = ChatRequestFast(message="hi")
+        model = ChatRequest(message="hi")
+
+        assert set(ChatRequestFast.__struct_fields__) == set(ChatRequest.model_fields)
+        assert msgspec.structs.asdict(fast) == model.model_dump()
+
+    def test_decode(self):
+        """Test decoding a request body."""
+        decoder = msgspec.json.Decoder(ChatRequestFast)
+
+        request = decoder.decode(b'{"message": "hi", "document_ids": [1, 2], "temperature": 0}')
+
+        assert request.message == "hi"
+        assert request.document_ids == [1, 2]
+        assert request.temperature == 0.0
+        assert request.max_chunks == 5
+
+    def test_decode_rejects_invalid_body(self):
+        """Test that missing or mistyped fields raise a validation error."""
+        decoder = msgspec.json.Decoder(ChatRequestFast)
+
+        with pytest.raises(msgspec.ValidationError):
+            decoder.decode(b'{"conversation_id": "c1"}')
+        with pytest.raises(msgspec.ValidationError):
+            decoder.decode(b'{"message": "hi", "max_chunks": "five"}')
@@ -0,0 +1,66 @@
+"""
+Unit tests for trusted response model construction.
+"""
+
+import pytest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.models import from_orm_trusted
+from app.models.auth import UserResponse
+from app.models.chat import MessageResponse, MessageRole, SourceResponse
+
+
+@pytest.mark.unit
+class TestFromOrmTrusted:
+    """Test cases for from_orm_trusted."""
+
+    @pytest.fixture
+    def user_row(self):
+        return SimpleNamespace(
+            id="user-1",
+            email="test@example.com",
+            role="user",
+            created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+            hashed_password="not-a-field"
+        )
+
+    def test_matches_validated_model(self, user_row):
+        """Test field parity with the validated model so drift is caught."""
+        trusted = from_orm_trusted(UserResponse, user_row, document_count=3, query_count=7)
+        validated = UserResponse.model_validate(
+            {**vars(user_row), "document_count": 3, "query_count": 7}
+        )
+
+        assert trusted.model_dump() == validated.model_dump()
+        assert set(trusted.__dict__) == set(UserResponse.model_fields)
+
+    def test_overrides_take_precedence(self, user_row):
+        """Test that keyword values replace row attributes."""
+        trusted = from_orm_trusted(UserResponse, user_row, id="override")
+
+        assert trusted.id == "override"
+        assert trusted.document_count == 0
+
+    def test_slotted_dataclass(self):
+        """Test trusted construction of slotted dataclass responses with defaults."""
+        source = {
+            "document_id": "d1",
+            "document_name": "doc.pdf",
+            "chunk_id": "c1",
+            "content": "snippet",
+            "similarity_score": 0.5
+        }
+
+        trusted = from_orm_trusted(SourceResponse, **source)
+        message = from_orm_trusted(
+            MessageResponse,
+            id=1,
+            role=MessageRole.USER,
+            content="hi",
+            timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc)
+        )
+
+        assert trusted == SourceResponse(**source)
+        assert not hasattr(trusted, "__dict__")
+        assert message.sources == [] and message.metadata == {}
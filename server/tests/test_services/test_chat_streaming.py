@@ -0,0 +1,94 @@
+"""
+Unit tests for ChatService response streaming.
+"""
+
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.models.chat import ChatRequest
+from app.services import chat_service as chat_service_module
+from app.services.chat_service import ChatService, ChatTurn
+
+
+class StubLLMManager:
+    """LLMManager stand-in that streams fixed chunks."""
+
+    chunks = ["Hello", " world"]
+
+    def __init__(self, tenant_id=None):
+        self.providers = {"stub": Mock(model="stub-model")}
+        self.streamed_by = None
+        self.cleanup = AsyncMock()
+        StubLLMManager.instance = self
+
+    async def stream_response(self, messages, **kwargs):
+        for chunk in self.chunks:
+            yield chunk
+        self.streamed_by = "stub"
+
+
+def parse_event(message: str):
+    """Split a formatted SSE message into its event name and decoded data."""
+    fields = dict(line.split(": ", 1) for line in message.strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(chat_service_module, "LLMManager", StubLLMManager)
+    service = ChatService()
+    turn = ChatTurn(
+        received_at=None,
+        conversation=Mock(id="conv_1"),
+        user_message=Mock(),
+        source_records=[{"content": "context"}],
+        sources=[],
+        llm_messages=[{"role": "user", "content": "Hi"}]
+    )
+    service._prepare_turn = AsyncMock(return_value=turn)
+    service._persist_turn = AsyncMock(return_value=Mock(id="msg_1"))
+    return service
+
+
+def stream(service):
+    return service.stream_chat_message(ChatRequest(message="Hi"), "user_1", vector_store=Mock())
+
+
+@pytest.mark.unit
+@pytest.mark.chat
+class TestChatStreaming:
+    """Test cases for ChatService.stream_chat_message."""
+
+    @pytest.mark.asyncio
+    async def test_events_arrive_in_order(self, service):
+        """Test that sources, each token and done are emitted in order."""
+        events = [parse_event(message) async for message in stream(service)]
+
+        assert [name for name, _ in events] == ["sources", "token", "token", "done"]
+        assert events[0][1] == {"conversation_id": "conv_1", "sources": [{"content": "context"}]}
+        assert [data["content"] for name, data in events if name == "token"] == ["Hello", " world"]
+        assert events[-1][1] == {"conversation_id": "conv_1", "message_id": "msg_1"}
+        StubLLMManager.instance.cleanup.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_turn_is_persisted_once_with_joined_text(self, service):
+        """Test that the streamed chunks are stored as one reply."""
+        [message async for message in stream(service)]
+
+        service._persist_turn.assert_awaited_once()
+        assert service._persist_turn.await_args.kwargs["content"] == "Hello world"
+        assert service._persist_turn.await_args.kwargs["metadata"]["provider"] == "stub"
+
+    @pytest.mark.asyncio
+    async def test_closing_mid_stream_persists_nothing(self, service):
+        """Test that a client disconnect before the reply completes stores nothing."""
+        events = stream(service)
+        assert parse_event(await events.__anext__())[0] == "sources"
+        assert parse_event(await events.__anext__())[0] == "token"
+
+        await events.aclose()
+
+        service._persist_turn.assert_not_awaited()
+        StubLLMManager.instance.cleanup.assert_awaited_once()
@@ -0,0 +1,80 @@
+"""
+Unit tests for DocumentService document processing.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.db.mongodb import Chunk, ChunkContent, DocumentStatus
+from app.services.document_service import DocumentService
+
+
+class FakeCollection:
+    """In-memory stand-in for the Motor collection calls chunk storage makes."""
+
+    def __init__(self):
+        self.docs = []
+
+    @staticmethod
+    def _matches(doc, query):
+        for field, condition in query.items():
+            if isinstance(condition, dict):
+                if doc.get(field) not in condition["$in"]:
+                    return False
+            elif doc.get(field) != condition:
+                return False
+        return True
+
+    async def insert_many(self, docs, **kwargs):
+        self.docs.extend(docs)
+
+    def find(self, query, projection=None):
+        matches = [doc for doc in self.docs if self._matches(doc, query)]
+        return SimpleNamespace(to_list=AsyncMock(return_value=matches))
+
+    async def delete_many(self, query):
+        kept = [doc for doc in self.docs if not self._matches(doc, query)]
+        deleted = len(self.docs) - len(kept)
+        self.docs = kept
+        return SimpleNamespace(deleted_count=deleted)
+
+
+@pytest.fixture
+def collections(monkeypatch):
+    chunks, contents = FakeCollection(), FakeCollection()
+    monkeypatch.setattr(Chunk, "get_motor_collection", lambda: chunks)
+    monkeypatch.setattr(ChunkContent, "get_motor_collection", lambda: contents)
+    return chunks, contents
+
+
+@pytest.mark.unit
+class TestDocumentProcessing:
+    """Test cases for DocumentService._process_document."""
+
+    @pytest.mark.asyncio
+    async def test_vector_failure_leaves_no_chunks(self, collections):
+        """Test that chunks stored before a failed vector upload are removed again."""
+        chunks, contents = collections
+        service = DocumentService()
+        service.processor.process_document_file = AsyncMock(return_value={
+            "chunks": [{"content": "first", "metadata": {}}, {"content": "second", "metadata": {}}],
+            "full_text": "first second",
+            "word_count": 2,
+            "char_count": 12,
+            "file_size": 12
+        })
+        document = Mock(id="doc_1", user_id="user_1", filename="notes.txt", save=AsyncMock())
+        vector_store = Mock(
+            add_document_chunks=AsyncMock(side_effect=RuntimeError("milvus down")),
+            delete_document_chunks=AsyncMock(return_value=True)
+        )
+
+        with pytest.raises(RuntimeError):
+            await service._process_document("/tmp/notes.txt", "notes.txt", document, vector_store)
+
+        assert chunks.docs == []
+        assert contents.docs == []
+        vector_store.delete_document_chunks.assert_awaited_once_with("user_1", "doc_1")
+        assert document.status == DocumentStatus.FAILED
@@ -0,0 +1,106 @@
+"""
+Unit tests for JWT helpers.
+"""
+
+import hashlib
+import time
+from unittest.mock import patch
+
+import bcrypt
+import jwt
+import pytest
+from datetime import timedelta
+from fastapi import HTTPException
+
+from app.utils import auth as auth_utils
+from app.utils.auth import (
+    create_access_token,
+    create_refresh_token,
+    create_token_pair,
+    hash_password,
+    hash_password_async,
+    password_needs_rehash,
+    verify_password,
+    verify_password_async,
+    verify_refresh_token,
+    verify_token
+)
+
+
+@pytest.mark.unit
+class TestPasswords:
+    """Test cases for password hashing."""
+
+    def test_argon2_round_trip(self):
+        """Test that new hashes are argon2id and verify only the right password."""
+        hashed = hash_password("correct horse")
+
+        assert hashed.startswith("$argon2id$")
+        assert verify_password("correct horse", hashed)
+        assert not verify_password("wrong", hashed)
+        assert not password_needs_rehash(hashed)
+
+    def test_legacy_bcrypt_hash(self):
+        """Test that bcrypt hashes still verify and are flagged for upgrade."""
+        hashed = bcrypt.hashpw(b"correct horse", bcrypt.gensalt(rounds=4)).decode()
+
+        assert verify_password("correct horse", hashed)
+        assert not verify_password("wrong", hashed)
+        assert password_needs_rehash(hashed)
+
+    @pytest.mark.asyncio
+    async def test_async_helpers(self):
+        """Test that the pooled helpers match the synchronous ones."""
+        hashed = await hash_password_async("correct horse")
+
+        assert await verify_password_async("correct horse", hashed)
+        assert not await verify_password_async("wrong", hashed)
+
+
+@pytest.mark.unit
+class TestTokens:
+    """Test cases for token creation and verification."""
+
+    def test_round_trip(self):
+        """Test that created tokens verify with their own type only."""
+        data = {"sub": "user@example.com", "user_id": "u1", "role": "user"}
+
+        assert verify_token(create_access_token(data))["user_id"] == "u1"
+        assert verify_refresh_token(create_refresh_token(data))["type"] == "refresh"
+
+        with pytest.raises(HTTPException) as exc_info:
+            verify_refresh_token(create_access_token(data))
+        assert exc_info.value.detail == "Invalid token type. Expected refresh"
+
+    def test_token_pair(self):
+        """Test that a token pair carries the same claims with distinct types."""
+        access, refresh = create_token_pair({"user_id": "u1", "role": "user"})
+
+        assert verify_token(access)["role"] == "user"
+        assert verify_refresh_token(refresh)["user_id"] == "u1"
+
+    def test_expired_token(self):
+        """Test that an expired token is rejected as expired."""
+        token = create_access_token({"user_id": "u1"}, expires_delta=timedelta(seconds=-1))
+
+        with pytest.raises(HTTPException) as exc_info:
+            verify_token(token)
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.detail == "Token has expired"
+
+    def test_refresh_token_decode_is_memoized(self):
+        """Test that repeat refreshes skip the signature check but still honour exp."""
+        token = create_refresh_token({"user_id": "u1"})
+        auth_utils._refresh_token_cache.clear()
+
+        with patch("app.utils.auth.jwt.decode", wraps=jwt.decode) as decode:
+            first = verify_refresh_token(token)
+            first["user_id"] = "tampered"
+            assert verify_refresh_token(token)["user_id"] == "u1"
+            assert decode.call_count == 1
+
+            # A cached payload past its exp is dropped and the token is decoded again
+            key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+            auth_utils._refresh_token_cache.set(key, ({"user_id": "u1"}, time.time() - 1))
+            verify_refresh_token(token)
+            assert decode.call_count == 2
@@ -0,0 +1,64 @@
+"""
+Unit tests for the bounded background task pool.
+"""
+
+import asyncio
+import pytest
+
+from app.utils.background import BackgroundTaskPool
+
+
+@pytest.mark.unit
+class TestBackgroundTaskPool:
+    """Test cases for BackgroundTaskPool."""
+
+    @pytest.mark.asyncio
+    async def test_caps_concurrency_and_releases_tasks(self):
+        """Test that at most `concurrency` tasks run and finished tasks are dropped."""
+        pool = BackgroundTaskPool("test", concurrency=2)
+        running = 0
+        peak = 0
+
+        async def work():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        tasks = [pool.submit(work()) for _ in range(6)]
+        assert pool.active == 6
+
+        await asyncio.gather(*tasks)
+
+        assert peak == 2
+        assert pool.active == 0
+
+    @pytest.mark.asyncio
+    async def test_shutdown_cancels_running_and_queued(self):
+        """Test that shutdown cancels both running and queued tasks."""
+        pool = BackgroundTaskPool("test", concurrency=1)
+        tasks = [pool.submit(asyncio.sleep(10)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        await pool.shutdown()
+
+        assert all(task.cancelled() for task in tasks)
+        assert pool.active == 0
+
+    @pytest.mark.asyncio
+    async def test_on_discard_runs_only_for_tasks_that_never_started(self):
+        """Test that cancelling a queued task awaits its cleanup, but not a running one's."""
+        pool = BackgroundTaskPool("test", concurrency=1)
+        discarded = []
+
+        async def discard(name):
+            discarded.append(name)
+
+        pool.submit(asyncio.sleep(10), on_discard=lambda: discard("running"))
+        pool.submit(asyncio.sleep(10), on_discard=lambda: discard("queued"))
+        await asyncio.sleep(0)
+
+        await pool.shutdown()
+
+        assert discarded == ["queued"]
@@ -0,0 +1,47 @@
+"""
+Unit tests for the service error-mapping decorator.
+"""
+
+import pytest
+from fastapi import HTTPException, status
+
+from app.utils.errors import wrap_errors
+
+
+@pytest.mark.unit
+class TestWrapErrors:
+    """Test cases for wrap_errors."""
+
+    @pytest.mark.asyncio
+    async def test_returns_value(self):
+        """Test that the wrapped function's result is returned unchanged."""
+        @wrap_errors("Failed")
+        async def ok(x):
+            return x * 2
+
+        assert await ok(21) == 42
+        assert ok.__name__ == "ok"
+
+    @pytest.mark.asyncio
+    async def test_http_exception_propagates(self):
+        """Test that HTTPExceptions keep their status and detail."""
+        @wrap_errors("Failed")
+        async def not_found():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Missing")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await not_found()
+        assert exc_info.value.status_code == 404
+        assert exc_info.value.detail == "Missing"
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_is_mapped(self):
+        """Test that other exceptions become the configured HTTP error."""
+        @wrap_errors("Invalid refresh token", status.HTTP_401_UNAUTHORIZED)
+        async def broken():
+            raise RuntimeError("boom")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await broken()
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.detail == "Invalid refresh token"
@@ -0,0 +1,43 @@
+"""
+Unit tests for ETag helpers.
+"""
+
+import pytest
+from starlette.requests import Request
+
+from app.utils.etag import etag_matches, make_etag, not_modified
+
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+@pytest.mark.unit
+class TestETag:
+    """Test cases for conditional GET helpers."""
+
+    def test_make_etag_is_stable_and_quoted(self):
+        """Test that equal parts give the same quoted ETag and different parts do not."""
+        etag = make_etag("user", 0, 50, 3)
+        assert etag == make_etag("user", 0, 50, 3)
+        assert etag != make_etag("user", 0, 50, 4)
+        assert etag.startswith('"') and etag.endswith('"')
+
+    def test_etag_matches(self):
+        """Test exact, weak, list and wildcard If-None-Match values."""
+        etag = make_etag("x")
+        assert not etag_matches(_request(), etag)
+        assert etag_matches(_request(etag), etag)
+        assert etag_matches(_request(f"W/{etag}"), etag)
+        assert etag_matches(_request(f'"other", {etag}'), etag)
+        assert etag_matches(_request("*"), etag)
+        assert not etag_matches(_request('"other"'), etag)
+
+    def test_not_modified(self):
+        """Test that the 304 carries the ETag and no body."""
+        etag = make_etag("x")
+        response = not_modified(etag)
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.body == b""
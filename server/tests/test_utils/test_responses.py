@@ -0,0 +1,73 @@
+"""
+Unit tests for msgspec-encoded JSON responses.
+"""
+
+import json
+import pytest
+from datetime import datetime, timezone
+
+from app.models.chat import ChatResponse, ConversationResponse, MessageResponse, MessageRole, SourceResponse
+from app.utils.responses import MsgspecJSONResponse
+
+
+@pytest.mark.unit
+class TestMsgspecJSONResponse:
+    """Test cases for MsgspecJSONResponse."""
+
+    @pytest.fixture
+    def source(self):
+        return SourceResponse(
+            document_id="d1",
+            document_name="doc.pdf",
+            chunk_id="c1",
+            content="snippet",
+            similarity_score=0.92,
+            page_number=3
+        )
+
+    def test_chat_response_matches_pydantic(self, source):
+        """Test that the body equals pydantic's JSON for the same model."""
+        chat = ChatResponse(
+            message="answer",
+            sources=[source],
+            conversation_id="conv",
+            message_id="msg",
+            tokens_used=42,
+            model_used="llama"
+        )
+
+        response = MsgspecJSONResponse(chat)
+
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == json.loads(chat.model_dump_json())
+
+    def test_nested_list_with_enums_and_datetimes(self, source):
+        """Test nested models, enum values and timestamps in a list body."""
+        timestamp = datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc)
+        message = MessageResponse(
+            id=1,
+            role=MessageRole.ASSISTANT,
+            content="hi",
+            timestamp=timestamp,
+            sources=[source],
+            metadata={"usage": {"total_tokens": 5}}
+        )
+        conversation = ConversationResponse(
+            id="conv",
+            user_id=7,
+            title="t",
+            created_at=timestamp,
+            updated_at=timestamp,
+            message_count=1,
+            messages=[message]
+        )
+
+        body = json.loads(MsgspecJSONResponse([conversation]).body)
+
+        assert body == [json.loads(conversation.model_dump_json())]
+        assert body[0]["messages"][0]["role"] == "assistant"
+
+    def test_unsupported_type_raises(self):
+        """Test that unknown objects are rejected instead of silently stringified."""
+        with pytest.raises(TypeError):
+            MsgspecJSONResponse({"value": object()})
@@ -0,0 +1,120 @@
+"""
+Unit tests for SSE progress emitters.
+"""
+
+import asyncio
+import pytest
+
+from app.utils.sse import (
+    CoalescingEventBuffer,
+    DocumentProcessingEventEmitter,
+    ProcessingStatus,
+    RebuildStatus,
+    SSE_PING,
+    VectorRebuildEventEmitter,
+    create_rebuild_sse_generator,
+    create_sse_generator
+)
+
+
+@pytest.mark.unit
+class TestEventEmitters:
+    """Test cases for the SSE event emitters."""
+
+    @pytest.mark.asyncio
+    async def test_emit_failed_closes_stream(self):
+        """Test that a failure reported by the task ends the SSE stream."""
+        emitter = DocumentProcessingEventEmitter()
+        stream = create_sse_generator(emitter, timeout=5)
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)  # let the generator register its callback
+
+        await emitter.emit_status(ProcessingStatus.STARTED)
+        assert '"status":"started"' in await first
+
+        await emitter.emit_failed("boom")
+        assert '"message":"boom"' in await stream.__anext__()
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+
+    @pytest.mark.asyncio
+    async def test_client_disconnect_cancels_task(self):
+        """Test that closing the stream early cancels the background task."""
+        emitter = DocumentProcessingEventEmitter()
+        task = asyncio.ensure_future(asyncio.sleep(60))
+        stream = create_sse_generator(emitter, timeout=5, task=task)
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+
+        await emitter.emit_status(ProcessingStatus.STARTED)
+        await first
+        await stream.aclose()
+        await asyncio.sleep(0)
+
+        assert task.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_idle_stream_sends_keep_alive(self):
+        """Test that a comment frame is sent while no events arrive."""
+        emitter = DocumentProcessingEventEmitter()
+        stream = create_sse_generator(emitter, timeout=5, ping_interval=0.01)
+
+        assert await stream.__anext__() == SSE_PING
+
+        await emitter.emit_status(ProcessingStatus.COMPLETED)
+        frame = await stream.__anext__()
+        while frame == SSE_PING:
+            frame = await stream.__anext__()
+        assert '"status":"completed"' in frame
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_emit_failed_does_not_repeat_service_failure(self):
+        """Test that emit_failed is a no-op when FAILED was already emitted."""
+        emitter = DocumentProcessingEventEmitter()
+        events = []
+
+        async def collect(event_data):
+            events.append(event_data)
+
+        emitter.add_callback(collect)
+
+        await emitter.emit_status(ProcessingStatus.FAILED, "Invalid file type")
+        await emitter.emit_failed("Document processing failed: Invalid file type")
+
+        assert [event["message"] for event in events] == ["Invalid file type"]
+
+    @pytest.mark.asyncio
+    async def test_progress_updates_are_coalesced(self):
+        """Test that a burst of PROCESSING updates becomes one frame before completion."""
+        emitter = VectorRebuildEventEmitter()
+        stream = create_rebuild_sse_generator(emitter, timeout=5)
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+
+        await emitter.emit_status(RebuildStatus.STARTED)
+        await first
+        emitter.update_totals(total_chunks=100, total_documents=1)
+        for processed in range(1, 101):
+            emitter.update_progress(processed, 0)
+            await emitter.emit_status(RebuildStatus.PROCESSING)
+
+        frame = await stream.__anext__()
+        assert '"processed_chunks":100' in frame
+
+        await emitter.emit_status(RebuildStatus.COMPLETED)
+        assert '"status":"completed"' in await stream.__anext__()
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+
+    @pytest.mark.asyncio
+    async def test_phase_change_supersedes_pending_progress(self):
+        """Test that a non-progress event is delivered in order and drops stale progress."""
+        buffer = CoalescingEventBuffer(coalesce_status="processing", min_interval=10)
+        await buffer.put({"status": "processing", "n": 1})
+        assert (await buffer.get())["n"] == 1
+
+        await buffer.put({"status": "processing", "n": 2})
+        await buffer.put({"status": "finalizing"})
+
+        assert (await buffer.get())["status"] == "finalizing"
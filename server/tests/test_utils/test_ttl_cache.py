@@ -0,0 +1,46 @@
+"""
+Unit tests for the in-process TTL cache.
+"""
+
+import pytest
+
+from app.utils import ttl_cache
+from app.utils.ttl_cache import TTLCache
+
+
+@pytest.mark.unit
+class TestTTLCache:
+    """Test cases for TTLCache."""
+
+    def test_get_set_and_pop(self):
+        """Test basic storage and removal."""
+        cache = TTLCache(maxsize=10, ttl_seconds=30)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        cache.pop("a")
+        cache.pop("missing")
+        assert cache.get("a") is None
+
+    def test_evicts_least_recently_used(self):
+        """Test that reading an entry protects it from eviction."""
+        cache = TTLCache(maxsize=2, ttl_seconds=30)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert len(cache) == 2
+
+    def test_entries_expire(self, monkeypatch):
+        """Test that entries are dropped once their TTL has passed."""
+        now = [100.0]
+        monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now[0])
+        cache = TTLCache(maxsize=10, ttl_seconds=30)
+        cache.set("a", 1)
+        now[0] += 29
+        assert cache.get("a") == 1
+        now[0] += 2
+        assert cache.get("a") is None
+        assert len(cache) == 0